@@ -0,0 +1,141 @@
+"""
+Central texture registry. Every texture is loaded from disk once and the same Texture object is handed out to every
+sprite that uses it, keyed by its path (the same "resources/..." paths used in the json files).
+The manifest of everything that can be loaded is generated from the resources folder, so it can all be preloaded on
+startup, optionally on a background thread.
+"""
+import os
+import threading
+
+import arcade
+
+RESOURCE_DIRECTORY = "resources"
+TEXTURE_EXTENSIONS = (".png", ".jpeg", ".jpg")
+
+
+def normalize_key(path):
+    """
+    Textures are keyed by their relative path, with forward slashes
+    """
+    return os.path.normpath(path).replace("\\", "/")
+
+
+def build_manifest(directory=RESOURCE_DIRECTORY):
+    """
+    Walk the resources folder for every texture file
+    :return: sorted list of texture keys
+    """
+    manifest = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.lower().endswith(TEXTURE_EXTENSIONS):
+                manifest.append(normalize_key(os.path.join(root, filename)))
+    return sorted(manifest)
+
+
+class AssetRegistry:
+    def __init__(self, directory=RESOURCE_DIRECTORY):
+        self.directory = directory
+        self.manifest = None
+        self.textures = {}
+        self.hits = 0
+        self.misses = 0
+        self.preload_thread = None
+        # Textures can be loaded from the preload thread and the game at the same time
+        self.lock = threading.Lock()
+
+    def get_manifest(self):
+        if self.manifest is None:
+            self.manifest = build_manifest(self.directory)
+        return self.manifest
+
+    def get_texture(self, path):
+        """
+        :param path: path of the texture file, e.g. "resources/hazard_sprites/bullet.png"
+        :return: shared arcade.Texture for the file
+        """
+        key = normalize_key(path)
+        texture = self.textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            return texture
+        with self.lock:
+            # May have been loaded by the preload thread while waiting
+            texture = self.textures.get(key)
+            if texture is None:
+                self.misses += 1
+                texture = arcade.load_texture(key)
+                self.textures[key] = texture
+            else:
+                self.hits += 1
+        return texture
+
+    def get_textures_in_directory(self, directory):
+        """
+        Every texture directly inside a folder, sorted by file name (used for animation frames)
+        """
+        prefix = normalize_key(directory) + "/"
+        return [self.get_texture(key) for key in self.get_manifest()
+                if key.startswith(prefix) and "/" not in key[len(prefix):]]
+
+    def make_sprite(self, path, scale=1):
+        """
+        Same as arcade.Sprite(path, scale), using the shared texture
+        """
+        return arcade.Sprite(texture=self.get_texture(path), scale=scale)
+
+    def get_hit_box(self, path):
+        """
+        Hit box points of a texture, without needing to create a sprite for it
+        """
+        return self.get_texture(path).hit_box_points
+
+    def preload(self, keys=None):
+        """
+        Load every texture in the manifest (or just the keys given), the loads are not counted as misses
+        """
+        for key in self.get_manifest() if keys is None else keys:
+            key = normalize_key(key)
+            if key in self.textures:
+                continue
+            with self.lock:
+                if key not in self.textures:
+                    self.textures[key] = arcade.load_texture(key)
+
+    def preload_in_background(self, keys=None):
+        """
+        Start preloading on a daemon thread, anything asked for before it is done is loaded on demand
+        """
+        self.preload_thread = threading.Thread(target=self.preload, args=(keys,), daemon=True)
+        self.preload_thread.start()
+        return self.preload_thread
+
+    def get_stats(self):
+        """
+        :return: dict of hits, misses and number of textures loaded
+        """
+        return {"hits": self.hits, "misses": self.misses, "loaded": len(self.textures)}
+
+
+# Shared by every module
+registry = AssetRegistry()
+
+
+def get_texture(path):
+    return registry.get_texture(path)
+
+
+def get_textures_in_directory(directory):
+    return registry.get_textures_in_directory(directory)
+
+
+def make_sprite(path, scale=1):
+    return registry.make_sprite(path, scale)
+
+
+def get_hit_box(path):
+    return registry.get_hit_box(path)
+
+
+def get_stats():
+    return registry.get_stats()
@@ -2,6 +2,7 @@
 CS 3050 Team 5
 
 """
+import os
 import sys
 
 import arcade
@@ -11,20 +12,28 @@ import math
 
 import player
 from room import Room
-from map import Map, gen_outdoor_spawners
+from map import Map, MapBuilder, gen_outdoor_spawners
 from player import PlayerCharacter, MAX_STAM, MAX_HEALTH
 from item import Item, Shovel, Lantern
 from utility_functions import euclidean_distance, calculate_direction_vector_negative, is_within_facing_direction
 from game_loop_utilities import increase_quota
 from ship import Ship, SHIP_INTERACTION_OPTIONS, GAMESTATE_OPTIONS
 from indoor_enemies import Enemy, Thumper
+from lod import LODScheduler
+from rendering import CulledSpriteList, CullingStage
+from hud import HUD
+from screens import ScreenManager, StartScreen, DeathScreen, ResetScreen, LoadingScreen, PauseScreen
+from world_seed import WorldSeed
+from world_planner import WorldPlanner
+from snapshot import save_snapshot, load_snapshot, finish_restore
+import assets
+import game_data
 from time import time
 import random
 
 import cProfile, pstats, io
 from pstats import SortKey
 
-import json
 
 # Constants
 SCREEN_WIDTH = 1000
@@ -46,6 +55,8 @@ SPRINT_DELAY = 30
 
 # delay for entering and leaving building
 ENTER_EXIT_DELAY = 50
+# Ticks between off-screen updates of indoor monsters while the player is outdoors
+OFFSCREEN_TICK_RATE = 30
 
 # Game loop variables
 INITIAL_QUOTA = 130
@@ -70,11 +81,15 @@ START_SCREEN = 0
 GAME_SCREEN = 1
 RESET_SCREEN = 2
 DEATH_SCREEN = 3
-# PAUSE_SCREEN = 4 
+PAUSE_SCREEN = 4
+LOADING_SCREEN = 5
 current_screen = START_SCREEN
 
-PAUSE_CONTROL_X_SHIFT = 256
-PAUSE_CONTROL_Y_SHIFT = -175
+# Draw how many sprites each layer drew and culled this frame
+SHOW_CULLING_STATS = False
+
+# Quick save (F5) and quick load (F9)
+QUICK_SAVE_FILE = "quicksave.lcs"
 
 
 class LethalGame(arcade.Window):
@@ -91,26 +106,29 @@ class LethalGame(arcade.Window):
 
         arcade.enable_timings()
 
-        # start screen button variables
-        self.button_x = SCREEN_WIDTH // 3
-        self.button_y = SCREEN_HEIGHT // 3
-        self.button_width = 250
-        self.button_height = 50
-        self.mouse_x = SCREEN_WIDTH // 3
-        self.mouse_y = SCREEN_WIDTH // 3
+        # Every screen is built once, switching is just changing current_screen
+        self.screens = ScreenManager({START_SCREEN: StartScreen(SCREEN_WIDTH, SCREEN_HEIGHT),
+                                      DEATH_SCREEN: DeathScreen(SCREEN_WIDTH, SCREEN_HEIGHT),
+                                      RESET_SCREEN: ResetScreen(SCREEN_WIDTH, SCREEN_HEIGHT),
+                                      LOADING_SCREEN: LoadingScreen(SCREEN_WIDTH, SCREEN_HEIGHT),
+                                      PAUSE_SCREEN: PauseScreen(SCREEN_WIDTH, SCREEN_HEIGHT)})
         self.current_screen = START_SCREEN
-        self.show_reset_screen = False
-        self.reset_screen_timer = None
         self.player_dead = False
-        self.show_death_screen = False
-        self.death_screen_timer = None
         self.pause_screen_visible = False
 
         # Initialize variables for spawning / map / other important variables
         self.gamestate = GAMESTATE_OPTIONS["orbit"]
         self.moon_name = "experimentation"
         self.indoor_map = None
+        # Builds the map across frames while landing
+        self.map_builder = None
+        # Snapshot being loaded, put back once its map is built (see snapshot.finish_restore)
+        self.pending_snapshot = None
         self.indoor_walls = None
+        self.indoor_wall_index = None
+        self.offscreen_timer = OFFSCREEN_TICK_RATE
+        # Updates far away monsters and turrets less often
+        self.lod_scheduler = LODScheduler()
         self.indoor_main_position = None
         self.indoor_main_bounding_box = None
         self.outdoor_starting_position = None
@@ -118,7 +136,7 @@ class LethalGame(arcade.Window):
 
         self.ship = Ship().setup()
 
-        self.orbit_background = arcade.Sprite("resources/tilemaps/orbit_background.png")
+        self.orbit_background = assets.make_sprite("resources/tilemaps/orbit_background.png")
         self.orbit_background.center_x = self.ship.center_x
         self.orbit_background.center_y = self.ship.center_y - self.orbit_background.height // 2 + SCREEN_HEIGHT // 2 + BACKGROUND_SHIFT
 
@@ -129,17 +147,17 @@ class LethalGame(arcade.Window):
         self.player = PlayerCharacter()
         self.player.center_x = self.ship.center_x + PLAYER_SHIP_SHIFT_X
         self.player.center_y = self.ship.center_y + PLAYER_SHIP_SHIFT_Y
-        self.inventory_hud = None
 
         self.indoor_enemy_entities = None
         self.outdoor_enemy_entities = None
 
         self.indoor_loot_items = None
-        self.outdoor_loot_items = arcade.SpriteList()
+        self.outdoor_loot_items = CulledSpriteList()
 
         self.mines = None
         self.armed_mines = None
         self.turrets = None
+        self.turret_lasers = None
         self.bullets = None
 
         self.indoor_spawners = None
@@ -152,6 +170,10 @@ class LethalGame(arcade.Window):
         # GUI variables
         # Set up the Camera
         self.camera = arcade.Camera(self.width, self.height)
+        # Picks what is in the camera's view each frame, and counts what it culled
+        self.culling = CullingStage()
+        # Inventory, health, quota and clock, drawn in screen coordinates with its own camera
+        self.hud = HUD(SCREEN_WIDTH, SCREEN_HEIGHT)
         # Instead of using a scene, it may also be easier to just keep a sprite list
         # for each individual thing.
         # self.scene = None
@@ -191,24 +213,21 @@ class LethalGame(arcade.Window):
         self.quota = INITIAL_QUOTA
         self.quotas_hit = 0
         self.days_left = MAX_DAYS
-        self.quota_hud_sprite = arcade.Sprite("resources/player_sprites/quota_hud_box.png")
-        self.day_hud_sprite = arcade.Sprite("resources/player_sprites/day_hud_box.png")
-        self.zero_day_sprite = arcade.Sprite("resources/player_sprites/no_day_left.png")
+        # Seeds every map of the run and the quota, a new run gets a new seed
+        self.world_seed = WorldSeed()
+        # Plans the selected moon's map in the background while in orbit
+        self.world_planner = WorldPlanner()
         self.scrap_sold = 0
         self.sell_list = arcade.SpriteList()
 
         # Initialize time variables
         self.start_time = None
         self.delta_time = None
-        self.time_hud_sprite = arcade.Sprite("resources/player_sprites/time_hud_box.png")
 
         self.last_terminal_output = None
-        self.terminal_background = arcade.Sprite("resources/player_sprites/terminal_background.png")
+        self.terminal_background = assets.make_sprite("resources/player_sprites/terminal_background.png")
         self.terminal_background.alpha = 128
 
-        self.pause_background = arcade.Sprite("resources/screens/pause_background.png")
-        self.pause_background.alpha = 128
-
         self.company_building = arcade.Scene.from_tilemap(arcade.load_tilemap("resources/tilemaps/company.tmx"))
         self.company_starting_position = (720, 640)
         self.company_physics_engine = arcade.PhysicsEnginePlatformer(
@@ -234,20 +253,21 @@ class LethalGame(arcade.Window):
         """
         Reset the game, different than init
         """
-        # start screen button variables
-        self.button_x = SCREEN_WIDTH // 3  # X-coordinate of the button
-        self.button_y = SCREEN_HEIGHT // 3  # Y-coordinate of the button
-        self.button_width = 100  # Width of the button
-        self.button_height = 50  # Height of the button
-        self.mouse_x = SCREEN_WIDTH // 3  # Initial mouse X-coordinate
-        self.mouse_y = SCREEN_WIDTH // 3  # Initial mouse Y-coordinate
         # self.current_screen = START_SCREEN
 
         # Initialize variables for spawning / map / other important variables
         self.gamestate = GAMESTATE_OPTIONS["orbit"]
         self.moon_name = "experimentation"
         self.indoor_map = None
+        # Builds the map across frames while landing
+        self.map_builder = None
+        # Snapshot being loaded, put back once its map is built (see snapshot.finish_restore)
+        self.pending_snapshot = None
         self.indoor_walls = None
+        self.indoor_wall_index = None
+        self.offscreen_timer = OFFSCREEN_TICK_RATE
+        # Updates far away monsters and turrets less often
+        self.lod_scheduler = LODScheduler()
         self.indoor_main_position = None
         self.indoor_main_bounding_box = None
         self.outdoor_starting_position = None
@@ -255,7 +275,7 @@ class LethalGame(arcade.Window):
 
         self.ship = Ship().setup()
 
-        self.orbit_background = arcade.Sprite("resources/tilemaps/orbit_background.png")
+        self.orbit_background = assets.make_sprite("resources/tilemaps/orbit_background.png")
         self.orbit_background.center_x = self.ship.center_x
         self.orbit_background.center_y = self.ship.center_y - self.orbit_background.height // 2 + SCREEN_HEIGHT // 2 + BACKGROUND_SHIFT
 
@@ -266,16 +286,16 @@ class LethalGame(arcade.Window):
         self.player = PlayerCharacter()
         self.player.center_x = self.ship.center_x + PLAYER_SHIP_SHIFT_X
         self.player.center_y = self.ship.center_y + PLAYER_SHIP_SHIFT_Y
-        self.inventory_hud = None
 
         self.indoor_enemy_entities = None
 
         self.indoor_loot_items = None
-        self.outdoor_loot_items = arcade.SpriteList()
+        self.outdoor_loot_items = CulledSpriteList()
 
         self.mines = None
         self.armed_mines = None
         self.turrets = None
+        self.turret_lasers = None
         self.bullets = None
 
         self.indoor_spawners = None
@@ -326,19 +346,19 @@ class LethalGame(arcade.Window):
         self.quota = INITIAL_QUOTA
         self.quotas_hit = 0
         self.days_left = MAX_DAYS
-        self.quota_hud_sprite = arcade.Sprite("resources/player_sprites/quota_hud_box.png")
-        self.day_hud_sprite = arcade.Sprite("resources/player_sprites/day_hud_box.png")
-        self.zero_day_sprite = arcade.Sprite("resources/player_sprites/no_day_left.png")
+        # Seeds every map of the run and the quota, a new run gets a new seed
+        self.world_seed = WorldSeed()
+        # Plans the selected moon's map in the background while in orbit
+        self.world_planner = WorldPlanner()
         self.scrap_sold = 0
         self.sell_list = arcade.SpriteList()
 
         # Initialize time variables
         self.start_time = None
         self.delta_time = None
-        self.time_hud_sprite = arcade.Sprite("resources/player_sprites/time_hud_box.png")
 
         self.last_terminal_output = None
-        self.terminal_background = arcade.Sprite("resources/player_sprites/terminal_background.png")
+        self.terminal_background = assets.make_sprite("resources/player_sprites/terminal_background.png")
         self.terminal_background.alpha = 128
 
         self.company_building = arcade.Scene.from_tilemap(arcade.load_tilemap("resources/tilemaps/company.tmx"))
@@ -362,7 +382,10 @@ class LethalGame(arcade.Window):
         self.outdoor_light_layer.add(self.ship.ship_light)
         self.outdoor_light_layer.add(self.player.player_scan_light)
 
-    def setup(self, moons_name):
+    def begin_setup(self, moons_name):
+        """
+        Start landing on the moon, the map is built by self.map_builder (see update_loading), then finish_setup
+        """
         self.moon_name = moons_name
         # add players health on setup
         self.player.add_health(player.MAX_HEALTH)
@@ -371,20 +394,39 @@ class LethalGame(arcade.Window):
         # Ideally this would work using some sort of arcade.load_tilemap(map_name)
         # if we use this we need to use layers for the physics engine, otherwise add
         # all walls to the walls list
-        self.indoor_map = Map(self.moon_name)  # Will update later based on start screen inputs
-        self.indoor_map.setup()
+        # Use the plan made while in orbit if there is one (waiting for it if it is nearly done), otherwise plan now.
+        # Each map gets its own seed from the run's seed, so a run can be replayed from one seed
+        plan = self.world_planner.take(self.moon_name)
+        if plan is not None:
+            self.indoor_map = Map(self.moon_name, plan.seed)
+        else:
+            self.indoor_map = Map(self.moon_name, self.world_seed.derive_seed("maps"))
+        self.map_builder = MapBuilder(self.indoor_map, plan)
+
+    def finish_setup(self):
+        """
+        Everything in landing that needs the built map
+        """
+        self.map_builder = None
 
         # get the walls from the map
         self.indoor_walls = self.indoor_map.get_walls()
+        self.indoor_wall_index = self.indoor_map.get_wall_index()
+        self.lod_scheduler = LODScheduler()
         self.indoor_loot_items = self.indoor_map.get_loot_list()
         self.mines = self.indoor_map.get_mines()
-        self.armed_mines = arcade.SpriteList()
+        self.armed_mines = CulledSpriteList()
         self.turrets = self.indoor_map.get_turrets()
+        # Each turret's laser sprite stays in this list, hidden while the laser is off
+        self.turret_lasers = arcade.SpriteList()
+        for turret in self.turrets:
+            self.turret_lasers.append(turret.get_laser_sprite())
         self.bullets = arcade.SpriteList()
 
         # Again, update later to be from user input
         map_settings = self.indoor_map.get_map_data()
-        self.outdoor_map = arcade.Scene.from_tilemap(arcade.load_tilemap(map_settings[0]))
+        # The map has already loaded the moon's tilemap (map_settings[0]) for its spawn regions
+        self.outdoor_map = self.indoor_map.outdoor_tilemap
         self.outdoor_starting_position = map_settings[1]
         self.indoor_power = map_settings[2]
         self.outdoor_power = map_settings[3]
@@ -393,8 +435,6 @@ class LethalGame(arcade.Window):
 
         self.ship.change_outdoors(self.outdoor_map)
 
-        self.outdoor_light_layer.add(self.ship.ship_light)
-
         # Initialize player character
         self.indoor_main_position = self.indoor_map.get_player_start()
         # Add logic for starting location of player (from outdoors)
@@ -407,12 +447,6 @@ class LethalGame(arcade.Window):
         # Just doesn't work to snap camera instantly
         self.center_camera_to_player(100)
 
-        self.inventory_hud = arcade.SpriteList()
-        # Add the four sprite items to the list
-        for i in range(4):
-            temp_sprite = arcade.Sprite("resources/item_sprites/inventory_box.png", scale=0.55)
-            self.inventory_hud.append(temp_sprite)
-
         self.indoor_enemy_entities = []
         self.outdoor_enemy_entities = []
 
@@ -443,24 +477,54 @@ class LethalGame(arcade.Window):
         ship_position = self.ship.get_pos()
         self.ship.update_position(self.outdoor_starting_position[0] - 64 - ship_position[0],
                                   self.outdoor_starting_position[1] - 128 - ship_position[1])
+        # Outdoor monsters share one set of walls (tilemap and landed ship) and tile visibility table
+        self.indoor_map.setup_outdoor_navigation(self.ship.get_walls_with_door())
 
-        self.indoor_light_layer = LightLayer(SCREEN_WIDTH, SCREEN_HEIGHT)
-        self.indoor_light_layer.set_background_color(arcade.color.BLACK)
-
-        self.indoor_light_layer.add(self.player.player_indoor_light)
-        self.indoor_light_layer.add(self.player.player_scan_light)
-
-        self.outdoor_light_layer = LightLayer(SCREEN_WIDTH, SCREEN_HEIGHT)
-        self.outdoor_light_layer.set_background_color(arcade.color.BLACK)
-
-        self.outdoor_light_layer.add(self.player.player_outdoor_light)
-        self.outdoor_light_layer.add(self.ship.ship_light)
-        self.outdoor_light_layer.add(self.player.player_scan_light)
+        # The light layers made in __init__/reset_game already hold the player and ship lights, so they are reused
 
         # Set starting time
         self.start_time = get_time()
         self.delta_time = get_time() - self.start_time  # clearly will start low, but is same way to update later
 
+    def quick_save(self):
+        """
+        Save the run to QUICK_SAVE_FILE, only while playing (not loading or on an end screen)
+        """
+        if self.current_screen != GAME_SCREEN:
+            return
+        save_snapshot(self, QUICK_SAVE_FILE)
+
+    def quick_load(self):
+        """
+        Go back to the run saved in QUICK_SAVE_FILE, if there is one
+        """
+        if self.current_screen == LOADING_SCREEN or not os.path.exists(QUICK_SAVE_FILE):
+            return
+        self.pause_screen_visible = False
+        if load_snapshot(self, QUICK_SAVE_FILE):
+            self.finish_quick_load()
+        else:
+            # A different map, built behind the loading screen before the rest is put back (see update_loading)
+            self.current_screen = LOADING_SCREEN
+
+    def finish_quick_load(self):
+        """
+        Go back to the game once the snapshot is fully restored
+        """
+        self.current_screen = GAME_SCREEN
+        # The snapshot holds the time into the day, so move the start of the day to match
+        if self.delta_time is not None:
+            self.start_time = get_time() - self.delta_time
+        self.snap_camera_to_player()
+
+    def pregenerate_map(self):
+        """
+        Plan the selected moon's map on a worker thread, if it isn't already being planned
+        """
+        if self.moon_name == "comp" or self.world_planner.has_request(self.moon_name):
+            return
+        self.world_planner.request(self.moon_name, self.world_seed.derive_seed("maps"))
+
     def on_draw(self):
         """
         Render the screen
@@ -475,8 +539,7 @@ class LethalGame(arcade.Window):
         """
         FUTURE: May need to add another state for landing, to animate the ship
         """
-        button_x = 100
-        mouse_x = 50
+        self.screens.set_current(self.current_screen)
         if self.current_screen == START_SCREEN:
             self.camera.move_to((0, 0), 1)
             self.draw_start_screen()
@@ -484,6 +547,8 @@ class LethalGame(arcade.Window):
         elif self.current_screen == GAME_SCREEN:
             # Draw elements for other screens (e.g., game screen, indoor/outdoor screens)
             self.camera.use()
+            # Only what the camera can see is drawn
+            self.culling.begin_frame(self.get_view())
             # Draw orbit background
             if self.gamestate == GAMESTATE_OPTIONS["orbit"]:
                 self.orbit_background.draw()
@@ -496,121 +561,62 @@ class LethalGame(arcade.Window):
                 if self.gamestate == GAMESTATE_OPTIONS["company"]:
                     self.company_building.draw()
                     self.ship.draw_self(self.camera, self.gamestate, self.player, self.pause_screen_visible)
-                    for item in self.outdoor_loot_items:
-                        item.draw_self()
-                    for item in self.sell_list:
-                        item.draw_self()
+                    self.outdoor_loot_items.draw()
+                    self.sell_list.draw()
 
                 if not self.ship.player_interacting_with_terminal and not self.pause_screen_visible:
-                    # Draw correct days left (red if zero)
-                    time_text_x = self.camera.position[0] + SCREEN_WIDTH / 2
-                    time_text_y = self.camera.position[1] + SCREEN_HEIGHT - 32
-                    if self.days_left > 0:
-                        sprite = self.day_hud_sprite
-                        sprite.center_x = time_text_x - 128
-                        sprite.center_y = time_text_y
-                        sprite.draw()
-                        color = arcade.csscolor.GREEN
-                        arcade.draw_text(f"{self.days_left} days left", sprite.center_x - 38, sprite.center_y - 6,
-                                         color,
-                                         12)
-                    elif self.days_left < 0:
+                    if self.days_left < 0:
                         self.current_screen = RESET_SCREEN
                     else:
-                        sprite = self.zero_day_sprite
-                        sprite.center_x = time_text_x - 128
-                        sprite.center_y = time_text_y
-                        sprite.draw()
-
-                        color = arcade.csscolor.RED
-                        arcade.draw_text(f"{self.days_left} days left", sprite.center_x - 38, sprite.center_y - 6,
-                                         color,
-                                         12)
-
-                    self.quota_hud_sprite.center_x = time_text_x
-                    self.quota_hud_sprite.center_y = time_text_y
-                    self.quota_hud_sprite.draw()
-
-                    # Draw the days left
-                    arcade.draw_text(f"Quota: {self.quota}", self.quota_hud_sprite.center_x - 42,
-                                     self.quota_hud_sprite.center_y - 6, arcade.csscolor.GREEN,
-                                     12)
-                    self.quota_hud_sprite.center_x = time_text_x + 128
-                    self.quota_hud_sprite.center_y = time_text_y
-                    self.quota_hud_sprite.draw()
-                    arcade.draw_text(f"Sold: {self.scrap_sold}", self.quota_hud_sprite.center_x - 42,
-                                     self.quota_hud_sprite.center_y - 6, arcade.csscolor.GREEN,
-                                     12)
+                        # Days left (red if zero), quota and scrap sold
+                        self.hud.use()
+                        self.hud.draw_quota(self.days_left, self.quota, self.scrap_sold)
+                        self.camera.use()
                 self.player.draw_self()
 
             elif self.gamestate == GAMESTATE_OPTIONS["outdoors"]:
                 with self.outdoor_light_layer:
                     # Draw parts of outdoors before player
-                    self.outdoor_map["background"].draw()
+                    self.culling.draw_layer("outdoor background", self.indoor_map.get_outdoor_layer("background"))
                     # self.outdoor_map["entrance"].draw() # Don't draw entrance layer
-                    self.outdoor_map["walls"].draw()
+                    self.culling.draw_layer("outdoor walls", self.indoor_map.get_outdoor_layer("walls"))
                     self.ship.draw_self(self.camera, self.gamestate, self.player, self.pause_screen_visible)
-                    for item in self.outdoor_loot_items:
-                        item.draw_self()
+                    self.culling.draw_layer("outdoor loot", self.outdoor_loot_items)
                     self.player.draw_self()
-                    for monster in self.outdoor_enemy_entities:
+                    for monster in self.culling.select("outdoor monsters", self.outdoor_enemy_entities):
                         monster.draw_self()
-                    self.outdoor_map["overhead"].draw()
+                    self.culling.draw_layer("outdoor overhead", self.indoor_map.get_outdoor_layer("overhead"))
                 self.outdoor_light_layer.draw(ambient_color=AMBIENT_COLOR)
 
                 # draw the time on hud, if the player isn't in the ship
                 if not arcade.check_for_collision_with_list(self.player, self.ship.tilemap["background"]) and not self.pause_screen_visible:
-                    time_text_x = self.camera.position[0] + SCREEN_WIDTH / 2
-                    time_text_y = self.camera.position[1] + SCREEN_HEIGHT - 32
-                    self.time_hud_sprite.center_x = time_text_x
-                    self.time_hud_sprite.center_y = time_text_y
-                    self.time_hud_sprite.draw()
-                    # Draw the actual time
                     hours, minutes = ms_to_igt(self.delta_time)
-                    arcade.draw_text(f"{hours:02d}:{minutes:02d}", time_text_x - 22, time_text_y - 6,
-                                     arcade.csscolor.ORANGE, 12)
+                    self.hud.use()
+                    self.hud.draw_clock(hours, minutes)
+                    self.camera.use()
 
             else:  # self.gamestate == GAMESTATE_OPTIONS["indoors"] # equivalent expression
 
-                # TODO: Only draw adjacent rooms
-                # calculate adjacent rooms
-                # doing this iteratively causes severe performance drops
-                # for this to be efficient we'd need to do some GPU parallel processing chicanery
                 with self.indoor_light_layer:
-                    # Draw each room individually
-                    # self.indoor_walls.draw()
-                    self.indoor_map.draw_rooms(self.player)
-
-                    for mine in self.mines:
-                        if not mine.get_exploded():
-                            mine.draw()
-
-                    for armed_mine in self.armed_mines:
-                        if armed_mine.get_exploded():
-                            # see if the player is within the explosion distance
-                            distance = euclidean_distance((self.player.center_x, self.player.center_y),
-                                                          (armed_mine.center_x, armed_mine.center_y))
-                            if distance <= armed_mine.get_explosion_distance():
-                                self.player.decrease_health(armed_mine.get_damage())
-                            self.armed_mines.remove(armed_mine)
-                        else:
-                            armed_mine.draw()
+                    # The rooms are baked into static chunks, only the chunks the camera sees are drawn
+                    self.indoor_map.draw_rooms(self.player, self.culling)
+
+                    # Each of these is drawn in one call, exploded mines and lasers that are off are hidden on the
+                    # sprite
+                    self.culling.draw_layer("mines", self.mines)
+                    self.culling.draw_layer("armed mines", self.armed_mines)
 
                     # Draw loot after mines but before turrets
-                    # self.indoor_loot_items.draw()
-                    for item in self.indoor_loot_items:
-                        item.draw_self()
-
-                    # draw bullets and turrets at correct angles
-                    for bullet in self.bullets:
-                        bullet.draw_scaled()
-                    for turret in self.turrets:
-                        if turret.get_turret_laser() != None:
-                            turret.get_turret_laser().draw()
-                        turret.draw_scaled()
+                    self.culling.draw_layer("loot", self.indoor_loot_items)
+
+                    # bullets and turrets carry their angle on the sprite. Lasers can reach across the screen from a
+                    # turret out of view, so aren't culled
+                    self.culling.draw_moving("bullets", self.bullets)
+                    self.turret_lasers.draw()
+                    self.culling.draw_layer("turrets", self.turrets)
 
                     # Draw monsters
-                    for monster in self.indoor_enemy_entities:
+                    for monster in self.culling.select("monsters", self.indoor_enemy_entities):
                         monster.draw_self()
 
                 self.indoor_light_layer.draw(ambient_color=DARK_AMBIENT_COLOR)
@@ -619,34 +625,10 @@ class LethalGame(arcade.Window):
             # Player needs to be drawn in each specific area (orbit, etc), due to lighting and other constraints
             # self.player.draw_self()
 
-            # Draw the hud sprites
-            temp_x = 300
-            for slot in range(1, 5):
-                if slot == self.player.get_current_inv_slot():
-                    sprite = arcade.Sprite("resources/item_sprites/inventory_box.png", scale=0.55)
-                else:
-                    sprite = arcade.Sprite("resources/item_sprites/inventory_box_non_selected.png", scale=0.55)
-                sprite.center_x = self.camera.position[0] + temp_x
-                temp_x += 125
-                sprite.center_y = self.camera.position[1] + 50
-                sprite.alpha = 200
-                sprite.draw()
-
-            for idx, item in enumerate(self.player.get_full_inv()):
-                if item != None:
-                    temp_item = item
-                    temp_item.center_x = self.camera.position[0] + 300 + idx * 125
-                    temp_item.center_y = self.camera.position[1] + 50
-                    # item.set_inventory_texture()
-                    # print(item.center_x, item.center_y)
-                    temp_item.draw_self()
-
-            # Draw text for holding 2 handed item
-            if self.player.get_two_handed():
-                holding_text = arcade.Sprite("resources/player_sprites/full_hands.png", scale=0.67)
-                holding_text.center_x = self.camera.position[0] + SCREEN_WIDTH // 2 - 12
-                holding_text.center_y = self.camera.position[1] + 50
-                holding_text.draw()
+            # Draw the hud sprites, the inventory and whether the player's hands are full
+            self.hud.use()
+            self.hud.draw_inventory(self.player)
+            self.camera.use()
 
             # Draw text from ship
             if self.ship.player_interacting_with_terminal:
@@ -666,31 +648,18 @@ class LethalGame(arcade.Window):
                 # Draw the pause screen
                 self.draw_pause_screen()
             else:
-                # Draw the health and stamina on the camera view
-                stamina_text = f"Stamina: {int(self.player.get_stam())}"
-                weight_text = f"{int(self.player.get_weight())} lb"
-
-                # Calculate the position for objects relative to the camera's position
-                text_x = self.camera.position[0] + 20
-                text_y = self.camera.position[1] + SCREEN_HEIGHT - 30
-
-                # Draw the text at the calculated position
-                # arcade.draw_text(health_text, text_x, text_y, arcade.csscolor.RED, 18)\
-                health_sprite = arcade.Sprite(
-                    f"resources/player_sprites/player_health_sprite_{int(self.player.get_health() // 25)}.png",
-                    scale=0.75)
-                health_sprite.center_x = self.camera.position[0] + 75
-                health_sprite.center_y = self.camera.position[1] + SCREEN_HEIGHT - 80
-                # health_sprite.alpha = 128 # use this to set opacity of objects
-                health_sprite.draw()
-
-                # Stamina representation
-                arcade.draw_text(stamina_text, text_x, text_y - 150, arcade.csscolor.ORANGE, 18)
-                arcade.draw_text(weight_text, text_x, text_y - 180, arcade.csscolor.ORANGE, 18)
+                # Draw the health, stamina and weight on the camera view
+                self.hud.use()
+                self.hud.draw_status(self.player)
+                self.camera.use()
+            if SHOW_CULLING_STATS:
+                self.draw_culling_stats()
         elif self.current_screen == DEATH_SCREEN:
             self.draw_death_screen()
         elif self.current_screen == RESET_SCREEN:
             self.draw_reset_screen()
+        elif self.current_screen == LOADING_SCREEN:
+            self.draw_loading_screen()
         # Pause screen functions different than other screens: overlay on game screen
         # elif self.current_screen == PAUSE_SCREEN:
         #     self.draw_pause_screen()
@@ -876,6 +845,11 @@ class LethalGame(arcade.Window):
         if key == arcade.key.TAB:
             self.pause_screen_visible = not self.pause_screen_visible
 
+        if key == arcade.key.F5:
+            self.quick_save()
+        elif key == arcade.key.F9:
+            self.quick_load()
+
         # self.process_keychange() # since these are already in on_update I think this is fine to not be here
 
     def on_key_release(self, key, modifiers):
@@ -951,6 +925,27 @@ class LethalGame(arcade.Window):
                           self.camera.position[1],
                           self.height + self.camera.position[1])
 
+    def draw_culling_stats(self):
+        """
+        Draw the drawn and culled sprite counts of each layer this frame, in the bottom left
+        """
+        text_x = self.camera.position[0] + 20
+        text_y = self.camera.position[1] + 100
+        drawn, culled = self.culling.get_totals()
+        lines = [f"drawn {drawn}, culled {culled}"]
+        for name, (layer_drawn, layer_culled) in self.culling.counts.items():
+            lines.append(f"{name}: {layer_drawn} / {layer_drawn + layer_culled}")
+        for line in lines:
+            arcade.draw_text(line, text_x, text_y, arcade.csscolor.WHITE, 10)
+            text_y += 14
+
+    def get_view(self):
+        """
+        :return: (left, right, bottom, top) of the area the camera shows, in world coordinates
+        """
+        left, bottom = self.camera.position[0], self.camera.position[1]
+        return left, left + SCREEN_WIDTH, bottom, bottom + SCREEN_HEIGHT
+
     def fix_camera(self):
         # Reset camera object
         self.camera = arcade.Camera(self.width, self.height)
@@ -959,6 +954,10 @@ class LethalGame(arcade.Window):
     def on_update(self,
                   delta_time=1/60): # 60 FPS works well and speeds up interactions to still a reasonable degree, without optimizations
         """Movement and game logic"""
+        # Nothing else updates while the map is being built
+        if self.current_screen == LOADING_SCREEN:
+            self.update_loading()
+            return
         # If paused, allow no movements or other updates
         if self.pause_screen_visible:
             if self.q_pressed:
@@ -971,6 +970,7 @@ class LethalGame(arcade.Window):
         # Process movement based on keys
         # print(self.player.health)
         self.process_keychange()
+        self.lod_scheduler.begin_tick()
 
         self.player.update_player(self.indoor_enemy_entities, self.outdoor_enemy_entities)
 
@@ -984,11 +984,8 @@ class LethalGame(arcade.Window):
                 self.last_terminal_output = variable_output
 
                 # Check if it is a moon - only allow switching while in orbit (handled in ship class)
-                # Load moon data for terminal phrases - done after other inputs to not load every time
-                with open('resources/moons.json', 'r') as f:
-                    data = json.load(f)
                 # check if terminal phrase starts with a moon phrase
-                for obj in data:
+                for obj in game_data.get_moons():
                     if self.last_terminal_output.startswith(obj['terminal_phrase']):
                         self.moon_name = obj["id"]
                     elif self.last_terminal_output.startswith("com"):
@@ -1056,18 +1053,20 @@ class LethalGame(arcade.Window):
             # update spawners inside, and append new spawns to the spawn list
             spawned_monsters = self.indoor_map.update_outdoor_spawners()
             if spawned_monsters is not None:
-                for monster in spawned_monsters:
-                    monster.add_walls(self.ship.get_walls_with_door())
+                # Ship walls are already in the map's outdoor walls
                 self.outdoor_enemy_entities.extend(spawned_monsters)
 
-            # Update the monsters
-            for monster in self.outdoor_enemy_entities:
+            # Update the monsters, further away ones less often
+            for monster in self.lod_scheduler.schedule(self.outdoor_enemy_entities, self.player):
                 monster.update_monster(self.player)
 
-            # TODO: either change update method or don't update while outdoors, laggy
-            # Update the monsters
-            # for monster in self.indoor_enemy_entities:
-            #     monster.update_monster(self.player)
+            # Indoor monsters keep moving while the player is outdoors, using a cheap room to room update every
+            # few ticks instead of the full update
+            self.offscreen_timer -= 1
+            if self.offscreen_timer <= 0:
+                self.offscreen_timer = OFFSCREEN_TICK_RATE
+                for monster in self.indoor_enemy_entities:
+                    monster.update_offscreen(OFFSCREEN_TICK_RATE)
 
             # Interact with the ship
             if self.e_pressed:
@@ -1115,7 +1114,7 @@ class LethalGame(arcade.Window):
                         if self.scrap_sold >= self.quota:
                             self.days_left = 3
                             self.quotas_hit += 1
-                            self.quota = increase_quota(self.quota, self.quotas_hit)
+                            self.quota = increase_quota(self.quota, self.quotas_hit, self.world_seed.get_numpy("quota"))
                             self.scrap_sold = 0
                         else:
                             # Tushar: Game end screen, after a short period restart the game (call init function)
@@ -1132,14 +1131,17 @@ class LethalGame(arcade.Window):
             if spawned_monsters is not None:
                 self.indoor_enemy_entities.extend(spawned_monsters)
 
-            # Update the monsters
-            for monster in self.indoor_enemy_entities:
+            # Update the flow field the monsters chase the player with, then the monsters
+            self.indoor_map.update_flow_field(self.player)
+            for monster in self.lod_scheduler.schedule(self.indoor_enemy_entities, self.player):
                 monster.update_monster(self.player)
 
             # Update player light position
             self.player.player_indoor_light.position = self.player.position
             self.player.player_scan_light.position = self.player.position
         elif self.gamestate == GAMESTATE_OPTIONS["orbit"]:
+            # Start planning the selected moon's map so landing doesn't have to
+            self.pregenerate_map()
             # This method will auto-update physics engine for if door is open or shut
             self.ship_physics_engine = arcade.PhysicsEnginePlatformer(
                 self.player, self.ship.get_walls()
@@ -1156,8 +1158,9 @@ class LethalGame(arcade.Window):
                         # Setup and generate the new map (maybe show a loading screen before this and remove it after done)
                         # Like in game
                         self.snap_camera_to_player()
-                        self.setup(self.moon_name)
-                        self.ship.item_dropship.change_position(self.outdoor_map)
+                        # The map is built over the next frames, behind the loading screen
+                        self.begin_setup(self.moon_name)
+                        self.current_screen = LOADING_SCREEN
                     else:
                         self.gamestate = GAMESTATE_OPTIONS["company"]
                         # Setup the company building
@@ -1169,7 +1172,7 @@ class LethalGame(arcade.Window):
                         self.player.center_y = self.company_starting_position[1]
                         self.snap_camera_to_player()
                         # Clear lists
-                        self.outdoor_loot_items = arcade.SpriteList()
+                        self.outdoor_loot_items = CulledSpriteList()
                         self.sell_list = arcade.SpriteList()
                         self.ship.item_dropship.change_position(self.company_building)
 
@@ -1237,9 +1240,22 @@ class LethalGame(arcade.Window):
                 if not arcade.check_for_collision(self.player, mine):
                     mine.decrease_delay()
 
-            # Iterate through turrets and update
-            for turret in self.turrets:
-                turret.update_status(self.player, self.indoor_walls)
+            # Exploded mines hurt the player if they are close enough, then are removed
+            for armed_mine in [mine for mine in self.armed_mines if mine.get_exploded()]:
+                # see if the player is within the explosion distance
+                distance = euclidean_distance((self.player.center_x, self.player.center_y),
+                                              (armed_mine.center_x, armed_mine.center_y))
+                if distance <= armed_mine.get_explosion_distance():
+                    self.player.decrease_health(armed_mine.get_damage())
+                self.armed_mines.remove(armed_mine)
+
+            # Turrets further away are updated less often. Line of sight from each one due an update to the player
+            # walks the cells between them and stops at the first wall, which beats batching at this many turrets
+            for turret in self.lod_scheduler.schedule(self.turrets, self.player):
+                line_of_sight = self.indoor_wall_index.is_clear_line_of_sight(self.player.center_x,
+                                                                              self.player.center_y,
+                                                                              turret.center_x, turret.center_y)
+                turret.update_status(self.player, self.indoor_wall_index, line_of_sight)
                 # Need to set this as a temporary variable, as these are wiped from turrets memory by getter
                 turret_bullets = turret.get_bullets()
                 if len(turret_bullets) > 0:
@@ -1249,9 +1265,7 @@ class LethalGame(arcade.Window):
             # Check for bullet collisions with wall
             for bullet in self.bullets:
                 bullet.update()
-                bullet_wall_list = arcade.check_for_collision_with_list(
-                    bullet, self.indoor_walls
-                )
+                bullet_wall_list = self.indoor_wall_index.check_for_collision(bullet)
                 if len(bullet_wall_list) > 0:
                     self.bullets.remove(bullet)
 
@@ -1271,6 +1285,9 @@ class LethalGame(arcade.Window):
                 if self.delay_main_enter_exit == 0:
                     self.gamestate = GAMESTATE_OPTIONS["indoors"]
                     self.delay_main_enter_exit = ENTER_EXIT_DELAY
+                    # Back to full updates for the indoor monsters
+                    for monster in self.indoor_enemy_entities:
+                        monster.resume_full_update()
                     # Move player to indoors starting position
                     self.player.center_x = self.indoor_main_position[0] - 64
                     self.player.center_y = self.indoor_main_position[1]
@@ -1352,129 +1369,54 @@ class LethalGame(arcade.Window):
         return check_list
 
     def draw_pause_screen(self):
-        # arcade.draw_rectangle_filled(
-        #     SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2,
-        #     SCREEN_WIDTH, SCREEN_HEIGHT,
-        #     arcade.color.WHITE + (0, 0, 0, 128)
-        # )
-        self.pause_background.center_x = self.camera.position[0] + SCREEN_WIDTH / 2
-        self.pause_background.center_y = self.camera.position[1] + SCREEN_HEIGHT / 2
-        self.pause_background.draw()
-        # arcade.draw_text(
-        #     "Paused", SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2,
-        #     arcade.color.WHITE, font_size=50,
-        #     anchor_x="center", anchor_y="center"
-        # )
-        # Draw controls, also at 50%
-        corner_image = arcade.load_texture("resources/screens/controls.png")
-
-        arcade.draw_texture_rectangle(
-            self.pause_background.center_x + PAUSE_CONTROL_X_SHIFT, self.pause_background.center_y + PAUSE_CONTROL_Y_SHIFT,
-            corner_image.width, corner_image.height,
-            corner_image, alpha=128
-        )
+        # Drawn over the game, which goes on using the game camera
+        self.screens.draw(PAUSE_SCREEN)
+        self.camera.use()
 
-    def draw_death_screen(self):
-        background_texture3 = arcade.load_texture("resources/screens/death.jpeg")
+    def update_loading(self):
+        """
+        Build the next part of the map, landing once it is done
+        """
+        if self.map_builder.step():
+            self.finish_setup()
+            self.ship.item_dropship.change_position(self.outdoor_map)
+            if self.pending_snapshot is not None:
+                finish_restore(self)
+                self.finish_quick_load()
+            else:
+                self.current_screen = GAME_SCREEN
 
-        if self.death_screen_timer is None:
-            self.show_death_screen = True
-            self.death_screen_timer = get_time()
+    def draw_loading_screen(self):
+        progress = self.map_builder.get_progress() if self.map_builder is not None else 1
+        self.screens.get_screen(LOADING_SCREEN).set_progress(progress)
+        self.screens.draw()
 
-        # Check if 5 seconds have elapsed and hide the reset screen
-        if self.death_screen_timer is not None and get_time() - self.death_screen_timer >= 3000:
-            self.death_screen_timer = None
-            self.show_death_screen = False
+    def draw_death_screen(self):
+        # Go back to the game once the death screen has been shown long enough
+        if self.screens.get_screen(DEATH_SCREEN).is_done():
             self.current_screen = GAME_SCREEN
             self.recenter_orbit_background(self.ship.center_x, self.ship.center_y)
-
-        if self.draw_death_screen:
-            arcade.draw_texture_rectangle(
-                self.camera.position[0] + SCREEN_WIDTH // 2, self.camera.position[1] + SCREEN_HEIGHT // 2,
-                SCREEN_WIDTH, SCREEN_HEIGHT,
-                background_texture3
-            )
-
-            # arcade.draw_text(
-            #     "GAME OVER", self.button_x - 15, SCREEN_HEIGHT // 3,
-            #     arcade.color.WHITE, font_size=20
-            # )
+        self.screens.draw()
 
     def draw_reset_screen(self):
-        background_texture2 = arcade.load_texture("resources/screens/reset.jpeg")
-
-        # Set a timer for 5 seconds when the reset screen is shown
-        if self.reset_screen_timer is None:
-            self.show_reset_screen = True
-            self.reset_screen_timer = get_time()
-
-        # Check if 5 seconds have elapsed and hide the reset screen
-        if self.reset_screen_timer is not None and get_time() - self.reset_screen_timer >= 5000:
-            # print("drawing")
-            self.reset_screen_timer = None
-            self.show_reset_screen = False
+        # Go back to the game once the reset screen has been shown long enough
+        if self.screens.get_screen(RESET_SCREEN).is_done():
             self.current_screen = GAME_SCREEN
             self.recenter_orbit_background(self.ship.center_x, self.ship.center_y)
-
-        if self.draw_reset_screen:
-            arcade.draw_texture_rectangle(
-                self.camera.position[0] + SCREEN_WIDTH // 2, self.camera.position[1] + SCREEN_HEIGHT // 2,
-                SCREEN_WIDTH, SCREEN_HEIGHT,
-                background_texture2
-            )
-            arcade.draw_text(
-                "-1 day", self.button_x - 15, SCREEN_HEIGHT // 3,
-                arcade.color.WHITE, font_size=20
-            )
+        self.screens.draw()
 
     def draw_start_screen(self):
-        background_texture = arcade.load_texture("resources/screens/Screen.jpeg")
-
-        # Draw the background
-        arcade.draw_texture_rectangle(
-            SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2,
-            SCREEN_WIDTH, SCREEN_HEIGHT,
-            background_texture
-        )
-
-        if (self.button_x - self.button_width // 2 < self.mouse_x < self.button_x + self.button_width // 2 and
-                self.button_y - self.button_height // 2 < self.mouse_y < self.button_y + self.button_height // 2):
-            arcade.draw_rectangle_filled(
-                self.button_x, self.button_y,
-                self.button_width, self.button_height,
-                arcade.color.GRAY
-            )
-        else:
-            arcade.draw_rectangle_filled(
-                self.button_x, self.button_y,
-                self.button_width, self.button_height,
-                arcade.color.RED
-            )
-
-        arcade.draw_text(
-            "Start", self.button_x - 20, SCREEN_HEIGHT // 3,
-            arcade.color.WHITE, font_size=20
-        )
-        corner_image = arcade.load_texture("resources/screens/controls.png")
-
-        arcade.draw_texture_rectangle(
-            SCREEN_WIDTH - corner_image.width // 2, corner_image.height // 2,
-            corner_image.width, corner_image.height,
-            corner_image
-        )
+        self.screens.draw()
 
     def on_mouse_press(self, x, y, button, modifiers):
         if self.current_screen == START_SCREEN:
-            if (
-                    self.button_x - self.button_width // 2 < x < self.button_x + self.button_width // 2 and
-                    self.button_y - self.button_height // 2 < y < self.button_y + self.button_height // 2
-            ):
+            if self.screens.get_screen(START_SCREEN).is_over_button(x, y):
                 # Transition to the game screen
                 self.current_screen = GAME_SCREEN
 
     def on_mouse_motion(self, x, y, dx, dy):
-        self.mouse_x = x
-        self.mouse_y = y
+        if self.current_screen == START_SCREEN:
+            self.screens.get_screen(START_SCREEN).on_mouse_motion(x, y)
 
     def recenter_orbit_background(self, x, y):
         self.orbit_background.center_x = x
@@ -1505,6 +1447,9 @@ def main():
     Main function
     """
 
+    # Start loading every texture in the background, anything needed first is loaded on demand
+    assets.registry.preload_in_background()
+
     # Initialize game and begin runtime
     window = LethalGame()
     # window.setup("experimentation")
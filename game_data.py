@@ -0,0 +1,177 @@
+"""
+Game data registry. Each json file in resources is parsed once per process, frozen (dicts become read only
+mappings and lists become tuples) so nothing can change the shared copy, and indexed for the lookups the game makes.
+"""
+import json
+import threading
+from types import MappingProxyType
+
+MOONS_FILE = "resources/moons.json"
+ROOMS_FILE = "resources/rooms_data_with_textures.json"
+ITEMS_FILE = "resources/items.json"
+MONSTERS_FILE = "resources/monsters.json"
+
+# Value tiers used in items.json
+ITEM_VALUE_TIERS = ("0", "1", "2")
+
+# Empty frozen mapping, returned for lookups that don't exist
+EMPTY = MappingProxyType({})
+
+
+def freeze(data):
+    """
+    Recursively make parsed json read only
+    :param data: parsed json
+    :return: the same data, with MappingProxyType in place of dict and tuple in place of list
+    """
+    if isinstance(data, dict):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(freeze(value) for value in data)
+    return data
+
+
+def load_json(filename):
+    with open(filename, "r") as file:
+        return freeze(json.load(file))
+
+
+class GameData:
+    def __init__(self):
+        """
+        Nothing is read until it is first needed. The world planner thread and the main thread can both be first, so
+        loading holds a lock, and each file's indexes are set before the attribute the loaded check looks at
+        """
+        self.lock = threading.Lock()
+        self.moons = None
+        self.moons_by_id = None
+        self.room_templates = None
+        self.items = None
+        self.items_by_type = None
+        self.tools_by_phrase = None
+        self.monsters = None
+
+    # Moons
+    def get_moons(self):
+        """
+        :return: tuple of every moon, in file order
+        """
+        if self.moons is None:
+            with self.lock:
+                if self.moons is None:
+                    moons = load_json(MOONS_FILE)
+                    self.moons_by_id = MappingProxyType({moon.get("id"): moon for moon in moons})
+                    self.moons = moons
+        return self.moons
+
+    def get_moon(self, moon_id):
+        """
+        :return: the moon with the id, None if there isn't one
+        """
+        self.get_moons()
+        return self.moons_by_id.get(moon_id)
+
+    # Rooms
+    def load_room_templates(self):
+        if self.room_templates is None:
+            with self.lock:
+                if self.room_templates is None:
+                    self.room_templates = load_json(ROOMS_FILE)["rooms"]
+        return self.room_templates
+
+    def get_room_template(self, room_type):
+        """
+        :param room_type: room bitmask string, e.g. "0110"
+        :return: walls, background and spawn areas for the room type, empty if there isn't one
+        """
+        return self.load_room_templates().get(room_type, EMPTY)
+
+    def get_room_types(self):
+        """
+        :return: tuple of every room bitmask string
+        """
+        return tuple(self.load_room_templates().keys())
+
+    # Items
+    def load_items(self):
+        if self.items is None:
+            with self.lock:
+                if self.items is None:
+                    items = load_json(ITEMS_FILE)
+                    self.items_by_type = MappingProxyType({
+                        (is_two_handed, tier): items["two_handed" if is_two_handed else "one_handed"][tier]
+                        for is_two_handed in (False, True) for tier in ITEM_VALUE_TIERS})
+                    self.tools_by_phrase = MappingProxyType({tool["terminal_phrase"]: tool for tool in items["tools"]})
+                    self.items = items
+
+    def get_items(self, is_two_handed, value_tier):
+        """
+        :param is_two_handed: bool
+        :param value_tier: "0", "1" or "2" (ints are also accepted)
+        :return: tuple of the items of that type
+        """
+        self.load_items()
+        return self.items_by_type[(bool(is_two_handed), str(value_tier))]
+
+    def get_tools(self):
+        """
+        :return: tuple of every tool, in file order
+        """
+        self.load_items()
+        return self.items["tools"]
+
+    def get_tool(self, terminal_phrase):
+        """
+        :return: the tool bought with the phrase, None if there isn't one
+        """
+        self.load_items()
+        return self.tools_by_phrase.get(terminal_phrase)
+
+    # Monsters
+    def get_monster(self, location, monster_type):
+        """
+        :param location: "indoors" or "outdoors"
+        :param monster_type: monster id, e.g. "thumper"
+        :return: the monster's data
+        """
+        if self.monsters is None:
+            with self.lock:
+                if self.monsters is None:
+                    self.monsters = load_json(MONSTERS_FILE)
+        return self.monsters[location][monster_type]
+
+
+# Shared by every module
+registry = GameData()
+
+
+def get_moons():
+    return registry.get_moons()
+
+
+def get_moon(moon_id):
+    return registry.get_moon(moon_id)
+
+
+def get_room_template(room_type):
+    return registry.get_room_template(room_type)
+
+
+def get_room_types():
+    return registry.get_room_types()
+
+
+def get_items(is_two_handed, value_tier):
+    return registry.get_items(is_two_handed, value_tier)
+
+
+def get_tools():
+    return registry.get_tools()
+
+
+def get_tool(terminal_phrase):
+    return registry.get_tool(terminal_phrase)
+
+
+def get_monster(location, monster_type):
+    return registry.get_monster(location, monster_type)
@@ -7,15 +7,16 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 
-def increase_quota(current_quota, quotas_fulfilled):
+def increase_quota(current_quota, quotas_fulfilled, rng=np.random):
     """
     Based off this: https://lethal-company.fandom.com/wiki/Profit_Quota
     :param current_quota: Int, Current quota amount
     :param quotas_fulfilled: Int, quotas fulfilled (This will be 1 after completing the first quota)
+    :param rng: numpy Generator (or the np.random module) to draw from
     :return: Int, next quota
     """
-    randomizer_curve = generate_randomizer_curve(1000)
-    random_choice = np.random.choice(randomizer_curve, 1)
+    randomizer_curve = generate_randomizer_curve(1000, rng)
+    random_choice = rng.choice(randomizer_curve, 1)
     next_quota = current_quota + 100 * (1 + quotas_fulfilled ** 2 / 16) * (random_choice + 1)
 
     # Code to plot the curve
@@ -31,17 +32,18 @@ def increase_quota(current_quota, quotas_fulfilled):
     return int(next_quota[0])
 
 
-def generate_randomizer_curve(size):
+def generate_randomizer_curve(size, rng=np.random):
     """
     This is in effort to emulate the quota randomizer curve. There are other ways to do this,
     but this works well enough
     :param size:
+    :param rng: numpy Generator (or the np.random module) to draw from
     :return:
     """
     # Generate normally distributed random numbers
     mean = 0
     std_dev = 0.1  # Adjust standard deviation as needed
-    rand_nums = np.random.normal(mean, std_dev, size)
+    rand_nums = rng.normal(mean, std_dev, size)
 
     # Adjust range to [-0.5, 0.5]
     rand_nums = np.clip(rand_nums, -0.5, 0.5)
@@ -3,6 +3,7 @@ import random
 import json
 import math
 import utility_functions
+import assets
 
 # half of turret sweep
 ANGLE_FROM_DEFAULT = 89  # To handle an bug with turret rotation
@@ -41,7 +42,7 @@ class Mine(arcade.Sprite):
         :return: self
         """
         # Load texture from mine file
-        self.texture = arcade.load_texture("resources/hazard_sprites/mine.png")
+        self.texture = assets.get_texture("resources/hazard_sprites/mine.png")
         self.center_x = center_x
         self.center_y = center_y
 
@@ -55,6 +56,7 @@ class Mine(arcade.Sprite):
 
     def explode_mine(self):
         self.exploded = True
+        self.visible = False
 
     def get_armed(self):
         return self.armed
@@ -75,7 +77,7 @@ class Mine(arcade.Sprite):
         """
         self.explosion_delay -= 1
         if self.explosion_delay == 0:
-            self.exploded = True
+            self.explode_mine()
 
 
 class Turret(arcade.Sprite):
@@ -110,24 +112,41 @@ class Turret(arcade.Sprite):
         self.bullets = None
 
         self.turret_laser = None
+        # Number of ticks each update stands in for, set by the LOD scheduler when updates are skipped
+        self.time_scale = 1
+        # Update phase within the LOD cadence, given by the LOD scheduler the first time it schedules this
+        self.lod_slot = None
 
-    def setup(self, center_x, center_y, view_direction):
+        # Laser sprite reused every frame, turret_laser points to it while the laser is showing
+        self.laser_sprite = None
+
+    def setup(self, center_x, center_y, view_direction, rng=random, facing_offset=None):
         """
         Load texture and place onto map
+        :param rng: random.Random (or the random module) for the starting direction
+        :param facing_offset: starting direction from the base direction in degrees, random if None
         :return: self
         """
         # Load texture from mine file
-        self.texture = arcade.load_texture("resources/hazard_sprites/turret.png")
+        self.texture = assets.get_texture("resources/hazard_sprites/turret.png")
         self.center_x = center_x
         self.center_y = center_y
         self.base_direction = utility_functions.calculate_direction_vector_negative(view_direction)
         # Initialize starting facing direction to be random direction within 90 degrees
         # from base position
-        self.facing_direction = self.base_direction + random.randint(-ANGLE_FROM_DEFAULT, ANGLE_FROM_DEFAULT)
+        if facing_offset is None:
+            facing_offset = rng.randint(-ANGLE_FROM_DEFAULT, ANGLE_FROM_DEFAULT)
+        self.facing_direction = self.base_direction + facing_offset
         self.lower_end = self.base_direction - ANGLE_FROM_DEFAULT
         self.higher_end = self.base_direction + ANGLE_FROM_DEFAULT
+        # Turrets are drawn from a SpriteList, so the sprite carries the facing direction
+        self.angle = self.facing_direction
 
         self.bullets = arcade.SpriteList()
+        # The laser is made up front and hidden when not showing, so it can stay in the game's laser SpriteList
+        self.laser_sprite = utility_functions.LineSegment(center_x, center_y, center_x + 1, center_y,
+                                                          color=arcade.color.ORANGE, alpha=128)
+        self.laser_sprite.visible = False
 
         return self
 
@@ -146,9 +165,12 @@ class Turret(arcade.Sprite):
         self.bullets = arcade.SpriteList()
         return temp_bullets
 
-    def update_status(self, player, wall_list):
+    def update_status(self, player, wall_list, line_of_sight=None):
         """
         Update turret rotation.
+        :param player: player sprite
+        :param wall_list: walls blocking line of sight, a SpriteList or WallSpatialIndex
+        :param line_of_sight: optional precomputed line of sight to the player (e.g. from the wall index)
         """
         # previous direction, used for bugs with turret movement
         previous_direction = self.facing_direction
@@ -157,20 +179,20 @@ class Turret(arcade.Sprite):
         distance_to_player = utility_functions.euclidean_distance([player.center_x, player.center_y], [self.center_x,
                                                                                                        self.center_y])
         # Determine if there is a clear possible line of sight to the player
-        self.line_of_sight = utility_functions.is_clear_line_of_sight(player.center_x, player.center_y, self.center_x,
-                                                                      self.center_y, wall_list)
+        if line_of_sight is None:
+            line_of_sight = utility_functions.is_clear_line_of_sight(player.center_x, player.center_y, self.center_x,
+                                                                     self.center_y, wall_list)
+        self.line_of_sight = line_of_sight
 
-        # Determine turret laser
-        self.turret_laser = utility_functions.draw_line_until_collision(self.center_x, self.center_y,
-                                                                        self.facing_direction, 1000, wall_list,
-                                                                        alpha=128, step=2)
+        # Laser shows unless turned off below, its end point is found after the turret moves
+        show_laser = True
 
         if self.line_of_sight and utility_functions.is_within_facing_direction([self.center_x, self.center_y], self.facing_direction,
                                                         [player.center_x, player.center_y],
                                                         swath_degrees=FIRING_ANGLE):
             # Check to see if the turret is currently firing, if not then decrease the timer before firing
             if self.delay_firing > 0 and not self.firing:
-                self.delay_firing -= 1
+                self.delay_firing = max(self.delay_firing - self.time_scale, 0)
                 self.aiming = True
             else:
                 self.firing = True
@@ -180,14 +202,18 @@ class Turret(arcade.Sprite):
         # separate if statement so that if turret is looking at player it will continue to fire
         # (or if it has firing duration left)
         if self.firing and self.fire_duration > 0:
-            # Create bullets and add to list if the firing counter is still greater than zero and mod the fire rate
-            if (self.fire_duration - 1) % TIME_BETWEEN_BULLETS == 0:
-                bullet_spread = self.facing_direction + random.uniform(-BULLET_SPREAD, BULLET_SPREAD)
-                self.bullets.append(Bullet().setup(self.center_x, self.center_y, self.damage, bullet_spread))
-                if self.aiming:
-                    self.fire_duration = BULLETS_TO_FIRE
-            # Otherwise, ignore and wait to fire until next bullet
-            self.fire_duration -= 1
+            # Step the firing counter once for each tick this update stands in for, so skipped ticks still fire
+            ticks = self.time_scale
+            while ticks > 0 and self.fire_duration > 0:
+                # Create bullets and add to list if the firing counter is still greater than zero and mod the fire rate
+                if (self.fire_duration - 1) % TIME_BETWEEN_BULLETS == 0:
+                    bullet_spread = self.facing_direction + random.uniform(-BULLET_SPREAD, BULLET_SPREAD)
+                    self.bullets.append(Bullet().setup(self.center_x, self.center_y, self.damage, bullet_spread))
+                    if self.aiming:
+                        self.fire_duration = BULLETS_TO_FIRE
+                # Otherwise, ignore and wait to fire until next bullet
+                self.fire_duration -= 1
+                ticks -= 1
             # Delay current turret movement after player is lost by turret
             self.delaying = True
         # Done firing
@@ -196,9 +222,9 @@ class Turret(arcade.Sprite):
             self.firing = False
             self.fire_duration = BULLETS_TO_FIRE
 
-            self.turret_laser = None
+            show_laser = False
         elif not self.aiming:
-            self.turret_laser = None
+            show_laser = False
 
 
         # Move the turret
@@ -220,9 +246,11 @@ class Turret(arcade.Sprite):
             elif previous_direction - player_vector > 45:
                 player_vector += 360
             if self.facing_direction < player_vector:
-                self.facing_direction += self.rotate_speed * 200 / distance_to_player + self.rotate_speed * distance_to_player / 500
+                self.facing_direction += (self.rotate_speed * 200 / distance_to_player +
+                                          self.rotate_speed * distance_to_player / 500) * self.time_scale
             elif self.facing_direction > player_vector:
-                self.facing_direction -= self.rotate_speed * 200 / distance_to_player + self.rotate_speed * distance_to_player / 500
+                self.facing_direction -= (self.rotate_speed * 200 / distance_to_player +
+                                          self.rotate_speed * distance_to_player / 500) * self.time_scale
 
             if self.facing_direction >= self.higher_end:
                 self.facing_direction = self.higher_end
@@ -237,7 +265,7 @@ class Turret(arcade.Sprite):
         # Basic Turret movement
         elif not self.delaying:
             # Update the current facing direction based on direction and speed
-            self.facing_direction += self.rotate_direction * self.rotate_speed
+            self.facing_direction += self.rotate_direction * self.rotate_speed * self.time_scale
             # if angle is at end, spin
             if self.facing_direction <= self.lower_end or self.facing_direction >= self.higher_end:
                 self.rotate_direction *= -1
@@ -247,22 +275,31 @@ class Turret(arcade.Sprite):
         else:
             # Delaying the turret at the edges of sweep
             if self.delay_at_edges != 0:
-                self.delay_at_edges -= 1
+                self.delay_at_edges = max(self.delay_at_edges - self.time_scale, 0)
             else:
                 self.delaying = False
                 self.delay_at_edges = DELAY_TIME_END_OF_SWEEP
             self.detection_angle = BASE_DETECTION_ANGLE
 
+        # Determine turret laser, a single ray cast which moves the same laser sprite each frame
+        if show_laser:
+            self.laser_sprite = utility_functions.draw_line_until_collision(self.center_x, self.center_y,
+                                                                            self.facing_direction, 1000, wall_list,
+                                                                            alpha=128, line=self.laser_sprite)
+            self.turret_laser = self.laser_sprite
+        else:
+            self.turret_laser = None
+        self.laser_sprite.visible = show_laser
+        self.angle = self.facing_direction
+
     def get_turret_laser(self):
         return self.turret_laser
 
-    def draw_scaled(self):
+    def get_laser_sprite(self):
         """
-        Draw the turret with scaled texture and rotation.
+        :return: the laser's sprite, which is hidden while the laser isn't showing
         """
-
-        arcade.draw_texture_rectangle(self.center_x, self.center_y, self.texture.width * self.scale,
-                                      self.texture.height * self.scale, self.texture, self.facing_direction)
+        return self.laser_sprite
 
 
 class Bullet(arcade.Sprite):
@@ -290,7 +327,9 @@ class Bullet(arcade.Sprite):
         self.center_x = center_x
         self.center_y = center_y
         self.direction = direction
-        self.texture = arcade.load_texture("resources/hazard_sprites/bullet.png")
+        self.texture = assets.get_texture("resources/hazard_sprites/bullet.png")
+        # Bullets are drawn from a SpriteList, so the sprite carries the direction
+        self.angle = direction
 
         return self
 
@@ -308,11 +347,3 @@ class Bullet(arcade.Sprite):
         # Update the bullet's position
         self.center_x += self.change_x
         self.center_y += self.change_y
-
-    def draw_scaled(self):
-        """
-        Draw the turret with scaled texture and rotation.
-        """
-
-        arcade.draw_texture_rectangle(self.center_x, self.center_y, self.texture.width * self.scale,
-                                      self.texture.height * self.scale, self.texture, self.direction)
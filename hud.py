@@ -0,0 +1,165 @@
+"""
+Retained HUD. Every sprite and arcade.Text is made once, in screen coordinates, and only changed when the value it
+shows changes, so a frame where nothing changed just draws what is already there. Draw it with a camera that stays at
+the origin (the HUD's own camera), so nothing has to follow the game camera around.
+"""
+import arcade
+
+import assets
+
+INVENTORY_SLOTS = 4
+INVENTORY_X = 300
+INVENTORY_SPACING = 125
+INVENTORY_Y = 50
+INVENTORY_SCALE = 0.55
+INVENTORY_ALPHA = 200
+SELECTED_BOX = "resources/item_sprites/inventory_box.png"
+NON_SELECTED_BOX = "resources/item_sprites/inventory_box_non_selected.png"
+HEALTH_SPRITE = "resources/player_sprites/player_health_sprite_{}.png"
+HEALTH_PER_SPRITE = 25
+# Distance of the day, quota and clock boxes from the top of the screen
+TOP_BOX_OFFSET = 32
+TOP_BOX_SPACING = 128
+
+
+class HUD:
+    def __init__(self, width, height):
+        """
+        :param width: screen width in pixels
+        :param height: screen height in pixels
+        """
+        self.camera = arcade.Camera(width, height)
+
+        # Inventory boxes, with the item in each slot drawn over them
+        self.boxes = arcade.SpriteList()
+        self.slot_items = arcade.SpriteList()
+        for slot in range(INVENTORY_SLOTS):
+            box = assets.make_sprite(NON_SELECTED_BOX, scale=INVENTORY_SCALE)
+            box.center_x = INVENTORY_X + slot * INVENTORY_SPACING
+            box.center_y = INVENTORY_Y
+            box.alpha = INVENTORY_ALPHA
+            self.boxes.append(box)
+            # Given the item's texture when there is one in the slot
+            item = arcade.Sprite(texture=assets.get_texture(SELECTED_BOX))
+            item.center_x = box.center_x
+            item.center_y = INVENTORY_Y
+            item.visible = False
+            self.slot_items.append(item)
+        self.full_hands = assets.make_sprite("resources/player_sprites/full_hands.png", scale=0.67)
+        self.full_hands.center_x = width // 2 - 12
+        self.full_hands.center_y = INVENTORY_Y
+
+        # Health, stamina and weight in the top left
+        self.health = assets.make_sprite(HEALTH_SPRITE.format(0), scale=0.75)
+        self.health.center_x = 75
+        self.health.center_y = height - 80
+        self.stamina_text = arcade.Text("", 20, height - 180, arcade.csscolor.ORANGE, 18)
+        self.weight_text = arcade.Text("", 20, height - 210, arcade.csscolor.ORANGE, 18)
+
+        # Days left, quota and scrap sold along the top, shown in orbit and at the company
+        top = height - TOP_BOX_OFFSET
+        center = width / 2
+        self.day_box = assets.make_sprite("resources/player_sprites/day_hud_box.png")
+        self.zero_day_box = assets.make_sprite("resources/player_sprites/no_day_left.png")
+        for box in (self.day_box, self.zero_day_box):
+            box.center_x = center - TOP_BOX_SPACING
+            box.center_y = top
+        self.quota_boxes = arcade.SpriteList()
+        for box_x in (center, center + TOP_BOX_SPACING):
+            box = assets.make_sprite("resources/player_sprites/quota_hud_box.png")
+            box.center_x = box_x
+            box.center_y = top
+            self.quota_boxes.append(box)
+        self.days_text = arcade.Text("", center - TOP_BOX_SPACING - 38, top - 6, arcade.csscolor.GREEN, 12)
+        self.quota_text = arcade.Text("", center - 42, top - 6, arcade.csscolor.GREEN, 12)
+        self.sold_text = arcade.Text("", center + TOP_BOX_SPACING - 42, top - 6, arcade.csscolor.GREEN, 12)
+
+        # Clock, shown outside
+        self.clock_box = assets.make_sprite("resources/player_sprites/time_hud_box.png")
+        self.clock_box.center_x = center
+        self.clock_box.center_y = top
+        self.clock_text = arcade.Text("", center - 22, top - 6, arcade.csscolor.ORANGE, 12)
+
+        # What each part currently shows, so it is only changed when the value changes
+        self.selected_slot = None
+        self.inventory = [None] * INVENTORY_SLOTS
+        self.health_tier = None
+        self.days_color = None
+
+    def use(self):
+        """
+        Switch drawing to screen coordinates, switch back to the game camera after
+        """
+        self.camera.use()
+
+    def set_text(self, text, value):
+        if text.text != value:
+            text.text = value
+
+    def update_inventory(self, player):
+        selected = player.get_current_inv_slot()
+        if selected != self.selected_slot:
+            for slot, box in enumerate(self.boxes, 1):
+                box.texture = assets.get_texture(SELECTED_BOX if slot == selected else NON_SELECTED_BOX)
+            self.selected_slot = selected
+
+        for slot, item in enumerate(player.get_full_inv()):
+            if item is self.inventory[slot]:
+                continue
+            slot_item = self.slot_items[slot]
+            if item is None:
+                slot_item.visible = False
+            else:
+                slot_item.texture = item.texture_inventory.texture
+                slot_item.visible = True
+            self.inventory[slot] = item
+
+    def draw_inventory(self, player):
+        """
+        Draw the inventory boxes, the items in them and whether the player's hands are full
+        """
+        self.update_inventory(player)
+        self.boxes.draw()
+        self.slot_items.draw()
+        if player.get_two_handed():
+            self.full_hands.draw()
+
+    def draw_status(self, player):
+        """
+        Draw the player's health, stamina and weight
+        """
+        health_tier = int(player.get_health() // HEALTH_PER_SPRITE)
+        if health_tier != self.health_tier:
+            self.health.texture = assets.get_texture(HEALTH_SPRITE.format(health_tier))
+            self.health_tier = health_tier
+        self.health.draw()
+        self.set_text(self.stamina_text, f"Stamina: {int(player.get_stam())}")
+        self.set_text(self.weight_text, f"{int(player.get_weight())} lb")
+        self.stamina_text.draw()
+        self.weight_text.draw()
+
+    def draw_quota(self, days_left, quota, scrap_sold):
+        """
+        Draw the days left (red once there are none), the quota and how much scrap has been sold towards it
+        """
+        if days_left > 0:
+            self.day_box.draw()
+            color = arcade.csscolor.GREEN
+        else:
+            self.zero_day_box.draw()
+            color = arcade.csscolor.RED
+        if color != self.days_color:
+            self.days_text.color = color
+            self.days_color = color
+        self.set_text(self.days_text, f"{days_left} days left")
+        self.set_text(self.quota_text, f"Quota: {quota}")
+        self.set_text(self.sold_text, f"Sold: {scrap_sold}")
+        self.days_text.draw()
+        self.quota_boxes.draw()
+        self.quota_text.draw()
+        self.sold_text.draw()
+
+    def draw_clock(self, hours, minutes):
+        self.clock_box.draw()
+        self.set_text(self.clock_text, f"{hours:02d}:{minutes:02d}")
+        self.clock_text.draw()
@@ -1,24 +1,21 @@
 import arcade
-import json
 from utility_functions import rotate_hit_box, is_clear_line_of_sight, is_within_facing_direction
+from navigation import SMALL_GRID_SIZE, LARGE_GRID_SIZE
+from spatial_index import WallSpatialIndex
 import math
 import random
-import os
 import time
+import assets
+import game_data
 
-# Tradeoff between grid size and how far the astar algorithm will search
-# Also, much faster at higher grid sizes, wouldn't recommend below 32
-SMALL_GRID_SIZE = 32
-LARGE_GRID_SIZE = 64
 MAX_PATH_LENGTH = 1024
-PLAYING_FIELD_LEFT = 0
-PLAYING_FIELD_BOTTOM = 0
-MAP_SIZE = 5
 SHOW_SLIME_PATHING = False
 SLIME_TIMER = 3
 SLIME_TIMER_DRAIN = 1
 
 TEXTURE_CHANGE_COOLDOWN = 25
+# Off-screen updates move between room centers, so a room is crossed every ROOM_SIZE pixels of movement
+ROOM_SIZE = 256
 
 
 class Enemy(arcade.Sprite):
@@ -32,8 +29,12 @@ class Enemy(arcade.Sprite):
         self.movement_speed = 0
         self.type = None
         self.wall_list = None
-        self.barrier_list_large_grid = None
-        self.barrier_list_small_grid = None
+        # Spatial index over wall_list, used for collision and line of sight checks
+        self.wall_index = None
+        # Line of sight between neighbouring tiles, shared by every monster on the map
+        self.tile_visibility = None
+        # Shared by every monster on the map, only the path is stored per monster
+        self.navigation_grid = None
         self.path_find_timer = 0
         self.damage = 0
         self.damage_cooldown = 0
@@ -51,67 +52,43 @@ class Enemy(arcade.Sprite):
         self.steps = 0
         self.texture_change_cooldown = TEXTURE_CHANGE_COOLDOWN
 
+        # Off-screen simulation, used while the player is outdoors
+        self.offscreen = False
+        self.offscreen_distance = 0
+        self.offscreen_previous_room = None
+
+        # Number of ticks each update stands in for, set by the LOD scheduler when updates are skipped
+        self.time_scale = 1
+        # Update phase within the LOD cadence, given by the LOD scheduler the first time it schedules this
+        self.lod_slot = None
+
+        # Random stream for the monster's choices, the map sets this to its AI stream
+        self.rng = random
+
     # Assigns values to the correct attributes
-    def setup(self, Type, wall_list, x_start, y_start, moon_name):
+    def setup(self, Type, wall_list, x_start, y_start, moon_name, navigation_grid, wall_index=None,
+              tile_visibility=None):
         self.type = Type
         self.wall_list = wall_list
-
-        # Load item data from JSON
-        with open("resources/monsters.json", "r") as file:
-            data_from_json = json.load(file)
-
-            # Assuming that type is the same as the identifiers for monsters.json
-            self.power_level = data_from_json["indoors"][self.type]["power"]
-            self.movement_speed = data_from_json["indoors"][self.type]["movement_speed"]
-            # self.texture = arcade.load_texture(data_from_json["indoors"][self.type]["sprite"])
-            self.texture_name = data_from_json["indoors"][self.type]["sprite"]
-            self.health = data_from_json["indoors"][self.type]["health"]
-            self.damage = data_from_json["indoors"][self.type]["damage"]
-            self.damage_cooldown = data_from_json["indoors"][self.type]["damage_cooldown"]
-            texture_folder = data_from_json["indoors"][self.type]["texture_folder"]
-        file.close()
+        self.wall_index = wall_index if wall_index is not None else WallSpatialIndex(wall_list)
+        self.tile_visibility = tile_visibility
+        self.navigation_grid = navigation_grid
+
+        # Monster data, assuming that type is the same as the identifiers for monsters.json
+        monster_data = game_data.get_monster("indoors", self.type)
+        self.power_level = monster_data["power"]
+        self.movement_speed = monster_data["movement_speed"]
+        # self.texture = arcade.load_texture(monster_data["sprite"])
+        self.texture_name = monster_data["sprite"]
+        self.health = monster_data["health"]
+        self.damage = monster_data["damage"]
+        self.damage_cooldown = monster_data["damage_cooldown"]
+        texture_folder = monster_data["texture_folder"]
 
         # Load textures into texture list
-        texture_files = load_files_from_directory(texture_folder)
-        self.texture_folder = []
-        for filename in texture_files:
-            self.texture_folder.append(arcade.load_texture(filename))
-
-        self.texture = random.choice(self.texture_folder)
-
-        # Get the size of the map using the moon size * tile size
-        with open("resources/moons.json", "r") as file:
-            data_from_json = json.load(file)
-            for moon in data_from_json:
-                if moon.get("id") == moon_name:
-                    map_size = int(float(moon.get("size")) * MAP_SIZE * TILE_SIZE)
-                    break
-
-        # Setup barrier list
-        grid_size_large = LARGE_GRID_SIZE
-        grid_size_small = SMALL_GRID_SIZE
-
-        # Calculate the playing field size
-        playing_field_left_boundary = PLAYING_FIELD_LEFT
-        playing_field_right_boundary = map_size
-        playing_field_top_boundary = map_size
-        playing_field_bottom_boundary = PLAYING_FIELD_BOTTOM
-
-        self.barrier_list_large_grid = arcade.AStarBarrierList(self,
-                                                               self.wall_list,
-                                                               grid_size_large,
-                                                               playing_field_left_boundary,
-                                                               playing_field_right_boundary,
-                                                               playing_field_bottom_boundary,
-                                                               playing_field_top_boundary)
-
-        self.barrier_list_small_grid = arcade.AStarBarrierList(self,
-                                                               self.wall_list,
-                                                               grid_size_small,
-                                                               playing_field_left_boundary,
-                                                               playing_field_right_boundary,
-                                                               playing_field_bottom_boundary,
-                                                               playing_field_top_boundary)
+        self.texture_folder = assets.get_textures_in_directory(texture_folder)
+
+        self.texture = self.rng.choice(self.texture_folder)
 
         # Physics engine used to update monster position
         self.physics_engine = arcade.PhysicsEnginePlatformer(
@@ -126,41 +103,40 @@ class Enemy(arcade.Sprite):
     def add_walls(self, walls):
         # To change the wall list
         self.wall_list.extend(walls)
+        if self.wall_index is not None:
+            self.wall_index.add_walls(walls)
         self.physics_engine = arcade.PhysicsEnginePlatformer(
             self, self.wall_list
         )
         self.physics_engine.gravity_constant = 0
 
-    def setup_outdoor_enemy(self, Type, moon_name, x_start, y_start):
+    def setup_outdoor_enemy(self, Type, moon_name, x_start, y_start, wall_list=None, wall_index=None,
+                            tile_visibility=None):
         self.type = Type
-        # Load item data from JSON
-        with open("resources/monsters.json", "r") as file:
-            data_from_json = json.load(file)
-            # Assuming that type is the same as the identifiers for monsters.json
-            self.power_level = data_from_json["outdoors"][self.type]["power"]
-            self.movement_speed = data_from_json["outdoors"][self.type]["movement_speed"]
-            self.texture = arcade.load_texture(data_from_json["outdoors"][self.type]["sprite"])
-            self.texture_name = data_from_json["outdoors"][self.type]["sprite"]
-            self.health = data_from_json["outdoors"][self.type]["health"]
-            self.damage = data_from_json["outdoors"][self.type]["damage"]
-            self.damage_cooldown = data_from_json["outdoors"][self.type]["damage_cooldown"]
-            texture_folder = data_from_json["outdoors"][self.type]["texture_folder"]
-        file.close()
+        # Monster data, assuming that type is the same as the identifiers for monsters.json
+        monster_data = game_data.get_monster("outdoors", self.type)
+        self.power_level = monster_data["power"]
+        self.movement_speed = monster_data["movement_speed"]
+        self.texture = assets.get_texture(monster_data["sprite"])
+        self.texture_name = monster_data["sprite"]
+        self.health = monster_data["health"]
+        self.damage = monster_data["damage"]
+        self.damage_cooldown = monster_data["damage_cooldown"]
+        texture_folder = monster_data["texture_folder"]
 
         # Load textures into texture list
-        texture_files = load_files_from_directory(texture_folder)
-        self.texture_folder = []
-        for filename in texture_files:
-            self.texture_folder.append(arcade.load_texture(filename))
-
-        # Load moon data from json
-        with open("resources/moons.json", "r") as file:
-            data_from_json = json.load(file)
-            for moon in data_from_json:
-                if moon.get("id") == moon_name:
-                    tilemap_name = moon.get("outdoor_tilemap")
-        tilemap = arcade.Scene.from_tilemap(arcade.load_tilemap(tilemap_name))
-        self.wall_list = tilemap["walls"]
+        self.texture_folder = assets.get_textures_in_directory(texture_folder)
+
+        if wall_list is not None:
+            # Walls shared from the map, which already include the ship
+            self.wall_list = wall_list
+            self.wall_index = wall_index if wall_index is not None else WallSpatialIndex(wall_list)
+            self.tile_visibility = tile_visibility
+        else:
+            tilemap_name = game_data.get_moon(moon_name).get("outdoor_tilemap")
+            tilemap = arcade.Scene.from_tilemap(arcade.load_tilemap(tilemap_name))
+            self.wall_list = tilemap["walls"]
+            self.wall_index = WallSpatialIndex(self.wall_list)
 
         # Physics engine used to update monster position
         self.physics_engine = arcade.PhysicsEnginePlatformer(
@@ -209,18 +185,21 @@ class Enemy(arcade.Sprite):
     # ie line of sight
     # Also moves the enemy along the path
     def pathfinding(self, PlayerCharacter):
-        # Change path depending on: If path length is between
-        if self.path is not None and path_length(self.path) < LARGE_GRID_SIZE * 2:
-            temp_path = arcade.astar_calculate_path(self.position, PlayerCharacter.position,
-                                                    self.barrier_list_small_grid,
-                                                    diagonal_movement=True)
+        # Use the shared flow field towards the player if it reaches this monster, this is O(1)
+        flow_field = self.navigation_grid.flow_field
+        if flow_field.reaches_target(self.position):
+            # Same cell as the player, go straight for them
+            self.path = [self.position, PlayerCharacter.position]
+        elif flow_field.next_step(self.position) is not None:
+            self.path = [self.position, flow_field.next_step(self.position)]
+        # Otherwise fall back to a path search. Change path depending on: If path length is between
+        elif self.path is not None and path_length(self.path) < LARGE_GRID_SIZE * 2:
+            temp_path = self.navigation_grid.find_path(self.position, PlayerCharacter.position, SMALL_GRID_SIZE)
             if temp_path is not None:
                 self.path = temp_path
         elif self.path_find_timer <= 0:
 
-            temp_path = arcade.astar_calculate_path(self.position, PlayerCharacter.position,
-                                                    self.barrier_list_large_grid,
-                                                    diagonal_movement=True)
+            temp_path = self.navigation_grid.find_path(self.position, PlayerCharacter.position, LARGE_GRID_SIZE)
             if temp_path is not None:
                 self.path_find_timer = SLIME_TIMER * (path_length(temp_path) // TILE_SIZE)
             else:
@@ -228,7 +207,7 @@ class Enemy(arcade.Sprite):
 
             if temp_path is not None:
                 self.path = temp_path
-        self.path_find_timer -= SLIME_TIMER_DRAIN
+        self.path_find_timer -= SLIME_TIMER_DRAIN * self.time_scale
 
 
         # sees if the path is valid and if we have not reached the end of the path
@@ -243,14 +222,46 @@ class Enemy(arcade.Sprite):
 
             if next_position:
                 if self.center_y < self.path[1][1]:
-                    self.center_y += min(self.movement_speed, self.path[1][1] - self.center_y)
+                    self.center_y += min(self.movement_speed * self.time_scale, self.path[1][1] - self.center_y)
                 elif self.center_y > self.path[1][1]:
-                    self.center_y -= min(self.movement_speed, self.center_y - self.path[1][1])
+                    self.center_y -= min(self.movement_speed * self.time_scale, self.center_y - self.path[1][1])
 
                 if self.center_x < self.path[1][0]:
-                    self.center_x += min(self.movement_speed, self.path[1][0] - self.center_x)
+                    self.center_x += min(self.movement_speed * self.time_scale, self.path[1][0] - self.center_x)
                 elif self.center_x > self.path[1][0]:
-                    self.center_x -= min(self.movement_speed, self.center_x - self.path[1][0])
+                    self.center_x -= min(self.movement_speed * self.time_scale, self.center_x - self.path[1][0])
+
+    def update_offscreen(self, ticks):
+        """
+        Cheap update used while the player is outdoors. The monster walks from room center to room center on the room
+        graph at its movement speed, with no physics, pathfinding or line of sight
+        :param ticks: number of full updates this update stands in for
+        """
+        if self.health <= 0 or self.navigation_grid is None:
+            return
+        self.offscreen = True
+        self.offscreen_distance += self.movement_speed * ticks
+        while self.offscreen_distance >= ROOM_SIZE:
+            self.offscreen_distance -= ROOM_SIZE
+            room = self.navigation_grid.get_room(self.position)
+            next_room = self.navigation_grid.get_wander_room(room, self.offscreen_previous_room, self.rng)
+            if next_room is None:
+                self.offscreen_distance = 0
+                break
+            self.offscreen_previous_room = room
+            self.center_x, self.center_y = self.navigation_grid.get_room_center(next_room)
+
+    def resume_full_update(self):
+        """
+        Called when the player comes back inside, drops anything the off-screen updates made stale
+        """
+        if not self.offscreen:
+            return
+        self.offscreen = False
+        self.offscreen_distance = 0
+        self.offscreen_previous_room = None
+        self.path = None
+        self.path_find_timer = 0
 
     # Draw method
     def draw_self(self):
@@ -270,7 +281,7 @@ class Enemy(arcade.Sprite):
             self.temp_cooldown = self.damage_cooldown
             player.decrease_health(self.damage)
         # Don't change this 1, the values temp_cooldown has stored is what to use for changing timings
-        self.temp_cooldown -= 1
+        self.temp_cooldown -= self.time_scale
 
         if self.texture_change_cooldown <= 0:
             # Update the slime texture
@@ -278,7 +289,7 @@ class Enemy(arcade.Sprite):
             # Update texture number to length of list
             self.texture_number = (self.texture_number + 1) % len(self.texture_folder)
             self.texture_change_cooldown = TEXTURE_CHANGE_COOLDOWN
-        self.texture_change_cooldown -= 1
+        self.texture_change_cooldown -= self.time_scale
 
     def decrease_health(self, amount):
         self.health -= amount
@@ -299,14 +310,6 @@ def path_length(path):
     return total_length
 
 
-def load_files_from_directory(directory):
-    files = []
-    for filename in sorted(os.listdir(directory)):
-        if os.path.isfile(os.path.join(directory, filename)):
-            files.append(os.path.join(directory, filename))
-    return files
-
-
 # Constants
 THUMPER_ROTATION_RATE = 2
 THUMPER_PASSIVE_FOV = 10
@@ -356,16 +359,17 @@ class Thumper(Enemy):
         self.current_position = None
 
         # texture loading
-        self.sprite_neutral = arcade.load_texture("resources/enemy_sprites/thumper/thumper_neutral.png")
-        self.sprite_walk1 = arcade.load_texture("resources/enemy_sprites/thumper/thumper_1.png")
-        self.sprite_walk2 = arcade.load_texture("resources/enemy_sprites/thumper/thumper_2.png")
+        self.sprite_neutral = assets.get_texture("resources/enemy_sprites/thumper/thumper_neutral.png")
+        self.sprite_walk1 = assets.get_texture("resources/enemy_sprites/thumper/thumper_1.png")
+        self.sprite_walk2 = assets.get_texture("resources/enemy_sprites/thumper/thumper_2.png")
 
         # anim cycle
         self.anim_cycle = [self.sprite_neutral, self.sprite_walk1, self.sprite_neutral, self.sprite_walk2]
         self.texture_change_cooldown = THUMPER_TEXTURE_CHANGE_COOLDOWN
 
-    def setup(self, Type, wall_list, x_start, y_start, moon_name):
-        super().setup(Type, wall_list, x_start, y_start, moon_name)
+    def setup(self, Type, wall_list, x_start, y_start, moon_name, navigation_grid, wall_index=None,
+              tile_visibility=None):
+        super().setup(Type, wall_list, x_start, y_start, moon_name, navigation_grid, wall_index, tile_visibility)
         current_area = (self.center_x // TILE_SIZE, self.center_y // TILE_SIZE)
         # Get the current position based on center of tile - possibly use this in future code based off bug testing
         self.current_position = (current_area[0] * TILE_SIZE + TILE_CENTER_CONST,
@@ -410,16 +414,16 @@ class Thumper(Enemy):
                 self.in_distance = False
             if self.movement_delay > 0:
                 # continue moving past player if in them
-                if arcade.check_for_collision_with_list(self, self.wall_list):
+                if self.wall_index.check_for_collision(self):
                     self.update_rotation(dx, dy)
                     self.speed = 0
                 else:
                     self.update_rotation(dx, dy)
-                    self.center_x += self.speed * math.cos(math.radians(self.rotation))
-                    self.center_y += self.speed * math.sin(math.radians(self.rotation))
+                    self.center_x += self.speed * self.time_scale * math.cos(math.radians(self.rotation))
+                    self.center_y += self.speed * self.time_scale * math.sin(math.radians(self.rotation))
                     if self.speed > 0 and not self.in_distance:
-                        self.speed -= THUMPER_MOVEMENT_SPEED_INCREASE_RATE / THUMPER_COLLISION_MS
-                self.movement_delay -= THUMPER_TARGET_DELAY_RATE
+                        self.speed -= THUMPER_MOVEMENT_SPEED_INCREASE_RATE / THUMPER_COLLISION_MS * self.time_scale
+                self.movement_delay -= THUMPER_TARGET_DELAY_RATE * self.time_scale
             # Aggressive search behavior
             elif not self.look_for_player(player, THUMPER_CHASE_FOV):
                 self.agro_state = THUMPER_AGRO_STATES["search"]
@@ -455,11 +459,11 @@ class Thumper(Enemy):
                     self.speed += THUMPER_MOVEMENT_DELAY_RATE
             else:
                 self.roam()
-                self.agro_meter -= AGRO_DRAIN
+                self.agro_meter -= AGRO_DRAIN * self.time_scale
                 if self.speed > THUMPER_BASE_MOVEMENT_SPEED * 3 / 2:
-                    self.speed -= THUMPER_MOVEMENT_DELAY_RATE
+                    self.speed -= THUMPER_MOVEMENT_DELAY_RATE * self.time_scale
                 else:
-                    self.speed += THUMPER_MOVEMENT_DELAY_RATE
+                    self.speed += THUMPER_MOVEMENT_DELAY_RATE * self.time_scale
 
         # Deal damage to player if interacting with them - regardless of the state the thumper is in
         # Deal damage in cooldowns too, not constantly
@@ -467,20 +471,29 @@ class Thumper(Enemy):
             self.temp_cooldown = self.damage_cooldown
             player.decrease_health(self.damage)
         else:
-            self.temp_cooldown -= 1
+            self.temp_cooldown -= self.time_scale
 
         # TODO: Change the Thumper sprite
 
+    def resume_full_update(self):
+        if self.offscreen:
+            # Whatever it was chasing or heading to is from before the player left, go back to wandering
+            self.agro_state = THUMPER_AGRO_STATES["wander"]
+            self.target_position = None
+            self.visited_areas.clear()
+            self.speed = THUMPER_BASE_MOVEMENT_SPEED
+        super().resume_full_update()
+
     def valid_move(self, next_x, next_y):
         # Create a temporary sprite to represent the Thumper at the next position
-        temp_sprite = arcade.Sprite(self.texture_name)
+        temp_sprite = assets.make_sprite(self.texture_name)
         temp_sprite.center_x = next_x
         temp_sprite.center_y = next_y
         temp_sprite.width = self.width
         temp_sprite.height = self.height
 
         # Check for collision with the obstacle list
-        if arcade.check_for_collision_with_list(temp_sprite, self.wall_list):
+        if self.wall_index.check_for_collision(temp_sprite):
             return False
         else:
             return True
@@ -506,12 +519,12 @@ class Thumper(Enemy):
                 self.update_rotation(dx, dy)
                 # Only move if starting to look in the correct direction - agro FOV will do
                 if self.is_within_facing_direction(self.target_position, swath_degrees=THUMPER_PASSIVE_FOV):
-                    self.center_x += self.speed * math.cos(math.radians(self.rotation))
-                    self.center_y += self.speed * math.sin(math.radians(self.rotation))
+                    self.center_x += self.speed * self.time_scale * math.cos(math.radians(self.rotation))
+                    self.center_y += self.speed * self.time_scale * math.sin(math.radians(self.rotation))
                     return
                 else:
-                    self.center_x += self.speed * math.cos(math.radians(self.rotation)) * THUMPER_COLLISION_MS
-                    self.center_y += self.speed * math.sin(math.radians(self.rotation)) * THUMPER_COLLISION_MS
+                    self.center_x += self.speed * self.time_scale * math.cos(math.radians(self.rotation)) * THUMPER_COLLISION_MS
+                    self.center_y += self.speed * self.time_scale * math.sin(math.radians(self.rotation)) * THUMPER_COLLISION_MS
                     return
 
         valid_neighbors = self.get_neighboring_tiles(current_area)
@@ -519,7 +532,7 @@ class Thumper(Enemy):
         if len(valid_neighbors) == 0:
             self.visited_areas.clear()
             valid_neighbors = self.get_neighboring_tiles(current_area)
-        targeted_position = random.choice(valid_neighbors)
+        targeted_position = self.rng.choice(valid_neighbors)
         self.target_position = targeted_position
         self.visited_areas.add(targeted_position)
 
@@ -530,11 +543,11 @@ class Thumper(Enemy):
         self.update_rotation(dx, dy)
         # Only move if starting to look in the correct direction - agro FOV will do
         if self.is_within_facing_direction(self.target_position, swath_degrees=THUMPER_PASSIVE_FOV):
-            self.center_x += self.speed * math.cos(math.radians(self.rotation))
-            self.center_y += self.speed * math.sin(math.radians(self.rotation))
+            self.center_x += self.speed * self.time_scale * math.cos(math.radians(self.rotation))
+            self.center_y += self.speed * self.time_scale * math.sin(math.radians(self.rotation))
         else:
-            self.center_x += self.speed * math.cos(math.radians(self.rotation)) * THUMPER_COLLISION_MS
-            self.center_y += self.speed * math.sin(math.radians(self.rotation)) * THUMPER_COLLISION_MS
+            self.center_x += self.speed * self.time_scale * math.cos(math.radians(self.rotation)) * THUMPER_COLLISION_MS
+            self.center_y += self.speed * self.time_scale * math.sin(math.radians(self.rotation)) * THUMPER_COLLISION_MS
 
     def get_neighboring_tiles(self, current_tile):
         # Generate the positions of the four neighboring tiles
@@ -553,8 +566,12 @@ class Thumper(Enemy):
                 # determine where the position of the next tile is and decide line of sight
                 potentional_position = (area[0] * TILE_SIZE + TILE_CENTER_CONST,
                                         area[1] * TILE_SIZE + TILE_CENTER_CONST)
-                if is_clear_line_of_sight(scaled_current_tile[0], scaled_current_tile[1], potentional_position[0],
-                                          potentional_position[1], self.wall_list):
+                if self.tile_visibility is not None:
+                    # Precomputed when the map was made
+                    if self.tile_visibility.is_visible(current_tile, area):
+                        valid_neighbors.append(potentional_position)
+                elif is_clear_line_of_sight(scaled_current_tile[0], scaled_current_tile[1], potentional_position[0],
+                                            potentional_position[1], self.wall_index):
                     valid_neighbors.append(potentional_position)
         return valid_neighbors
 
@@ -565,7 +582,7 @@ class Thumper(Enemy):
         target_distance = math.sqrt(dx ** 2 + dy ** 2)
         target_direction = math.degrees(math.atan2(dy, dx))
         # Hitting a wall, turn and stop moving
-        if arcade.check_for_collision_with_list(self, self.wall_list):
+        if self.wall_index.check_for_collision(self):
             self.update_rotation(dx, dy)
             self.speed = 0
         # elif target_distance <= THUMPER_TARGET_DISTANCE:
@@ -577,16 +594,16 @@ class Thumper(Enemy):
         elif self.is_within_facing_direction((player.center_x, player.center_y), swath_degrees=THUMPER_AGRO_FOV * 2):
             # Rotate monster to be towards player
             self.update_rotation(dx, dy)
-            self.center_x += math.cos(math.radians(target_direction)) * self.speed
-            self.center_y += math.sin(math.radians(target_direction)) * self.speed
+            self.center_x += math.cos(math.radians(target_direction)) * self.speed * self.time_scale
+            self.center_y += math.sin(math.radians(target_direction)) * self.speed * self.time_scale
             # Only increase speed while looking at player
-            self.speed += THUMPER_MOVEMENT_SPEED_INCREASE_RATE
+            self.speed += THUMPER_MOVEMENT_SPEED_INCREASE_RATE * self.time_scale
 
         else:
             # No movement, reset velocity
             self.update_rotation(dx, dy)
             if self.speed > 0:
-                self.speed -= THUMPER_MOVEMENT_DELAY_RATE
+                self.speed -= THUMPER_MOVEMENT_DELAY_RATE * self.time_scale
             else:
                 self.speed = 0
 
@@ -595,7 +612,7 @@ class Thumper(Enemy):
     def look_for_player(self, player, swath):
         # Determine if there is a clear possible line of sight to the player
         line_of_sight = is_clear_line_of_sight(player.center_x, player.center_y, self.center_x,
-                                               self.center_y, self.wall_list)
+                                               self.center_y, self.wall_index)
         # If no possible clear line of sight, return
         if not line_of_sight:
             return False
@@ -653,12 +670,16 @@ class Thumper(Enemy):
         else:
             rotation_rate = THUMPER_ROTATION_RATE
 
+        # Skipped ticks turn further, but never more than one tick's turn past the target
+        rotation_rate = min(rotation_rate * self.time_scale,
+                            max(rotation_rate, min(diff_clockwise, diff_counterclockwise)))
+
         # Adjust rotation
         if current_rotation != target_direction:
             self.rotation += rotation_direction * rotation_rate
             # Only update hitbox if rotation has changed
             # Have to create a new sprite each time for the angle is only supplied during creation
-            self.hit_box = rotate_hit_box(arcade.Sprite(self.texture_name).hit_box, self.rotation)
+            self.hit_box = rotate_hit_box(assets.get_hit_box(self.texture_name), self.rotation)
 
     def draw_self(self):
         # Draw the thumper rotated to its movement direction
@@ -14,9 +14,10 @@ I would split up the json into two areas, being one handed and two handed, and t
 """
 
 import arcade
-import json
 import random
 from arcade.experimental.lights import Light, LightLayer
+import assets
+import game_data
 
 
 class Item(arcade.Sprite):
@@ -35,47 +36,42 @@ class Item(arcade.Sprite):
         self.two_handed = None
         self.on_ground = None
         self.rotation = 0
+        # What the item was made from, so it can be made again (see snapshot)
+        self.value_tier = None
+        self.item_index = None
 
-    def setup(self, x_center, y_center, value, is_two_handed):
+    def setup(self, x_center, y_center, value, is_two_handed, rng=random):
         """
         Update the variables based on these
         :param x_center:
         :param y_center:
         :param value:
         :param is_two_handed:
+        :param rng: random.Random (or the random module) used to pick the item and its value
+        """
+        item_index, item_value = pick_item(value, is_two_handed, rng)
+        return self.setup_picked(x_center, y_center, value, is_two_handed, item_index, item_value)
+
+    def setup_picked(self, x_center, y_center, value, is_two_handed, item_index, item_value):
+        """
+        Same as setup, with the item and its value already picked (by pick_item)
+        :param item_index: index of the item in its value range and type
+        :param item_value: the item's value
         """
         self.center_x = x_center
         self.center_y = y_center
 
-        # Determine value range
-        if value == 0:
-            value_range = "0"
-        elif value == 1:
-            value_range = "1"
-        else:
-            value_range = "2"
-
-        # Determine if one-handed or two-handed
-        item_type = "one_handed" if not is_two_handed else "two_handed"
-
-        # Load item data from JSON
-        with open("resources/items.json", "r") as file:
-            data_from_json = json.load(file)
-
-        # Choose random item from the specified range and type
-        items = data_from_json[item_type][value_range]
-        item = random.choice(items)
-
-        # Generate random value within the specified range
-        value_lower, value_upper = item["value_range"]
-        self.value = random.randint(value_lower, value_upper)
+        item = game_data.get_items(is_two_handed, get_value_range(value))[item_index]
+        self.value = item_value
+        self.value_tier = value
+        self.item_index = item_index
 
         # Assign weight and texture (for each of the two textures)
         self.weight = item["weight"]
-        self.texture_map = arcade.Sprite(item["sprite_filename"])
-        self.texture = arcade.load_texture(item["sprite_filename"])
+        self.texture_map = assets.make_sprite(item["sprite_filename"])
+        self.texture = assets.get_texture(item["sprite_filename"])
         self.texture_name = item["sprite_filename"]
-        self.texture_inventory = arcade.Sprite(item["sprite_inventory_filename"])
+        self.texture_inventory = assets.make_sprite(item["sprite_inventory_filename"])
         self.on_ground = True
         self.two_handed = is_two_handed
 
@@ -109,12 +105,38 @@ class Item(arcade.Sprite):
         return self.value
 
 
+def get_value_range(value):
+    """
+    :param value: value tier, 0, 1 or 2 (anything higher counts as 2)
+    :return: the tier's key in items.json
+    """
+    if value == 0:
+        return "0"
+    elif value == 1:
+        return "1"
+    return "2"
+
+
+def pick_item(value, is_two_handed, rng=random):
+    """
+    Choose a random item from the specified range and type, and a random value within the item's range. Only uses
+    the item data, so it can be called off the main thread
+    :return: (index of the item in its value range and type, value)
+    """
+    items = game_data.get_items(is_two_handed, get_value_range(value))
+    item_index = rng.randrange(len(items))
+    value_lower, value_upper = items[item_index]["value_range"]
+    return item_index, rng.randint(value_lower, value_upper)
+
+
 # Different class for tools, as these have no value
 class Tool(Item):
     def __init__(self):
         super().__init__()
         self.value = 0
         self.cost = None
+        # Terminal phrase the tool was made from
+        self.identifier = None
 
     def setup_tool(self, x_center, y_center, id):
         """
@@ -126,30 +148,22 @@ class Tool(Item):
         self.center_x = x_center
         self.center_y = y_center
 
-        # Load item data from JSON
-        with open("resources/items.json", "r") as file:
-            data_from_json = json.load(file)
-
-        # Choose random item from the specified range and type
-        tools = data_from_json["tools"]
-
-        item = tools[0] # default buy first thing in list, if no others are found
-        for tool in tools:
-            if tool["terminal_phrase"] == id:
-                # print(id, tool["terminal_phrase"])
-                item = tool
-                break
+        # Find the tool by its terminal phrase
+        item = game_data.get_tool(id)
+        if item is None:
+            item = game_data.get_tools()[0] # default buy first thing in list, if no others are found
 
         # Get cost of the item
+        self.identifier = item["terminal_phrase"]
         self.cost = item["cost"]
         self.type = item["terminal_print"]
 
         # Assign weight and texture (for each of the two textures)
         self.weight = item["weight"]
-        self.texture_map = arcade.Sprite(item["sprite_filename"])
-        self.texture = arcade.load_texture(item["sprite_filename"])
+        self.texture_map = assets.make_sprite(item["sprite_filename"])
+        self.texture = assets.get_texture(item["sprite_filename"])
         self.texture_name = item["sprite_filename"]
-        self.texture_inventory = arcade.Sprite(item["sprite_inventory_filename"])
+        self.texture_inventory = assets.make_sprite(item["sprite_inventory_filename"])
         self.on_ground = True
         self.two_handed = False
 
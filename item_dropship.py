@@ -1,6 +1,7 @@
 from item import Item, Shovel, Lantern
 import arcade
 import math
+import assets
 
 # Constant for how long the drop is present before leaving again
 TIME_UNTIL_DROP = 1000# 25000
@@ -11,7 +12,7 @@ ROTATION_PER_DROP = 90
 class ItemDropShip(arcade.Sprite):
     def __init__(self):
         super().__init__()
-        self.texture = arcade.load_texture("resources/tilemaps/dropship.png")
+        self.texture = assets.get_texture("resources/tilemaps/dropship.png")
         self.time_until_drop = None
         self.time_before_leave = None
 
@@ -0,0 +1,85 @@
+"""
+Level of detail scheduling for monsters and turrets. Entities are bucketed by how many room tiles they are from the
+player, and buckets further away are updated less often. When an entity is updated its time_scale is set to the number
+of ticks the update stands in for, so movement and timers keep the same overall speed.
+"""
+from map import ROOM_SIZE, X_ROOMS_TO_DRAW, Y_ROOMS_TO_DRAW
+
+LOD_NEAR = "near"  # Same room as the player
+LOD_MID = "mid"  # Within the rooms drawn around the player
+LOD_FAR = "far"  # Everything else
+LOD_BUCKETS = (LOD_NEAR, LOD_MID, LOD_FAR)
+# Ticks between updates for each bucket
+LOD_CADENCES = {LOD_NEAR: 1, LOD_MID: 2, LOD_FAR: 6}
+
+
+class LODScheduler:
+    def __init__(self, cadences=None, room_size=ROOM_SIZE, x_rooms=X_ROOMS_TO_DRAW, y_rooms=Y_ROOMS_TO_DRAW):
+        """
+        :param cadences: dict of bucket: ticks between updates, LOD_CADENCES by default
+        :param room_size: pixel size of a room tile
+        :param x_rooms: rooms either side of the player (horizontally) that count as mid range
+        :param y_rooms: same, vertically
+        """
+        self.cadences = dict(LOD_CADENCES if cadences is None else cadences)
+        self.room_size = room_size
+        self.x_rooms = x_rooms
+        self.y_rooms = y_rooms
+        self.tick = 0
+        # Each entity gets a slot (kept on the entity as lod_slot) so that entities in the same bucket don't all
+        # update on the same tick
+        self.next_slot = 0
+        # Diagnostics, reset every tick
+        self.bucket_counts = {bucket: 0 for bucket in LOD_BUCKETS}
+        self.updated_counts = {bucket: 0 for bucket in LOD_BUCKETS}
+
+    def begin_tick(self):
+        """
+        Call once per on_update, before any schedule calls
+        """
+        self.tick += 1
+        for bucket in LOD_BUCKETS:
+            self.bucket_counts[bucket] = 0
+            self.updated_counts[bucket] = 0
+
+    def get_bucket(self, entity, player):
+        dx = abs(int(entity.center_x // self.room_size) - int(player.center_x // self.room_size))
+        dy = abs(int(entity.center_y // self.room_size) - int(player.center_y // self.room_size))
+        if dx == 0 and dy == 0:
+            return LOD_NEAR
+        if dx <= self.x_rooms and dy <= self.y_rooms:
+            return LOD_MID
+        return LOD_FAR
+
+    def schedule(self, entities, player):
+        """
+        Pick out the entities to update this tick, setting their time_scale
+        :param entities: list of monsters or turrets, each needs center_x, center_y, time_scale and lod_slot attributes
+        :param player: player sprite
+        :return: list of entities due an update
+        """
+        due = []
+        for entity in entities:
+            bucket = self.get_bucket(entity, player)
+            self.bucket_counts[bucket] += 1
+            cadence = self.cadences[bucket]
+            if entity.lod_slot is None:
+                entity.lod_slot = self.next_slot
+                self.next_slot += 1
+            if (self.tick + entity.lod_slot) % cadence == 0:
+                entity.time_scale = cadence
+                self.updated_counts[bucket] += 1
+                due.append(entity)
+        return due
+
+    def get_bucket_counts(self):
+        """
+        :return: dict of bucket: number of entities in it this tick
+        """
+        return dict(self.bucket_counts)
+
+    def get_updated_counts(self):
+        """
+        :return: dict of bucket: number of entities actually updated this tick
+        """
+        return dict(self.updated_counts)
@@ -1,11 +1,19 @@
 import arcade
 import random
-import json
-from room import Room
 import time
+from room import Room, plan_room
 import spawner
 from indoor_enemies import Enemy, Thumper
 from outdoor_enemies import Giant
+from navigation import NavigationGrid, build_room_graph
+from maze import get_maze_generator, maze_to_strings
+from sampling import AliasTable
+from world_seed import WorldSeed, OUTDOOR_SPAWNERS
+from spatial_index import WallSpatialIndex, TileVisibilityTable
+from rendering import ChunkedSpriteLayer, CulledSpriteList, CullingStage
+from tilemap_loader import get_tilemap_parts, add_tilemap_part, get_part_layer_name
+import assets
+import game_data
 
 ROOM_SIZE = 256
 HALF_ROOM_SIZE = 128
@@ -19,10 +27,17 @@ SPAWN_LENGTH = 4
 DEFAULT_COOLDOWN = 1000
 DEFAULT_OUTDOOR_COOLDOWN = DEFAULT_COOLDOWN * 10 # Spawn much later outdoors
 
+# Seconds of map building done per frame when building across frames
+BUILD_BUDGET = 0.004
+# Outdoor tilemap layers drawn each frame, baked into static chunks while building
+OUTDOOR_LAYERS = ("background", "walls", "overhead")
+
 class Map(arcade.Sprite):
-    def __init__(self, moon_id, seed=0):
+    def __init__(self, moon_id, seed=None):
         """
         takes moon_id and optional seed and prepares data for setup
+        :param seed: int or WorldSeed, the same seed and moon always generate the same map. None for a seed from the
+        current time
         """
 
         # initialize seed
@@ -44,6 +59,9 @@ class Map(arcade.Sprite):
         self.monster_data = []
         self.outdoor_monster_data = []
         self.outdoor_tilemap_name = None
+        self.maze_generator = None
+        # WorldPlan the map was built from, kept so the map can be saved (see snapshot)
+        self.plan = None
 
         # track map power
         self.indoor_power_max = 0
@@ -51,131 +69,158 @@ class Map(arcade.Sprite):
         self.outdoor_power_max = 0
         self.outdoor_power_current = 0
 
-        # previous seed: random.randrange(0,2**31-1)
-        self.seed = XORshift(int(time.time()))
-        #self.seed = 0
-
-        random.seed(self.seed)
-
-        # grab all moon_data from file
-        with open("resources/moons.json", 'r') as moon_file:
-            moon_data = json.load(moon_file)
+        # Separate random streams for each part of generation, the shared random module is left alone
+        self.world_seed = seed if isinstance(seed, WorldSeed) else WorldSeed(seed)
+        self.seed = self.world_seed.seed
 
         # grab specific moon data and store it in the object
-        # print(moon_data)
-        for moon in moon_data:
-            if moon.get("id") == moon_id:
-                self.size = moon.get("size") * MAP_SIZE
-                self.moon_name = moon.get("id")
-                self.difficulty = moon.get("difficulty")
-                self.loot_quantity = moon.get("loot-quantity")
-                self.loot_weight = moon.get("loot-weight")
-                self.hazard_quantity = moon.get("hazards")
-                # load outdoor attributes
-                self.outdoor_tilemap_name = moon.get("outdoor_tilemap")
-                self.outdoor_starting_position = moon.get("outdoor_starting_position", [])
-                self.indoor_power_max = moon.get("indoor_power", int)
-                self.outdoor_power_max = moon.get("outdoor_power", int)
-                self.monster_data = moon.get("monster_weight", [])
-                self.indoor_main_entrance_sprite = moon.get("indoor_main_hit_box", {})
-                self.indoor_main_entrance_image = moon.get("indoor_main_image", {})
-                self.outdoor_leave_position = moon.get("outdoor_leave_main_position", [])
-                self.outdoor_monster_data = moon.get("outdoor_weights", [])
-                self.outdoor_max_spawners = moon.get("outdoor_spawners", int)
-
-        self.loot_list = arcade.SpriteList()
+        self.moon_id = moon_id
+        moon = game_data.get_moon(moon_id)
+        if moon is not None:
+            self.size = moon.get("size") * MAP_SIZE
+            self.moon_name = moon.get("id")
+            self.difficulty = moon.get("difficulty")
+            self.loot_quantity = moon.get("loot-quantity")
+            self.loot_weight = moon.get("loot-weight")
+            self.hazard_quantity = moon.get("hazards")
+            # load outdoor attributes
+            self.outdoor_tilemap_name = moon.get("outdoor_tilemap")
+            self.outdoor_starting_position = moon.get("outdoor_starting_position", [])
+            self.indoor_power_max = moon.get("indoor_power", int)
+            self.outdoor_power_max = moon.get("outdoor_power", int)
+            self.monster_data = moon.get("monster_weight", [])
+            self.indoor_main_entrance_sprite = moon.get("indoor_main_hit_box", {})
+            self.indoor_main_entrance_image = moon.get("indoor_main_image", {})
+            self.outdoor_leave_position = moon.get("outdoor_leave_main_position", [])
+            self.outdoor_monster_data = moon.get("outdoor_weights", [])
+            self.outdoor_max_spawners = moon.get("outdoor_spawners", int)
+            # name of the maze generator (see maze.MAZE_GENERATORS), dfs if not given
+            self.maze_generator = moon.get("maze_generator")
+
+        self.loot_list = CulledSpriteList()
         self.wall_list = arcade.SpriteList()
         self.rooms = []
+        # Flat bytearray of room door masks, indexed by x * size + y
+        self.room_bits = None
         self.hazards = arcade.SpriteList()
         self.spawners = arcade.SpriteList()
 
         # Outdoor spawner information
         self.outdoor_spawners = arcade.SpriteList()
-        self.outdoor_tilemap = arcade.Scene.from_tilemap(arcade.load_tilemap(self.outdoor_tilemap_name))
+        # Filled from the moon's tilemap a block of tiles at a time while building
+        self.outdoor_tilemap = arcade.Scene()
 
         self.player_start_x = 0
         self.player_start_y = 0
 
         self.indoor_main_entrance_sprite_to_draw = None
-
-    def setup(self):
+        # Every room background and wall, baked into static chunks once the map is built
+        self.background_layer = ChunkedSpriteLayer()
+        self.wall_layer = ChunkedSpriteLayer()
+        # Outdoor tilemap layer name: ChunkedSpriteLayer, filled along with the tilemap while building
+        self.outdoor_layers = {name: ChunkedSpriteLayer() for name in OUTDOOR_LAYERS}
+
+        # Navigation grid shared by all indoor monsters, built on the first indoor spawn
+        self.navigation_grid = None
+        self.room_graph = None
+        # Walls bucketed by room tile, for collision checks that only need nearby walls
+        self.wall_index = None
+        # Line of sight between neighbouring room tiles, used by roaming monsters
+        self.tile_visibility = None
+
+        # Outdoor walls (tilemap and ship) shared by all outdoor monsters, set up once the ship has landed
+        self.outdoor_wall_list = None
+        self.outdoor_wall_index = None
+        self.outdoor_tile_visibility = None
+
+    def setup(self, plan=None):
         """
         Calculates the map_array, loot spawns, hazard spawns, and enemy spawns
+        :param plan: WorldPlan for this moon and seed, made by plan_world (possibly on another thread). Generated
+        here if not given
         :return:
         """
+        for _ in self.build(plan):
+            pass
+
+    def build(self, plan=None):
+        """
+        Resumable version of setup, a generator that builds the map a tilemap part or room at a time. Drive it with a
+        MapBuilder to spread the work over several frames
+        :param plan: same as setup
+        :return: generator of the fraction of the map built so far (0 to 1)
+        """
+        if plan is None:
+            plan = plan_world(self.moon_id, self.seed)
+        self.plan = plan
 
-        # gen_dfs_maze takes: size and seed
-        player_start, maze = gen_dfs_maze(int(self.size))
-        map = maze
+        # Rooms are generated as flat door masks
+        self.room_bits = plan.room_bits
+        player_start = plan.player_start
 
         # Scale up player_start
         self.player_start_x = player_start[0] * 256 + 128
         self.player_start_y = player_start[1] * 256 + 128
 
         # Set the indoor main entrance collision box
-        temp_sprite = arcade.Sprite(self.indoor_main_entrance_sprite["texture"])
+        temp_sprite = assets.make_sprite(self.indoor_main_entrance_sprite["texture"])
         temp_sprite.center_x = self.indoor_main_entrance_sprite["center_x"] + self.player_start_x
         temp_sprite.center_y = self.indoor_main_entrance_sprite["center_y"] + self.player_start_y
         self.indoor_main_entrance_sprite = temp_sprite
 
-        temp_sprite = arcade.Sprite(self.indoor_main_entrance_image["texture"])
+        temp_sprite = assets.make_sprite(self.indoor_main_entrance_image["texture"])
         temp_sprite.center_x = self.indoor_main_entrance_image["center_x"] + self.player_start_x
         temp_sprite.center_y = self.indoor_main_entrance_image["center_y"] + self.player_start_y
         self.indoor_main_entrance_sprite_to_draw = temp_sprite
         self.wall_list.append(temp_sprite)
 
-        self.mines = arcade.SpriteList()
-        self.turrets = arcade.SpriteList()
+        self.mines = CulledSpriteList()
+        self.turrets = CulledSpriteList()
         self.spawners = arcade.SpriteList()
 
-        # populate the maze with empties
-        for x, column in enumerate(maze):
-            for y, row in enumerate(column):
-                new_room = [column[y], [[0,0,0],[0,0,0]],[0,0],0]
-                map[x][y] = new_room
-
-        # loot generation
-        gen_loot(map, self.loot_quantity, self.loot_weight)
-
-        # hazard generation
-        gen_hazards(map, self.hazard_quantity)
-    
-        # create spawners for monsters
-        gen_spawners(map, self.spawners, self.difficulty, self.monster_data)
-
-        gen_outdoor_spawners(self.outdoor_tilemap["spawn_regions"], self.outdoor_spawners, self.difficulty, self.outdoor_monster_data, self.outdoor_max_spawners)
-
-        # Iterate through each room in the representation of the map and create a room
-        x_temp = HALF_ROOM_SIZE
-        y_temp = HALF_ROOM_SIZE
+        # create spawners for monsters, in the order the rooms use them
+        for cooldowns, monsters in plan.spawners:
+            new_spawner = spawner.Spawner()
+            # Spawners pop from their queues, copy them so the plan is left as generated
+            new_spawner.setup(list(cooldowns), list(monsters))
+            self.spawners.append(new_spawner)
+
+        # The tilemap is made into sprites a part at a time, parts of drawn layers then take another step to be
+        # chunked, then the rooms are built. One extra step for the wall index and visibility table at the end
+        tilemap_parts = get_tilemap_parts(self.outdoor_tilemap_name)
+        chunked_parts = sum(get_part_layer_name(part) in OUTDOOR_LAYERS for part in tilemap_parts)
+        total_steps = len(tilemap_parts) + chunked_parts + sum(len(column) for column in plan.rooms) + 1
+        steps_done = 0
+        yield 0.0
+        for part in tilemap_parts:
+            added = add_tilemap_part(self.outdoor_tilemap, part)
+            steps_done += 1
+            yield steps_done / total_steps
+            if get_part_layer_name(part) in OUTDOOR_LAYERS:
+                for name, sprites in added.items():
+                    self.outdoor_layers[name].extend(sprites)
+                steps_done += 1
+                yield steps_done / total_steps
+
+        # The outdoor spawn regions come from the tilemap, so these are placed here rather than in the plan
+        gen_outdoor_spawners(self.outdoor_tilemap["spawn_regions"], self.outdoor_spawners, self.difficulty, self.outdoor_monster_data, self.outdoor_max_spawners,
+                             self.world_seed.get_random(OUTDOOR_SPAWNERS))
+
+        # Create each room from its plan
         spawn_index = 0
-
-        # Switch y direction
-        for y, col in enumerate(map):
-
-            # row = map[y]
+        for column in plan.rooms:
             room_list = []
-            for x, item in enumerate(col):
-
-                # generate room based on bitwise rep, x, y, to_spawn_loot, etc
-                bitwise_room_rep = item[0]
-                
-                # item list, hazards spawned, spawners spawned
-                items_to_spawn = item[1]
-                hazards = item[2]
-                spawners = item[3]
-
-                # if there is a spawner in the room, set the current spawner and then pass it to the temp_room to update the X/Y
-                if spawners:
+            for room_plan in column:
+
+                # if there is a spawner in the room, pass it to the room to update the X/Y
+                if room_plan.spawner_position is not None:
                     current_spawner = self.spawners[spawn_index]
                     spawn_index += 1
                 else:
                     current_spawner = None
 
-                # Generate room using Room().setup
-                temp_room = Room().setup(bitwise_room_rep, x_temp, y_temp, spawner=current_spawner,
-                                         hazards=hazards, loot_item_spawn_list=items_to_spawn)
-            
+                temp_room = Room().setup_from_plan(room_plan, current_spawner)
+
                 # Update rooms
                 room_list.append(temp_room)
 
@@ -188,13 +233,36 @@ class Map(arcade.Sprite):
                     self.mines.extend(temp_room.get_hazards()[0])
                 if temp_room.get_hazards()[1] != None:
                     self.turrets.extend(temp_room.get_hazards()[1])
-                # Update positions
-                y_temp += ROOM_SIZE
+                # Backgrounds all go under the walls, so they are a separate layer
+                if temp_room.background.texture is not None:
+                    self.background_layer.append(temp_room.background)
+                self.wall_layer.extend(temp_room.get_walls())
+
+                steps_done += 1
+                yield steps_done / total_steps
 
-            y_temp = HALF_ROOM_SIZE
-            x_temp += ROOM_SIZE
             self.rooms.append(room_list)
 
+        # Room level connectivity, used for pathfinding between rooms
+        self.room_graph = build_room_graph(self.rooms)
+        self.wall_index = WallSpatialIndex(self.wall_list, ROOM_SIZE)
+        self.tile_visibility = TileVisibilityTable(self.wall_index, 0, int(self.size) - 1, 0, int(self.size) - 1,
+                                                   ROOM_SIZE)
+        yield 1.0
+
+    def setup_outdoor_navigation(self, ship_walls):
+        """
+        Builds the wall list, wall index and tile visibility used by every outdoor monster. Needs the ship walls, so
+        call once the ship has been moved to the landing position
+        :param ship_walls: SpriteList of the ship walls (with the door)
+        """
+        self.outdoor_wall_list = arcade.SpriteList()
+        self.outdoor_wall_list.extend(self.outdoor_tilemap["walls"])
+        self.outdoor_wall_list.extend(ship_walls)
+        self.outdoor_wall_index = WallSpatialIndex(self.outdoor_wall_list, ROOM_SIZE)
+        bounds = self.outdoor_wall_index.get_cell_bounds() or (0, 0, 0, 0)
+        self.outdoor_tile_visibility = TileVisibilityTable(self.outdoor_wall_index, *bounds, ROOM_SIZE)
+
     def update_spawners(self):
         """
         call map/tile updates
@@ -219,8 +287,7 @@ class Map(arcade.Sprite):
             # [Monster ID, X, Y]
             monster_objects = []
             for monster in spawns:
-                monster_objects.append(monster_type_to_object(monster[0], self.wall_list,
-                                                              monster[1], monster[2], self.moon_name))
+                monster_objects.append(self.make_indoor_monster(monster[0], monster[1], monster[2]))
 
             return monster_objects
         
@@ -250,15 +317,47 @@ class Map(arcade.Sprite):
             # [Monster ID, X, Y]
             monster_objects = []
             for monster in spawns:
-                monster_objects.append(monster_type_to_object(monster[0], self.wall_list,
-                                                              monster[1], monster[2], self.moon_name))
+                monster_objects.append(self.make_outdoor_monster(monster[0], monster[1], monster[2]))
 
             return monster_objects
         return None
 
+    def make_indoor_monster(self, type, x, y):
+        """
+        Create a monster inside the facility, sharing the map's walls, navigation and AI stream
+        """
+        return monster_type_to_object(type, self.wall_list, x, y, self.moon_name, self.get_navigation_grid(),
+                                      self.wall_index, self.tile_visibility, self.world_seed.ai)
+
+    def make_outdoor_monster(self, type, x, y):
+        """
+        Create a monster outside, needs setup_outdoor_navigation to have been called
+        """
+        return monster_type_to_object(type, self.outdoor_wall_list, x, y, self.moon_name,
+                                      wall_index=self.outdoor_wall_index,
+                                      tile_visibility=self.outdoor_tile_visibility, rng=self.world_seed.ai)
+
     def get_walls(self):
         return self.wall_list
 
+    def get_wall_index(self):
+        return self.wall_index
+
+    def get_navigation_grid(self):
+        """
+        The navigation grid is only needed once something spawns indoors, so build it then (once per map)
+        """
+        if self.navigation_grid is None:
+            self.navigation_grid = NavigationGrid(self.wall_list, int(self.size) * ROOM_SIZE, self.room_graph)
+        return self.navigation_grid
+
+    def update_flow_field(self, player):
+        """
+        Keep the shared flow field pointing at the player, only once something has spawned indoors
+        """
+        if self.navigation_grid is not None:
+            self.navigation_grid.update_flow_field(player.position)
+
     def get_loot_list(self):
         return self.loot_list
 
@@ -278,15 +377,30 @@ class Map(arcade.Sprite):
         return self.outdoor_tilemap_name, self.outdoor_starting_position, self.indoor_power_max, self.outdoor_power_max, \
                self.indoor_main_entrance_sprite, self.outdoor_leave_position
 
-    def draw_rooms(self, player):
-        # Draw the rooms around the player
-        rooms = self.get_neighboring_rooms(player)
-        for room in rooms:
-            room.draw_self()
+    def draw_rooms(self, player, culling=None):
+        """
+        Draw the facility, a draw call per visible chunk of each layer however many rooms there are
+        :param culling: CullingStage for the frame, the rooms around the player are drawn if None
+        """
+        if culling is None:
+            x_pos = player.center_x // ROOM_SIZE
+            y_pos = player.center_y // ROOM_SIZE
+            culling = CullingStage()
+            culling.begin_frame(((x_pos - X_ROOMS_TO_DRAW) * ROOM_SIZE, (x_pos + X_ROOMS_TO_DRAW + 1) * ROOM_SIZE,
+                                 (y_pos - Y_ROOMS_TO_DRAW) * ROOM_SIZE, (y_pos + Y_ROOMS_TO_DRAW + 1) * ROOM_SIZE))
+        culling.draw_layer("room backgrounds", self.background_layer)
+        culling.draw_layer("room walls", self.wall_layer)
 
         # Draw main entrance door
         self.indoor_main_entrance_sprite_to_draw.draw()
 
+    def get_outdoor_layer(self, name):
+        """
+        :param name: one of OUTDOOR_LAYERS
+        :return: ChunkedSpriteLayer of the outdoor tilemap's layer, the tiles never move
+        """
+        return self.outdoor_layers[name]
+
     def get_neighboring_rooms(self, player):
         # Find what player room is in
         max_size = int(self.size)
@@ -303,334 +417,257 @@ class Map(arcade.Sprite):
                 rooms.append(y_rooms[y])
         return rooms
 
-def create_grid(map_size):
-    
-    grid = []
-
-    for x in range(map_size):
-        grid.append([])
-        for y in range(map_size):
-            grid[x].append("0000")
-
-    return grid
-
-def gen_dfs_maze(map_size):
-
-    # initialize the maze with the map size
-    maze = create_grid(map_size)
-
-    # assign default starting node
-    start_x = 0
-    start_y = map_size // 2
-    starting_node = [start_x, start_y]
-
-    # initialize lists for maze generation
-    visited_nodes = []
-    visit_queue = []
-    current_node = starting_node
-    
-    # get possible neighbors of a node in room_id notation
-    def get_neighbors(node):
-
-        # get the x/y coordinates
-        x = node[0]
-        y = node[1]
-
-        # assume all transitions possible
-        neighbors = [[x,y+1],[x+1,y],[x,y-1],[x-1,y]]
-
-        # establish bounds
-        if x == 0:
-            neighbors[3] = 0
-        if x == map_size-1:
-            neighbors[1] = 0
-        if y == 0:
-            neighbors[2] = 0
-        if y == map_size-1:
-            neighbors[0] = 0
-
-        # clear all invalid transitions
-        neighbors = [node for node in neighbors if node != 0]
-        
-        return neighbors
-    
-    # calculate the room ID based on node positions
-    def calc_roomid(source_node, dest_node):
-        
-        dir_diff = []
-        paths = []
-        
-        # compute X and Y directional differences
-        dir_diff.append((dest_node[0] - source_node[0]) + 1)
-        dir_diff.append((dest_node[1] - source_node[1]) + 1)
-
-                               #y=-1,y=0,y=1
-        direction_decision = [[[0,0],[1,100],[0,0]], # x = -1
-                              [[10,1000],[0,0],[1000,10]], # x = 0
-                              [[0,0],[100,1],[0,0]]] # x = 1
-
-        paths = direction_decision[dir_diff[0]][dir_diff[1]]
-        
-        return paths
-
-    # while the number of visited nodes is less than the maximum number of cells
-    while len(visited_nodes) < pow(map_size,2):
-
-        # add the current node to the visited nodes list if not already in it
-        if current_node not in visited_nodes: visited_nodes.append(current_node)
-
-        # store current_node coordinates
-        x = current_node[0]
-        y = current_node[1]
+class MapBuilder:
+    def __init__(self, map, plan=None, budget=BUILD_BUDGET):
+        """
+        Builds a map a little at a time, call step once a frame until it returns True
+        :param map: Map to build, setup must not have been called
+        :param plan: WorldPlan to build from, planned on the first step if None
+        :param budget: seconds of building per step
+        """
+        self.map = map
+        self.steps = map.build(plan)
+        self.budget = budget
+        self.progress = 0.0
+        self.done = False
 
-        # get available neighbors, and store their information as an absolute position within the maze
-        neighbors = get_neighbors(current_node)
+    def step(self, budget=None):
+        """
+        Build until the time budget is used up, always building at least one tilemap part or room
+        :param budget: seconds, self.budget if None
+        :return: True once the map is fully built
+        """
+        deadline = time.perf_counter() + (self.budget if budget is None else budget)
+        while not self.done:
+            try:
+                self.progress = next(self.steps)
+            except StopIteration:
+                self.progress = 1.0
+                self.done = True
+            if time.perf_counter() >= deadline:
+                break
+        return self.done
+
+    def get_progress(self):
+        """
+        :return: fraction of the map built, 0 to 1, for a loading screen
+        """
+        return self.progress
 
-        # reset valid neighbors from previous run
-        valid_neighbors = []
+class WorldPlan:
+    def __init__(self, moon_id, seed):
+        """
+        Everything random about a moon's indoor map as plain data, no sprites, so it can be made on a worker thread
+        by plan_world and turned into sprites by Map.setup
+        """
+        self.moon_id = moon_id
+        self.seed = seed
+        self.map_size = 0
+        # [x, y] of the start room
+        self.player_start = None
+        # Flat bytearray of room door masks, indexed by x * map_size + y
+        self.room_bits = None
+        # List of columns of RoomPlans, rooms[x][y]
+        self.rooms = []
+        # (cooldowns, monsters) of each indoor spawner, in the order the rooms use them
+        self.spawners = []
 
-        # if the neighbor has not been visited, add it to the valid_neighbors list
-        for neighbor in neighbors:
-            if neighbor not in visited_nodes: valid_neighbors.append(neighbor)
+def plan_world(moon_id, seed=None):
+    """
+    Generate the layout, loot, hazards and spawners of a moon's map, the same moon and seed always give the same plan
+    :param seed: int seed (or a WorldSeed, only its seed is used so its streams are left alone), None for a seed from
+    the current time
+    :return: WorldPlan
+    """
+    world_seed = WorldSeed(seed.seed if isinstance(seed, WorldSeed) else seed)
+    plan = WorldPlan(moon_id, world_seed.seed)
+    moon = game_data.get_moon(moon_id)
+    map_size = int(moon.get("size") * MAP_SIZE)
+    plan.map_size = map_size
 
-        # randomize valid neighbor ordering
-        random.shuffle(valid_neighbors)
-        
-        # if no neighbors exist, backtrack. 
-        # otherwise, append the current node to the visit queue, and update the paths
-        if len(valid_neighbors) == 0:
-            current_node = visit_queue.pop()
-
-        else: 
-            # append the current node to the visit queue
-            visit_queue.append(current_node)
-
-            # compute relevant paths
-            paths = calc_roomid(current_node,valid_neighbors[0])
-           
-            # update the current node with the outpath
-            maze[x][y] = str(int(maze[x][y]) + int(paths[0])).zfill(4)
-            maze[valid_neighbors[0][0]][valid_neighbors[0][1]] = str(int(maze[valid_neighbors[0][0]][valid_neighbors[0][1]]) + 
-                                                                     int(paths[1])).zfill(4)
-            
-            # update the neighbor node with the inpath
+    # Rooms are generated as flat door masks, the rest of planning uses the room bitmask strings
+    plan.player_start, plan.room_bits = get_maze_generator(moon.get("maze_generator"))(map_size, world_seed.layout)
+    maze = maze_to_strings(plan.room_bits, map_size)
 
-            current_node = valid_neighbors[0]
+    # populate the maze with empties
+    map = [[[room_type, [[0,0,0],[0,0,0]],[0,0],0] for room_type in column] for column in maze]
 
-    # create a doorway for the starting node
-    maze[start_x][start_y] = str(int(maze[start_x][start_y]) + 1).zfill(4)
+    # rooms with at least one door, everything below is placed in these
+    eligible_rooms = get_eligible_rooms(map)
 
-    
-    # generate random hallways
-    total_halls = 0
-    while total_halls < (0.75 * pow(map_size,2)):
-        rand_x = random.randrange(1, map_size-1)
-        rand_y = random.randrange(1, map_size-1)
+    # loot generation
+    gen_loot(map, moon.get("loot-quantity"), moon.get("loot-weight"), eligible_rooms, world_seed.loot)
 
-        dir_population = ["1000","0100","0010","0001"]
-        rand_dirr = random.sample(dir_population,1)
+    # hazard generation
+    gen_hazards(map, moon.get("hazards"), eligible_rooms, world_seed.hazards)
 
-        maze[rand_x][rand_y] = str(int(maze[rand_x][rand_y]) + int(rand_dirr[0])).replace("2","1").zfill(4)
+    # spawners for monsters
+    plan.spawners = plan_spawners(map, moon.get("difficulty"), moon.get("monster_weight", []), eligible_rooms,
+                                  world_seed.spawners)
 
-        total_halls += 1
+    # Plan each room, x and y are the room's position in the map
+    for x, column in enumerate(map):
+        room_column = []
+        for y, item in enumerate(column):
+            # item: room bitmask string, item list, hazards spawned, spawner spawned
+            room_column.append(plan_room(item[0], x * ROOM_SIZE + HALF_ROOM_SIZE, y * ROOM_SIZE + HALF_ROOM_SIZE,
+                                         item[3] == 1, item[2], item[1], world_seed))
+        plan.rooms.append(room_column)
 
+    return plan
 
-    return starting_node, maze
+def get_eligible_rooms(map):
+    """
+    :return: list of (x, y) of every room with at least one door, the only rooms anything is placed in
+    """
+    return [(x, y) for x, column in enumerate(map) for y, room in enumerate(column) if room[0] != "0000"]
 
-def gen_loot(map, loot_quantity, loot_weight):
+def gen_loot(map, loot_quantity, loot_weight, eligible_rooms=None, rng=random):
     """
     randomly generate the loot from the map
     """
 
-    # TODO: Update this to utilize normalized values
-    # to do this with two arrays, sum the two arrays
+    rand_loot_quant = rng.randrange(loot_quantity[0],loot_quantity[1])
 
-    rand_loot_quant = random.randrange(loot_quantity[0],loot_quantity[1])
-    total_loot = 0
+    # rooms loot can go in, picked from directly rather than retrying random rooms
+    if eligible_rooms is None:
+        eligible_rooms = get_eligible_rooms(map)
+    if not eligible_rooms or rand_loot_quant <= 0:
+        return
 
-    # join loot weights and define population
-    loot_population = ['one_low','one_mid','one_high','two_low','two_mid','two_high']
+    # join loot weights, index // 3 is one or two handed (0 or 1), index % 3 is the value (low, mid, high)
     loot_weights_total = loot_weight['one_handed'] + loot_weight['two_handed']
+    loot_table = AliasTable(loot_weights_total)
 
-    # while there is still
-    # loot to be placed, randomly select a room and check it's ID
-    while total_loot < rand_loot_quant:
-        # randomly generate X and Y coordinates within the map bounds
-        rand_x = random.randrange(0,len(map))
-        rand_y = random.randrange(0,len(map))
-
-        # if the room has transitions
-        if map[rand_x][rand_y][0] != "0000":
-            # use the weights to calculate what item will spawn
-            choice = random.choices(loot_population,loot_weights_total)
-            
-            match choice[0]:
-                case 'one_low':
-                    map[rand_x][rand_y][1][0][0] += 1
-                case 'one_mid':
-                    map[rand_x][rand_y][1][0][1] += 1
-                case 'one_high':
-                    map[rand_x][rand_y][1][0][2] += 1
-                case 'two_low':
-                    map[rand_x][rand_y][1][1][0] += 1
-                case 'two_mid':
-                    map[rand_x][rand_y][1][1][1] += 1
-                case 'two_high':
-                    map[rand_x][rand_y][1][1][2] += 1
-
-            total_loot += 1
-
-def gen_hazards(map, hazard_quantity):
+    # place each item in a random room, using the weights to calculate what item will spawn
+    for rand_x, rand_y in rng.choices(eligible_rooms, k=rand_loot_quant):
+        choice = loot_table.sample(rng)
+        map[rand_x][rand_y][1][choice // 3][choice % 3] += 1
+
+def gen_hazards(map, hazard_quantity, eligible_rooms=None, rng=random):
 
     # initialize variables
     max_mines = hazard_quantity['mines'][0]
     max_turrets = hazard_quantity['turrets'][0]
-    total_mines = 0
-    total_turrets = 0
 
-    # while there are still mines and turrets to be placed
-    # randomly select a room and check it's ID
-    while total_mines < max_mines:
-        rand_x = random.randrange(0,len(map))
-        rand_y = random.randrange(0,len(map))
+    if eligible_rooms is None:
+        eligible_rooms = get_eligible_rooms(map)
+    if not eligible_rooms:
+        return
 
-        if map[rand_x][rand_y][0] != "0000":
-            map[rand_x][rand_y][2][0] += 1
-            total_mines += 1
+    # place each mine and turret in a random room, rooms can have more than one
+    for rand_x, rand_y in rng.choices(eligible_rooms, k=max_mines):
+        map[rand_x][rand_y][2][0] += 1
 
-    while total_turrets < max_turrets:
-        rand_x = random.randrange(0,len(map))
-        rand_y = random.randrange(0,len(map))
+    for rand_x, rand_y in rng.choices(eligible_rooms, k=max_turrets):
+        map[rand_x][rand_y][2][1] += 1
 
-        if map[rand_x][rand_y][0] != "0000":
-            map[rand_x][rand_y][2][1] += 1
-            total_turrets += 1
+def get_monster_table(monster_data, location):
+    """
+    :param monster_data: dict of monster: spawn weight, from the moon
+    :param location: "indoors" or "outdoors"
+    :return: list of [monster, power], AliasTable of the spawn weights
+    """
+    monster_pop = [[monster, game_data.get_monster(location, monster).get("power")] for monster in monster_data]
+    return monster_pop, AliasTable(list(monster_data.values()))
 
-def gen_spawners(map, spawners, difficulty, monster_data):
+def plan_spawners(map, difficulty, monster_data, eligible_rooms=None, rng=random):
     """
-    Randomly create the spawners for the map alongside their timers and selected monster
+    Randomly pick the rooms for the spawners alongside their timers and selected monster, marking the rooms in map
+    :return: list of (cooldowns, monsters) for each spawner, in the order they were placed
     """
 
-    max_spawners = len(map)
-    total_spawners = 0
+    # one more spawner than the map is wide, at most one per room
+    if eligible_rooms is None:
+        eligible_rooms = get_eligible_rooms(map)
+    max_spawners = min(len(map) + 1, len(eligible_rooms))
 
-    # grab monster data from the monsters.json file
-    with open("resources/monsters.json", 'r') as monster_file:
-            monster_json = json.load(monster_file)
+    # monsters with their powers, and their spawn chances
+    monster_pop, monster_table = get_monster_table(monster_data, "indoors")
 
-    # normalize monster spawn chances
-    norm_val = sum(monster_data.values())
-    normalized_monsters = {m:mw/norm_val for m, mw in monster_data.items()}
-    monster_pop = list(monster_data.keys())
-    monster_weight = list(normalized_monsters.values())
+    # create spawners, each in a different room
+    planned = []
+    for rand_x, rand_y in rng.sample(eligible_rooms, max_spawners):
 
-    # populate monster data with monster powers
-    for index, monster in enumerate(monster_pop):
-        monster_pop[index] = [monster, monster_json["indoors"][monster].get("power")]
+        monsters = [monster_pop[index] for index in monster_table.sample_k(SPAWN_LENGTH, rng)]
 
-    # create spawners
-    while total_spawners <= max_spawners:
-        rand_x = random.randrange(0, len(map))
-        rand_y = random.randrange(0, len(map))
-        
-        if map[rand_x][rand_y][0] != "0000" and map[rand_x][rand_y][3] != 1:
+        cooldowns = []
 
-            monsters = random.choices(monster_pop,monster_weight,k=SPAWN_LENGTH)
-            
-            cooldowns = []
-            
-            for monster, index in monsters:
-                
-                cooldown = round(calc_cooldown(DEFAULT_COOLDOWN, index, difficulty))
-                cooldowns.append(cooldown)
+        for monster, index in monsters:
 
-            new_spawner = spawner.Spawner()
-            new_spawner.setup(cooldowns,monsters)
-            spawners.append(new_spawner)
+            cooldown = round(calc_cooldown(DEFAULT_COOLDOWN, index, difficulty, rng))
+            cooldowns.append(cooldown)
 
-            # then add a spawner to one of the map tiles
-            map[rand_x][rand_y][3] = 1
-            
-            total_spawners += 1
+        planned.append((cooldowns, monsters))
 
-    return spawners
+        # then add a spawner to one of the map tiles
+        map[rand_x][rand_y][3] = 1
+
+    return planned
 
-def gen_outdoor_spawners(spawn_regions, spawners, difficulty, monster_data, max_spawners):
+def gen_spawners(map, spawners, difficulty, monster_data, eligible_rooms=None, rng=random):
     """
     Randomly create the spawners for the map alongside their timers and selected monster
     """
+    for cooldowns, monsters in plan_spawners(map, difficulty, monster_data, eligible_rooms, rng):
+        new_spawner = spawner.Spawner()
+        new_spawner.setup(cooldowns,monsters)
+        spawners.append(new_spawner)
 
-    total_spawners = 0
-
-    # grab monster data from the monsters.json file
-    with open("resources/monsters.json", 'r') as monster_file:
-        monster_json = json.load(monster_file)
+    return spawners
 
-    # normalize spawn chances and calculate weights
-    norm_val = sum(monster_data.values())
-    normalized_monsters = {m: mw / norm_val for m, mw in monster_data.items()}
-    monster_pop = list(monster_data.keys())
-    monster_weight = list(normalized_monsters.values())
+def gen_outdoor_spawners(spawn_regions, spawners, difficulty, monster_data, max_spawners, rng=random):
+    """
+    Randomly create the spawners for the map alongside their timers and selected monster
+    """
 
-    # populate monster data with monster powers
-    for index, monster in enumerate(monster_pop):
-        monster_pop[index] = [monster, monster_json["outdoors"][monster].get("power")]
+    # monsters with their powers, and their spawn chances
+    monster_pop, monster_table = get_monster_table(monster_data, "outdoors")
 
-    while total_spawners <= max_spawners:
-        rand_x, rand_y = random.choice(spawn_regions).position
+    for _ in range(max_spawners + 1):
+        rand_x, rand_y = rng.choice(spawn_regions).position
 
-        monsters = random.choices(monster_pop, monster_weight, k=SPAWN_LENGTH)
+        monsters = [monster_pop[index] for index in monster_table.sample_k(SPAWN_LENGTH, rng)]
 
         cooldowns = []
             
         for monster, index in monsters:
             
-            cooldown = round(calc_cooldown(DEFAULT_COOLDOWN, index, difficulty))
+            cooldown = round(calc_cooldown(DEFAULT_COOLDOWN, index, difficulty, rng))
             cooldowns.append(cooldown)
 
         new_spawner = spawner.OutdoorSpawner()
         new_spawner.setup_coords(rand_x, rand_y, cooldowns, monsters)
         spawners.append(new_spawner)
 
-        total_spawners += 1
-
     return spawners
 
-def calc_cooldown(c, s, d):
+def calc_cooldown(c, s, d, rng=random):
     """
     calculates the cooldown with variance given the default, the order, and the difficulty.
     c: the default cooldown range
     s: the order within the spawn queue
     d: the difficulty
     """
-    return (2 * ((1 / (s * c)) * c**2) / d * (random.random() + 1))
+    return (2 * ((1 / (s * c)) * c**2) / d * (rng.random() + 1))
 
-def XORshift(state):
-    """
-    This is for producing a random state
-    :param state:
-    :return:
-    """
-    x = state
-    x ^= (x << 13) & 0xFFFFFFFF
-    x ^= (x >> 17) & 0xFFFFFFFF
-    x ^= (x << 5) & 0xFFFFFFFF
-    return x
-
-def monster_type_to_object(type, walls, x, y, moon_name):
+def monster_type_to_object(type, walls, x, y, moon_name, navigation_grid=None, wall_index=None,
+                           tile_visibility=None, rng=random):
    
-    # Create monster based off type
+    # Create monster based off type, rng is used for all of the monster's random choices
     match type:
         case "hygrodere":
             temp_enemy = Enemy()
+            temp_enemy.rng = rng
             # call the setup for the enemy
-            temp_enemy.setup(type, walls, x, y, moon_name)
+            temp_enemy.setup(type, walls, x, y, moon_name, navigation_grid, wall_index, tile_visibility)
         case "thumper":
             temp_enemy = Thumper()
-            temp_enemy.setup(type, walls, x, y, moon_name)
+            temp_enemy.rng = rng
+            temp_enemy.setup(type, walls, x, y, moon_name, navigation_grid, wall_index, tile_visibility)
         case "giant":
             temp_enemy = Giant()
-            temp_enemy.setup_outdoor_enemy(type, moon_name, x, y)
+            temp_enemy.rng = rng
+            temp_enemy.setup_outdoor_enemy(type, moon_name, x, y, walls, wall_index, tile_visibility)
 
     return temp_enemy
-
@@ -0,0 +1,358 @@
+"""
+Indoor maze generation. Rooms are stored as 4 bit door masks (up, right, down, left, the same bits as the room
+bitmask strings, e.g. 0b0101 is "0101") in a flat bytearray indexed by x * map_size + y, with a bytearray of visited
+flags, so every step of generation is constant time.
+"""
+import random
+
+# Doors in the room bitmask, same order as the room type strings ("1000" has a door going up)
+DOOR_UP = 0b1000
+DOOR_RIGHT = 0b0100
+DOOR_DOWN = 0b0010
+DOOR_LEFT = 0b0001
+# Order neighbours are considered in, (door, x step, y step, door on the other side)
+MAZE_DIRECTIONS = ((DOOR_UP, 0, 1, DOOR_DOWN),
+                   (DOOR_RIGHT, 1, 0, DOOR_LEFT),
+                   (DOOR_DOWN, 0, -1, DOOR_UP),
+                   (DOOR_LEFT, -1, 0, DOOR_RIGHT))
+# Doors a random hallway can add
+HALLWAY_DOORS = (DOOR_UP, DOOR_RIGHT, DOOR_DOWN, DOOR_LEFT)
+# Number of random hallways, as a fraction of the number of rooms
+HALLWAY_FRACTION = 0.75
+
+
+def room_type_string(bits):
+    """
+    :param bits: 4 bit door mask
+    :return: room bitmask string used by the room json, e.g. "0101"
+    """
+    return format(bits, "04b")
+
+
+def room_type_bits(room_type):
+    """
+    :param room_type: room bitmask string, e.g. "0101"
+    :return: 4 bit door mask
+    """
+    return int(room_type, 2)
+
+
+def maze_to_strings(rooms, map_size):
+    """
+    Compatibility shim for code that uses the nested list of room bitmask strings
+    :param rooms: flat bytearray of door masks
+    :return: list of columns, maze[x][y] is the room bitmask string
+    """
+    return [[room_type_string(rooms[x * map_size + y]) for y in range(map_size)] for x in range(map_size)]
+
+
+def get_neighbors(width, height):
+    """
+    :return: list indexed by cell (x * height + y) of tuples of (door, neighbour cell, door on the other side)
+    """
+    neighbors = []
+    for x in range(width):
+        for y in range(height):
+            cell_neighbors = []
+            for door, dx, dy, opposite in MAZE_DIRECTIONS:
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    cell_neighbors.append((door, (x + dx) * height + y + dy, opposite))
+            neighbors.append(tuple(cell_neighbors))
+    return neighbors
+
+
+def add_entrance_and_hallways(rooms, map_size, start_x, start_y, rng=random):
+    """
+    Entrance on the left of the start room, then random extra hallways, shared by every generator
+    """
+    # create a doorway for the starting node
+    rooms[start_x * map_size + start_y] |= DOOR_LEFT
+
+    # generate random hallways, these only open the door on the chosen room's side
+    total_halls = 0
+    while total_halls < HALLWAY_FRACTION * map_size * map_size:
+        rand_x = rng.randrange(1, map_size - 1)
+        rand_y = rng.randrange(1, map_size - 1)
+        rooms[rand_x * map_size + rand_y] |= rng.sample(HALLWAY_DOORS, 1)[0]
+        total_halls += 1
+
+
+def gen_maze(map_size, rng=random):
+    """
+    Depth first search maze, with an entrance on the left of the start room and then random extra hallways
+    :param map_size: rooms along each side
+    :param rng: random.Random (or the random module) to generate with
+    :return: [start x, start y], flat bytearray of door masks
+    """
+    room_count = map_size * map_size
+    rooms = bytearray(room_count)
+    visited = bytearray(room_count)
+
+    # assign default starting node
+    start_x = 0
+    start_y = map_size // 2
+    current = start_x * map_size + start_y
+    visited[current] = 1
+    visited_count = 1
+    visit_stack = []
+
+    while visited_count < room_count:
+        x, y = divmod(current, map_size)
+
+        # unvisited neighbours, in direction order
+        valid_neighbors = []
+        for door, dx, dy, opposite in MAZE_DIRECTIONS:
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < map_size and 0 <= ny < map_size and not visited[nx * map_size + ny]:
+                valid_neighbors.append((door, nx * map_size + ny, opposite))
+
+        # randomize valid neighbor ordering
+        rng.shuffle(valid_neighbors)
+
+        # if no neighbors exist, backtrack, otherwise open a door both ways and move to the neighbour
+        if len(valid_neighbors) == 0:
+            current = visit_stack.pop()
+        else:
+            visit_stack.append(current)
+            door, neighbor, opposite = valid_neighbors[0]
+            rooms[current] |= door
+            rooms[neighbor] |= opposite
+            visited[neighbor] = 1
+            visited_count += 1
+            current = neighbor
+
+    add_entrance_and_hallways(rooms, map_size, start_x, start_y, rng)
+    return [start_x, start_y], rooms
+
+
+def carve_aldous_broder(rooms, width, height, rng=random):
+    """
+    Random walk over the grid, opening a door whenever it steps into a room it hasn't been to. Gives a uniform
+    spanning tree but wastes a lot of steps on big maps
+    """
+    neighbors = get_neighbors(width, height)
+    visited = bytearray(width * height)
+    current = rng.randrange(width * height)
+    visited[current] = 1
+    remaining = width * height - 1
+    while remaining > 0:
+        door, neighbor, opposite = rng.choice(neighbors[current])
+        if not visited[neighbor]:
+            rooms[current] |= door
+            rooms[neighbor] |= opposite
+            visited[neighbor] = 1
+            remaining -= 1
+        current = neighbor
+    return rooms
+
+
+def carve_wilson(rooms, width, height, rng=random):
+    """
+    Wilson's algorithm, loop erased random walks from every room not in the maze yet until they reach it. Gives the
+    same uniform spanning tree as Aldous-Broder in far fewer steps
+    """
+    neighbors = get_neighbors(width, height)
+    room_count = width * height
+    in_maze = bytearray(room_count)
+    # Index into neighbors[cell] of the last step taken out of each cell, overwriting it erases loops for free
+    walk_step = bytearray(room_count)
+    in_maze[rng.randrange(room_count)] = 1
+    for start in range(room_count):
+        if in_maze[start]:
+            continue
+        # walk until the maze is reached
+        current = start
+        while not in_maze[current]:
+            step = rng.randrange(len(neighbors[current]))
+            walk_step[current] = step
+            current = neighbors[current][step][1]
+        # add the loop erased walk to the maze
+        current = start
+        while not in_maze[current]:
+            door, neighbor, opposite = neighbors[current][walk_step[current]]
+            rooms[current] |= door
+            rooms[neighbor] |= opposite
+            in_maze[current] = 1
+            current = neighbor
+    return rooms
+
+
+def carve_kruskal(rooms, width, height, rng=random):
+    """
+    Kruskal's algorithm, every wall in a random order, opening it if the rooms either side aren't connected yet.
+    Connectivity is tracked with union-find
+    """
+    # Each wall once, as its up and right doors
+    edges = []
+    for x in range(width):
+        for y in range(height):
+            cell = x * height + y
+            if y + 1 < height:
+                edges.append((cell, cell + 1, DOOR_UP, DOOR_DOWN))
+            if x + 1 < width:
+                edges.append((cell, cell + height, DOOR_RIGHT, DOOR_LEFT))
+    rng.shuffle(edges)
+
+    parent = list(range(width * height))
+    size = [1] * (width * height)
+
+    def find(cell):
+        # path halving
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    joined = 0
+    for cell, neighbor, door, opposite in edges:
+        root = find(cell)
+        neighbor_root = find(neighbor)
+        if root == neighbor_root:
+            continue
+        # union by size
+        if size[root] < size[neighbor_root]:
+            root, neighbor_root = neighbor_root, root
+        parent[neighbor_root] = root
+        size[root] += size[neighbor_root]
+        rooms[cell] |= door
+        rooms[neighbor] |= opposite
+        joined += 1
+        if joined == width * height - 1:
+            break
+    return rooms
+
+
+def gen_spanning_tree_maze(map_size, carve, rng=random):
+    """
+    Maze from a spanning tree carving function, with the same entrance and hallways as the DFS maze
+    :param carve: function(rooms, width, height, rng) that opens doors in rooms
+    """
+    rooms = carve(bytearray(map_size * map_size), map_size, map_size, rng)
+    start_x = 0
+    start_y = map_size // 2
+    add_entrance_and_hallways(rooms, map_size, start_x, start_y, rng)
+    return [start_x, start_y], rooms
+
+
+def gen_aldous_broder_maze(map_size, rng=random):
+    return gen_spanning_tree_maze(map_size, carve_aldous_broder, rng)
+
+
+def gen_wilson_maze(map_size, rng=random):
+    return gen_spanning_tree_maze(map_size, carve_wilson, rng)
+
+
+def gen_kruskal_maze(map_size, rng=random):
+    return gen_spanning_tree_maze(map_size, carve_kruskal, rng)
+
+
+# Chunk stitching
+CHUNK_SIZE = 5
+# Prebuilt variants for each chunk shape, each can also be mirrored either way
+CHUNK_VARIANTS = 8
+# Chunks are built from their own generator so the same chunks are used whatever the map seed
+CHUNK_LIBRARY_SEED = 0
+# Door mask with left/right swapped, and with up/down swapped
+MIRROR_X = bytes(((bits & (DOOR_UP | DOOR_DOWN)) | (DOOR_LEFT if bits & DOOR_RIGHT else 0) |
+                  (DOOR_RIGHT if bits & DOOR_LEFT else 0)) for bits in range(16))
+MIRROR_Y = bytes(((bits & (DOOR_LEFT | DOOR_RIGHT)) | (DOOR_DOWN if bits & DOOR_UP else 0) |
+                  (DOOR_UP if bits & DOOR_DOWN else 0)) for bits in range(16))
+
+# (width, height): tuple of chunk door masks, each a flat bytes indexed by x * height + y
+chunk_library = {}
+
+
+def get_chunks(width, height):
+    """
+    :return: the prebuilt chunks for the shape, built the first time they are needed
+    """
+    chunks = chunk_library.get((width, height))
+    if chunks is None:
+        rng = random.Random(CHUNK_LIBRARY_SEED)
+        chunks = tuple(bytes(carve_kruskal(bytearray(width * height), width, height, rng))
+                       for _ in range(CHUNK_VARIANTS))
+        chunk_library[(width, height)] = chunks
+    return chunks
+
+
+def gen_chunk_maze(map_size, rng=random, chunk_size=CHUNK_SIZE):
+    """
+    Maze stitched together from prebuilt chunks. The chunks are joined by a spanning tree over the chunk grid, with
+    one door opened at a random point along each joined edge, so the maze stays fully connected
+    """
+    rooms = bytearray(map_size * map_size)
+    chunks_across = (map_size + chunk_size - 1) // chunk_size
+
+    # copy a random prebuilt chunk, randomly mirrored, into each chunk of the map
+    for chunk_x in range(chunks_across):
+        for chunk_y in range(chunks_across):
+            left = chunk_x * chunk_size
+            bottom = chunk_y * chunk_size
+            width = min(chunk_size, map_size - left)
+            height = min(chunk_size, map_size - bottom)
+            chunk = rng.choice(get_chunks(width, height))
+            mirror_x = rng.random() < 0.5
+            mirror_y = rng.random() < 0.5
+            for x in range(width):
+                source_x = width - 1 - x if mirror_x else x
+                for y in range(height):
+                    bits = chunk[source_x * height + (height - 1 - y if mirror_y else y)]
+                    if mirror_x:
+                        bits = MIRROR_X[bits]
+                    if mirror_y:
+                        bits = MIRROR_Y[bits]
+                    rooms[(left + x) * map_size + bottom + y] = bits
+
+    # join the chunks, a door in the chunk grid's spanning tree is a door between the chunks at a random point
+    chunk_doors = carve_kruskal(bytearray(chunks_across * chunks_across), chunks_across, chunks_across, rng)
+    for chunk_x in range(chunks_across):
+        for chunk_y in range(chunks_across):
+            bits = chunk_doors[chunk_x * chunks_across + chunk_y]
+            if bits & DOOR_RIGHT:
+                x = chunk_x * chunk_size + chunk_size - 1
+                y = rng.randrange(chunk_y * chunk_size, min((chunk_y + 1) * chunk_size, map_size))
+                rooms[x * map_size + y] |= DOOR_RIGHT
+                rooms[(x + 1) * map_size + y] |= DOOR_LEFT
+            if bits & DOOR_UP:
+                x = rng.randrange(chunk_x * chunk_size, min((chunk_x + 1) * chunk_size, map_size))
+                y = chunk_y * chunk_size + chunk_size - 1
+                rooms[x * map_size + y] |= DOOR_UP
+                rooms[x * map_size + y + 1] |= DOOR_DOWN
+
+    start_x = 0
+    start_y = map_size // 2
+    add_entrance_and_hallways(rooms, map_size, start_x, start_y, rng)
+    return [start_x, start_y], rooms
+
+
+# Name used for "maze_generator" in moons.json: function(map_size, rng) returning [start x, start y], door masks
+MAZE_GENERATORS = {
+    "dfs": gen_maze,
+    "aldous_broder": gen_aldous_broder_maze,
+    "wilson": gen_wilson_maze,
+    "kruskal": gen_kruskal_maze,
+    "chunks": gen_chunk_maze,
+}
+DEFAULT_MAZE_GENERATOR = "dfs"
+
+
+def get_maze_generator(name=None):
+    """
+    :param name: key in MAZE_GENERATORS, None for the default
+    :return: the generator function
+    """
+    if name is None:
+        name = DEFAULT_MAZE_GENERATOR
+    if name not in MAZE_GENERATORS:
+        raise ValueError("Unknown maze generator " + str(name) + ", expected one of " + ", ".join(MAZE_GENERATORS))
+    return MAZE_GENERATORS[name]
+
+
+def gen_dfs_maze(map_size, rng=random):
+    """
+    Same as gen_maze, with the maze as a nested list of room bitmask strings
+    :return: [start x, start y], list of columns where maze[x][y] is the room bitmask string
+    """
+    starting_node, rooms = gen_maze(map_size, rng)
+    return starting_node, maze_to_strings(rooms, map_size)
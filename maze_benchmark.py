@@ -0,0 +1,57 @@
+"""
+Throughput and memory of each maze generator, run with:
+    python maze_benchmark.py [generator ...] [--sizes 5 10 25 50 100] [--repeats 3]
+Rooms/sec is the best of the repeats, memory is the peak traced by tracemalloc while generating one maze.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from maze import MAZE_GENERATORS
+
+DEFAULT_SIZES = [5, 10, 25, 50, 100]
+DEFAULT_REPEATS = 3
+
+
+def benchmark(generator, map_size, repeats=DEFAULT_REPEATS, seed=0):
+    """
+    :return: (rooms per second, peak bytes allocated)
+    """
+    best = None
+    for repeat in range(repeats):
+        random.seed(seed + repeat)
+        start = time.perf_counter()
+        generator(map_size)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    random.seed(seed)
+    tracemalloc.start()
+    generator(map_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return map_size * map_size / max(best, 1e-9), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the maze generators")
+    parser.add_argument("generators", nargs="*", default=list(MAZE_GENERATORS),
+                        help="any of " + ", ".join(MAZE_GENERATORS) + ", all of them by default")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args()
+    for name in args.generators:
+        if name not in MAZE_GENERATORS:
+            parser.error("unknown generator " + name)
+
+    print(f"{'generator':<15}{'size':>6}{'rooms':>8}{'rooms/sec':>14}{'peak KiB':>11}")
+    for name in args.generators:
+        for map_size in args.sizes:
+            rooms_per_second, peak = benchmark(MAZE_GENERATORS[name], map_size, args.repeats)
+            print(f"{name:<15}{map_size:>6}{map_size * map_size:>8}{rooms_per_second:>14,.0f}{peak / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
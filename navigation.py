@@ -0,0 +1,355 @@
+"""
+Navigation data for indoor monsters. This is built once per map and shared (read only) by every monster,
+so spawning a monster doesn't have to rasterise the whole facility again.
+"""
+import heapq
+import math
+import random
+from collections import deque
+
+import arcade
+
+import assets
+from maze import DOOR_UP, DOOR_RIGHT, DOOR_DOWN, DOOR_LEFT
+
+# Tradeoff between grid size and how far the astar algorithm will search
+# Also, much faster at higher grid sizes, wouldn't recommend below 32
+SMALL_GRID_SIZE = 32
+LARGE_GRID_SIZE = 64
+PLAYING_FIELD_LEFT = 0
+PLAYING_FIELD_BOTTOM = 0
+ROOM_SIZE = 256
+HALF_ROOM_SIZE = 128
+
+# (door, dx, dy, door needed on the other side)
+ROOM_DIRECTIONS = [(DOOR_UP, 0, 1, DOOR_DOWN),
+                   (DOOR_RIGHT, 1, 0, DOOR_LEFT),
+                   (DOOR_DOWN, 0, -1, DOOR_UP),
+                   (DOOR_LEFT, -1, 0, DOOR_RIGHT)]
+
+# (dx, dy, cost) of each move the fine grained A* can make
+GRID_STEPS = [(0, 1, 1), (1, 0, 1), (0, -1, 1), (-1, 0, 1),
+              (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2))]
+
+# Flow field towards the player, shared by every chasing monster
+FLOW_FIELD_GRID_SIZE = LARGE_GRID_SIZE
+# Ticks between flow field recalculations (only recalculated if the player changed cell)
+FLOW_FIELD_TIMER = 10
+
+# Sprite used to rasterise the walls into barrier grids - the indoor monsters are all about this size
+NAVIGATION_SPRITE = "resources/enemy_sprites/hygrodere/hygrodere_1.png"
+
+
+class NavigationGrid:
+    def __init__(self, wall_list, map_size, room_graph):
+        """
+        Builds the small and large A* barrier lists over the whole map
+        :param wall_list: SpriteList of every wall on the map
+        :param map_size: int, width (and height) of the map in pixels
+        :param room_graph: dict of room (x, y) to connected rooms, from build_room_graph
+        """
+        self.wall_list = wall_list
+        self.map_size = map_size
+        self.room_graph = room_graph
+        self.rooms_per_side = map_size // ROOM_SIZE
+
+        # AStarBarrierList moves this sprite around while building, so it can't be a live monster
+        moving_sprite = assets.make_sprite(NAVIGATION_SPRITE)
+
+        self.large_grid = arcade.AStarBarrierList(moving_sprite,
+                                                  self.wall_list,
+                                                  LARGE_GRID_SIZE,
+                                                  PLAYING_FIELD_LEFT,
+                                                  self.map_size,
+                                                  PLAYING_FIELD_BOTTOM,
+                                                  self.map_size)
+
+        self.small_grid = arcade.AStarBarrierList(moving_sprite,
+                                                  self.wall_list,
+                                                  SMALL_GRID_SIZE,
+                                                  PLAYING_FIELD_LEFT,
+                                                  self.map_size,
+                                                  PLAYING_FIELD_BOTTOM,
+                                                  self.map_size)
+
+        # barrier_list is a sorted list, so membership checks would scan it. The searches use sets of the cells instead
+        self.large_barriers = frozenset(self.large_grid.barrier_list)
+        self.small_barriers = frozenset(self.small_grid.barrier_list)
+
+        # Flow field over the large grid, towards wherever the player is
+        self.flow_field = FlowField(self.large_barriers, PLAYING_FIELD_LEFT // FLOW_FIELD_GRID_SIZE,
+                                    self.map_size // FLOW_FIELD_GRID_SIZE, PLAYING_FIELD_BOTTOM // FLOW_FIELD_GRID_SIZE,
+                                    self.map_size // FLOW_FIELD_GRID_SIZE, FLOW_FIELD_GRID_SIZE)
+        self.flow_field_timer = 0
+
+    def update_flow_field(self, target_position):
+        """
+        Called every tick, recalculates the flow field every FLOW_FIELD_TIMER ticks if the target has moved cells
+        :param target_position: (x, y) of the player
+        """
+        self.flow_field_timer -= 1
+        if self.flow_field_timer > 0:
+            return
+        self.flow_field_timer = FLOW_FIELD_TIMER
+        if self.flow_field.get_cell(target_position) != self.flow_field.get_target_cell():
+            self.flow_field.update(target_position)
+
+    def find_path(self, start, end, grid_size=LARGE_GRID_SIZE):
+        """
+        Hierarchical path between two pixel positions. The room graph is searched first, then A* is only run over
+        the current room and the next room on the way to the target (or the target room itself, if adjacent)
+        :param start: (x, y) of the start
+        :param end: (x, y) of the target
+        :param grid_size: SMALL_GRID_SIZE or LARGE_GRID_SIZE
+        :return: list of (x, y) points, or None if there is no path
+        """
+        if grid_size == SMALL_GRID_SIZE:
+            barriers = self.small_barriers
+        else:
+            barriers = self.large_barriers
+
+        start_room = self.get_room(start)
+        end_room = self.get_room(end)
+
+        # Decide which room to search into, and where to path to within it
+        if start_room == end_room or end_room in self.room_graph.get(start_room, []):
+            next_room = end_room
+            target = end
+        else:
+            room_path = find_room_path(self.room_graph, start_room, end_room)
+            if room_path is None:
+                return None
+            next_room = room_path[1]
+            target = (next_room[0] * ROOM_SIZE + HALF_ROOM_SIZE, next_room[1] * ROOM_SIZE + HALF_ROOM_SIZE)
+
+        # Bound the fine search to the two rooms, in grid cells
+        left = min(start_room[0], next_room[0]) * ROOM_SIZE // grid_size
+        right = (max(start_room[0], next_room[0]) + 1) * ROOM_SIZE // grid_size
+        bottom = min(start_room[1], next_room[1]) * ROOM_SIZE // grid_size
+        top = (max(start_room[1], next_room[1]) + 1) * ROOM_SIZE // grid_size
+
+        start_cell = (int(start[0] // grid_size), int(start[1] // grid_size))
+        end_cell = (int(target[0] // grid_size), int(target[1] // grid_size))
+        cells = astar_in_window(start_cell, end_cell, barriers, left, right, bottom, top)
+        if cells is None:
+            return None
+        return [(cell[0] * grid_size, cell[1] * grid_size) for cell in cells]
+
+    def get_room(self, position):
+        """
+        :param position: (x, y) pixel position
+        :return: (x, y) of the room the position is in, clamped to the map
+        """
+        room_x = min(max(int(position[0] // ROOM_SIZE), 0), self.rooms_per_side - 1)
+        room_y = min(max(int(position[1] // ROOM_SIZE), 0), self.rooms_per_side - 1)
+        return room_x, room_y
+
+    def get_room_center(self, room):
+        return room[0] * ROOM_SIZE + HALF_ROOM_SIZE, room[1] * ROOM_SIZE + HALF_ROOM_SIZE
+
+    def get_wander_room(self, room, previous_room=None, rng=random):
+        """
+        Pick a connected room to wander into, not turning back unless it is a dead end
+        :param room: (x, y) of the current room
+        :param previous_room: (x, y) of the room last came from
+        :param rng: random.Random (or the random module) to choose with
+        :return: (x, y) of the next room, or None if the room has no connections
+        """
+        neighbours = self.room_graph.get(room, [])
+        if len(neighbours) == 0:
+            return None
+        forward = [neighbour for neighbour in neighbours if neighbour != previous_room]
+        return rng.choice(forward if forward else neighbours)
+
+    def get_map_size(self):
+        return self.map_size
+
+
+def build_room_graph(rooms):
+    """
+    Build the room connectivity graph from the room bitmasks. Two rooms are only connected if both have a door
+    facing each other, since the extra random hallways only open one side
+    :param rooms: Map.rooms, list of columns of Room objects
+    :return: dict of (x, y) to list of connected (x, y)
+    """
+    room_graph = {}
+    size = len(rooms)
+    for x, column in enumerate(rooms):
+        for y, room in enumerate(column):
+            doors = int(room.get_room_type(), 2)
+            neighbors = []
+            for door, dx, dy, other_door in ROOM_DIRECTIONS:
+                nx = x + dx
+                ny = y + dy
+                if doors & door and 0 <= nx < size and 0 <= ny < len(rooms[nx]):
+                    if int(rooms[nx][ny].get_room_type(), 2) & other_door:
+                        neighbors.append((nx, ny))
+            room_graph[(x, y)] = neighbors
+    return room_graph
+
+
+def find_room_path(room_graph, start_room, end_room):
+    """
+    Breadth first search over the room graph
+    :return: list of rooms from start_room to end_room (inclusive), or None if they aren't connected
+    """
+    came_from = {start_room: None}
+    queue = deque([start_room])
+    while queue:
+        current = queue.popleft()
+        if current == end_room:
+            break
+        for neighbor in room_graph.get(current, []):
+            if neighbor not in came_from:
+                came_from[neighbor] = current
+                queue.append(neighbor)
+
+    if end_room not in came_from:
+        return None
+
+    room_path = []
+    current = end_room
+    while current is not None:
+        room_path.append(current)
+        current = came_from[current]
+    room_path.reverse()
+    return room_path
+
+
+def astar_in_window(start, end, barriers, left, right, bottom, top):
+    """
+    A* over grid cells, only searching inside the given (inclusive) bounds
+    :param start: (x, y) start cell
+    :param end: (x, y) end cell
+    :param barriers: set of blocked (x, y) cells
+    :return: list of cells from start to end (inclusive), or None if there is no path
+    """
+    if not (left <= end[0] <= right and bottom <= end[1] <= top) or end in barriers:
+        return None
+
+    def heuristic(cell):
+        # Octile distance, matches the move costs
+        dx = abs(cell[0] - end[0])
+        dy = abs(cell[1] - end[1])
+        return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+    open_heap = [(heuristic(start), 0, start)]
+    came_from = {start: None}
+    cost_so_far = {start: 0}
+
+    while open_heap:
+        _, current_cost, current = heapq.heappop(open_heap)
+        if current == end:
+            cells = []
+            while current is not None:
+                cells.append(current)
+                current = came_from[current]
+            cells.reverse()
+            return cells
+        # Skip stale heap entries
+        if current_cost > cost_so_far[current]:
+            continue
+
+        for dx, dy, step_cost in GRID_STEPS:
+            next_cell = (current[0] + dx, current[1] + dy)
+            if not (left <= next_cell[0] <= right and bottom <= next_cell[1] <= top) or next_cell in barriers:
+                continue
+            # Don't cut across the corner of a wall when moving diagonally
+            if dx and dy and ((current[0] + dx, current[1]) in barriers or (current[0], current[1] + dy) in barriers):
+                continue
+            new_cost = current_cost + step_cost
+            if new_cost < cost_so_far.get(next_cell, math.inf):
+                cost_so_far[next_cell] = new_cost
+                came_from[next_cell] = current
+                heapq.heappush(open_heap, (new_cost + heuristic(next_cell), new_cost, next_cell))
+
+    return None
+
+
+class FlowField:
+    def __init__(self, barriers, left, right, bottom, top, grid_size):
+        """
+        Dijkstra map from a single target cell over the whole grid. Every reachable cell stores the next cell on its
+        shortest path to the target, so any number of monsters can look up their next step in O(1)
+        :param barriers: set of blocked (x, y) cells
+        :param left: lowest x cell (inclusive), and so on for the other bounds
+        :param grid_size: pixel size of a cell
+        """
+        self.barriers = barriers
+        self.left = left
+        self.right = right
+        self.bottom = bottom
+        self.top = top
+        self.grid_size = grid_size
+        self.height = top - bottom + 1
+
+        # Flat lists indexed by get_index, None for cells that can't reach the target
+        self.next_cells = None
+        self.target_cell = None
+
+    def get_cell(self, position):
+        return int(position[0] // self.grid_size), int(position[1] // self.grid_size)
+
+    def get_target_cell(self):
+        return self.target_cell
+
+    def get_index(self, cell):
+        return (cell[0] - self.left) * self.height + (cell[1] - self.bottom)
+
+    def in_bounds(self, cell):
+        return self.left <= cell[0] <= self.right and self.bottom <= cell[1] <= self.top
+
+    def update(self, target_position):
+        """
+        Recalculate the field towards the target
+        :param target_position: (x, y) pixel position
+        """
+        target = self.get_cell(target_position)
+        self.target_cell = target
+        self.next_cells = [None] * ((self.right - self.left + 1) * self.height)
+        if not self.in_bounds(target):
+            return
+
+        cost_so_far = {target: 0}
+        self.next_cells[self.get_index(target)] = target
+        open_heap = [(0, target)]
+
+        while open_heap:
+            current_cost, current = heapq.heappop(open_heap)
+            if current_cost > cost_so_far[current]:
+                continue
+            for dx, dy, step_cost in GRID_STEPS:
+                next_cell = (current[0] + dx, current[1] + dy)
+                if not self.in_bounds(next_cell) or next_cell in self.barriers:
+                    continue
+                # Same corner rule as the A* search
+                if dx and dy and ((current[0] + dx, current[1]) in self.barriers or
+                                  (current[0], current[1] + dy) in self.barriers):
+                    continue
+                new_cost = current_cost + step_cost
+                if new_cost < cost_so_far.get(next_cell, math.inf):
+                    cost_so_far[next_cell] = new_cost
+                    # Searching outwards from the target, so the cell we came from is the next step towards it
+                    self.next_cells[self.get_index(next_cell)] = current
+                    heapq.heappush(open_heap, (new_cost, next_cell))
+
+    def next_step(self, position):
+        """
+        :param position: (x, y) pixel position of a monster
+        :return: (x, y) pixel position of the next point towards the target, or None if the field doesn't reach here
+        """
+        if self.next_cells is None:
+            return None
+        cell = self.get_cell(position)
+        if not self.in_bounds(cell):
+            return None
+        next_cell = self.next_cells[self.get_index(cell)]
+        if next_cell is None:
+            return None
+        return next_cell[0] * self.grid_size, next_cell[1] * self.grid_size
+
+    def reaches_target(self, position):
+        """
+        True if the position is already in the target cell
+        """
+        return self.target_cell is not None and self.get_cell(position) == self.target_cell
@@ -2,8 +2,8 @@ import arcade
 import json
 from utility_functions import rotate_hit_box, is_clear_line_of_sight, is_within_facing_direction
 import math
-import random
 from indoor_enemies import Enemy
+import assets
 
 # Giant class
 GIANT_STATES = {"roam": 0, "agro": 1, "agro_search": 2}
@@ -29,18 +29,19 @@ class Giant(Enemy):
         self.agro_meter = 0
 
         # texture loading
-        self.sprite_neutral = arcade.load_texture("resources/enemy_sprites/giant/giant0.png")
-        self.sprite_walk1 = arcade.load_texture("resources/enemy_sprites/giant/giant1.png")
-        self.sprite_walk2 = arcade.load_texture("resources/enemy_sprites/giant/giant2.png")
-        self.sprite_walk3 = arcade.load_texture("resources/enemy_sprites/giant/giant3.png")
-        self.sprite_walk4 = arcade.load_texture("resources/enemy_sprites/giant/giant4.png")
+        self.sprite_neutral = assets.get_texture("resources/enemy_sprites/giant/giant0.png")
+        self.sprite_walk1 = assets.get_texture("resources/enemy_sprites/giant/giant1.png")
+        self.sprite_walk2 = assets.get_texture("resources/enemy_sprites/giant/giant2.png")
+        self.sprite_walk3 = assets.get_texture("resources/enemy_sprites/giant/giant3.png")
+        self.sprite_walk4 = assets.get_texture("resources/enemy_sprites/giant/giant4.png")
 
         # anim cycle
         self.anim_cycle = [self.sprite_neutral, self.sprite_walk1, self.sprite_walk2, self.sprite_walk1, self.sprite_neutral, self.sprite_walk3, self.sprite_walk4, self.sprite_walk3]
         self.texture_change_cooldown = GIANT_TEXTURE_CHANGE_COOLDOWN
 
-    def setup_outdoor_enemy(self, Type, moon_name, x_start, y_start):
-        super().setup_outdoor_enemy(Type, moon_name, x_start, y_start)
+    def setup_outdoor_enemy(self, Type, moon_name, x_start, y_start, wall_list=None, wall_index=None,
+                            tile_visibility=None):
+        super().setup_outdoor_enemy(Type, moon_name, x_start, y_start, wall_list, wall_index, tile_visibility)
         # Get the current area of the map the giant is in
         current_area = (self.center_x // TILE_SIZE, self.center_y // TILE_SIZE)
         self.current_position = (current_area[0] * TILE_SIZE + TILE_CENTER_CONST,
@@ -76,7 +77,7 @@ class Giant(Enemy):
                     self.state = GIANT_STATES["roam"]
                 else:
                     self.roam()
-                self.agro_meter -= GIANT_AGRO_METER_DRAIN
+                self.agro_meter -= GIANT_AGRO_METER_DRAIN * self.time_scale
 
         # Deal damage to player if interacting with them - regardless of the state the thumper is in
         # Deal damage in cooldowns too, not constantly
@@ -84,12 +85,12 @@ class Giant(Enemy):
             self.temp_cooldown = self.damage_cooldown
             player.decrease_health(self.damage)
         else:
-            self.temp_cooldown -= 1
+            self.temp_cooldown -= self.time_scale
 
     def look_for_player(self, player, swath):
         # Determine if there is a clear possible line of sight to the player
         line_of_sight = is_clear_line_of_sight(player.center_x, player.center_y, self.center_x,
-                                               self.center_y, self.wall_list)
+                                               self.center_y, self.wall_index)
         # If no possible clear line of sight, return
         if not line_of_sight:
             return False
@@ -141,12 +142,12 @@ class Giant(Enemy):
                 self.update_rotation(dx, dy)
                 # Only move if starting to look in the correct direction - agro FOV will do
                 if self.is_within_facing_direction(self.target_position, swath_degrees=GIANT_SEARCH_SWATH):
-                    self.center_x += self.movement_speed * math.cos(math.radians(self.rotation))
-                    self.center_y += self.movement_speed * math.sin(math.radians(self.rotation))
+                    self.center_x += self.movement_speed * self.time_scale * math.cos(math.radians(self.rotation))
+                    self.center_y += self.movement_speed * self.time_scale * math.sin(math.radians(self.rotation))
                     return
                 else:
-                    self.center_x += self.movement_speed * math.cos(math.radians(self.rotation)) * GIANT_TURN_SPEED
-                    self.center_y += self.movement_speed * math.sin(math.radians(self.rotation)) * GIANT_TURN_SPEED
+                    self.center_x += self.movement_speed * self.time_scale * math.cos(math.radians(self.rotation)) * GIANT_TURN_SPEED
+                    self.center_y += self.movement_speed * self.time_scale * math.sin(math.radians(self.rotation)) * GIANT_TURN_SPEED
                     return
         # print("recalculating")
         valid_neighbors = self.get_neighboring_tiles(current_area)
@@ -156,7 +157,7 @@ class Giant(Enemy):
             valid_neighbors = self.get_neighboring_tiles(current_area)
         if len(valid_neighbors) == 0:
             return
-        targeted_position = random.choice(valid_neighbors)
+        targeted_position = self.rng.choice(valid_neighbors)
         self.target_position = targeted_position
         self.visited_areas.add(targeted_position)
 
@@ -167,12 +168,12 @@ class Giant(Enemy):
         self.update_rotation(dx, dy)
         # Only move if starting to look in the correct direction - agro FOV will do
         if self.is_within_facing_direction(self.target_position, swath_degrees=GIANT_SEARCH_SWATH):
-            self.center_x += self.movement_speed * math.cos(math.radians(self.rotation))
-            self.center_y += self.movement_speed * math.sin(math.radians(self.rotation))
+            self.center_x += self.movement_speed * self.time_scale * math.cos(math.radians(self.rotation))
+            self.center_y += self.movement_speed * self.time_scale * math.sin(math.radians(self.rotation))
             return
         else:
-            self.center_x += self.movement_speed * math.cos(math.radians(self.rotation)) * GIANT_TURN_SPEED
-            self.center_y += self.movement_speed * math.sin(math.radians(self.rotation)) * GIANT_TURN_SPEED
+            self.center_x += self.movement_speed * self.time_scale * math.cos(math.radians(self.rotation)) * GIANT_TURN_SPEED
+            self.center_y += self.movement_speed * self.time_scale * math.sin(math.radians(self.rotation)) * GIANT_TURN_SPEED
             return
 
     def get_neighboring_tiles(self, current_tile):
@@ -192,8 +193,12 @@ class Giant(Enemy):
                 # determine where the position of the next tile is and decide line of sight
                 potentional_position = (area[0] * TILE_SIZE + TILE_CENTER_CONST,
                                         area[1] * TILE_SIZE + TILE_CENTER_CONST)
-                if is_clear_line_of_sight(scaled_current_tile[0], scaled_current_tile[1], potentional_position[0],
-                                          potentional_position[1], self.wall_list):
+                if self.tile_visibility is not None:
+                    # Precomputed when the map was made
+                    if self.tile_visibility.is_visible(current_tile, area):
+                        valid_neighbors.append(potentional_position)
+                elif is_clear_line_of_sight(scaled_current_tile[0], scaled_current_tile[1], potentional_position[0],
+                                            potentional_position[1], self.wall_index):
                     valid_neighbors.append(potentional_position)
         return valid_neighbors
 
@@ -205,10 +210,10 @@ class Giant(Enemy):
 
         # Walk towards player (IF can see and clear line of sight)
         if is_clear_line_of_sight(self.center_x, self.center_y, self.target_position[0],
-                                  self.target_position[1], self.wall_list) and \
+                                  self.target_position[1], self.wall_index) and \
                 self.is_within_facing_direction(self.target_position, swath_degrees=GIANT_SEARCH_SWATH):
-            self.center_x += self.movement_speed * math.cos(math.radians(self.rotation))
-            self.center_y += self.movement_speed * math.sin(math.radians(self.rotation))
+            self.center_x += self.movement_speed * self.time_scale * math.cos(math.radians(self.rotation))
+            self.center_y += self.movement_speed * self.time_scale * math.sin(math.radians(self.rotation))
         else:
             self.target_position = ((self.target_position[0] // TILE_SIZE) * TILE_SIZE + TILE_CENTER_CONST,
                                     (self.target_position[1] // TILE_SIZE) * TILE_SIZE + TILE_CENTER_CONST)
@@ -244,12 +249,18 @@ class Giant(Enemy):
         else:
             rotation_rate = GIANT_ROTATION_RATE
 
+        # rate is optional way to increase rotation speed. Skipped ticks turn further, but never more than one tick's
+        # turn past the target
+        rotation_rate *= rate
+        rotation_rate = min(rotation_rate * self.time_scale,
+                            max(rotation_rate, min(diff_clockwise, diff_counterclockwise)))
+
         # Adjust rotation, if it has changed
         if current_rotation != target_direction:
-            self.rotation += rotation_direction * rotation_rate * rate # rate is optional way to increase rotation speed
+            self.rotation += rotation_direction * rotation_rate
             # Only update hitbox if rotation has changed
             # Have to create a new sprite each time for the angle is only supplied during creation
-            self.hit_box = rotate_hit_box(arcade.Sprite(self.texture_name).hit_box, self.rotation)
+            self.hit_box = rotate_hit_box(assets.get_hit_box(self.texture_name), self.rotation)
 
     def draw_self(self):
 
@@ -0,0 +1,200 @@
+"""
+Binary file format for WorldPlans, so generated maps can be cached, kept as fixtures or reloaded for profiling.
+The file is one contiguous buffer: a fixed header, the moon id and monster names, then one flat numpy array per
+section, each starting on an 8 byte boundary. Loading maps the file and views each section with numpy.frombuffer,
+so nothing is parsed field by field.
+"""
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from map import WorldPlan, plan_world, HALF_ROOM_SIZE, ROOM_SIZE
+from maze import room_type_string
+from room import RoomPlan
+
+MAGIC = b"LCMP"
+FILE_EXTENSION = ".lcmp"
+VERSION = 1
+# magic, version, seed, map size, start x, start y, moon id length, monster names length, then the section row counts
+HEADER = struct.Struct("<4sHQIiiII6I")
+ALIGNMENT = 8
+
+# Rows of each section, "room" is the room's index in room_bits (x * map_size + y)
+LOOT_DTYPE = np.dtype([("room", "<u4"), ("x", "<i4"), ("y", "<i4"), ("value_tier", "u1"), ("two_handed", "u1"),
+                       ("item", "<u2"), ("value", "<i4")])
+MINE_DTYPE = np.dtype([("room", "<u4"), ("x", "<i4"), ("y", "<i4")])
+TURRET_DTYPE = np.dtype([("room", "<u4"), ("x", "<i4"), ("y", "<i4"), ("view_x", "i1"), ("view_y", "i1"),
+                         ("facing_offset", "<i2")])
+# Spawners in the order the rooms use them, each with a slice of the queue section
+SPAWNER_DTYPE = np.dtype([("room", "<u4"), ("x", "<i4"), ("y", "<i4"), ("queue_start", "<u4"),
+                          ("queue_length", "<u4")])
+QUEUE_DTYPE = np.dtype([("monster", "<u2"), ("power", "<i4"), ("cooldown", "<i4")])
+SECTIONS = (("room_bits", np.dtype("u1")), ("loot", LOOT_DTYPE), ("mines", MINE_DTYPE), ("turrets", TURRET_DTYPE),
+            ("spawners", SPAWNER_DTYPE), ("queue", QUEUE_DTYPE))
+
+
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def plan_to_arrays(plan):
+    """
+    :return: dict of section name: numpy array, and the list of monster names the queue refers to
+    """
+    size = plan.map_size
+    loot = []
+    mines = []
+    turrets = []
+    spawner_rooms = []
+    for x, column in enumerate(plan.rooms):
+        for y, room_plan in enumerate(column):
+            room = x * size + y
+            for loot_x, loot_y, value_tier, is_two_handed, item_index, value in room_plan.loot:
+                loot.append((room, loot_x, loot_y, value_tier, is_two_handed, item_index, value))
+            for mine_x, mine_y in room_plan.mines:
+                mines.append((room, mine_x, mine_y))
+            for turret_x, turret_y, view_direction, facing_offset in room_plan.turrets:
+                turrets.append((room, turret_x, turret_y, view_direction[0], view_direction[1], facing_offset))
+            if room_plan.spawner_position is not None:
+                spawner_rooms.append((room, room_plan.spawner_position[0], room_plan.spawner_position[1]))
+
+    monster_names = []
+    spawners = []
+    queue = []
+    for (room, spawner_x, spawner_y), (cooldowns, monsters) in zip(spawner_rooms, plan.spawners):
+        spawners.append((room, spawner_x, spawner_y, len(queue), len(monsters)))
+        for (monster, power), cooldown in zip(monsters, cooldowns):
+            if monster not in monster_names:
+                monster_names.append(monster)
+            queue.append((monster_names.index(monster), power, cooldown))
+
+    arrays = {"room_bits": np.frombuffer(bytes(plan.room_bits), dtype="u1"),
+              "loot": np.array(loot, dtype=LOOT_DTYPE),
+              "mines": np.array(mines, dtype=MINE_DTYPE),
+              "turrets": np.array(turrets, dtype=TURRET_DTYPE),
+              "spawners": np.array(spawners, dtype=SPAWNER_DTYPE),
+              "queue": np.array(queue, dtype=QUEUE_DTYPE)}
+    return arrays, monster_names
+
+
+def plan_to_bytes(plan):
+    """
+    :return: the plan in the binary format
+    """
+    arrays, monster_names = plan_to_arrays(plan)
+    moon_id = plan.moon_id.encode()
+    names = "\n".join(monster_names).encode()
+    header = HEADER.pack(MAGIC, VERSION, plan.seed, plan.map_size, plan.player_start[0], plan.player_start[1],
+                         len(moon_id), len(names), *(len(arrays[name]) for name, _ in SECTIONS))
+    buffer = bytearray(header + moon_id + names)
+    for name, _ in SECTIONS:
+        buffer.extend(bytes(align(len(buffer)) - len(buffer)))
+        buffer.extend(arrays[name].tobytes())
+    return bytes(buffer)
+
+
+def read_arrays(buffer):
+    """
+    View each section of a buffer in the binary format, the arrays share memory with the buffer
+    :param buffer: bytes, mmap or anything else supporting the buffer protocol
+    :return: dict of the header fields, dict of section name: numpy array
+    """
+    if len(buffer) < HEADER.size:
+        # Too short to be a plan, e.g. a file cut off while it was being saved
+        raise ValueError("Not a map plan file")
+    fields = HEADER.unpack_from(buffer, 0)
+    magic, version, seed, map_size, start_x, start_y, moon_id_length, names_length = fields[:8]
+    if magic != MAGIC:
+        raise ValueError("Not a map plan file")
+    if version != VERSION:
+        raise ValueError("Map plan file version " + str(version) + " is not supported, expected " + str(VERSION))
+    offset = HEADER.size
+    moon_id = bytes(buffer[offset:offset + moon_id_length]).decode()
+    offset += moon_id_length
+    names = bytes(buffer[offset:offset + names_length]).decode()
+    offset += names_length
+    header = {"seed": seed, "map_size": map_size, "player_start": [start_x, start_y], "moon_id": moon_id,
+              "monster_names": names.split("\n") if names else []}
+
+    arrays = {}
+    for (name, dtype), count in zip(SECTIONS, fields[8:]):
+        offset = align(offset)
+        arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+        offset += count * dtype.itemsize
+    return header, arrays
+
+
+def plan_from_arrays(header, arrays):
+    """
+    :return: WorldPlan, the inverse of plan_to_arrays
+    """
+    size = header["map_size"]
+    plan = WorldPlan(header["moon_id"], header["seed"])
+    plan.map_size = size
+    plan.player_start = header["player_start"]
+    plan.room_bits = bytearray(arrays["room_bits"].tobytes())
+    plan.rooms = [[RoomPlan(room_type_string(plan.room_bits[x * size + y]), x * ROOM_SIZE + HALF_ROOM_SIZE,
+                            y * ROOM_SIZE + HALF_ROOM_SIZE) for y in range(size)] for x in range(size)]
+
+    def get_room(room):
+        return plan.rooms[room // size][room % size]
+
+    # tolist converts a whole section to python values in one call
+    for room, x, y, value_tier, is_two_handed, item_index, value in arrays["loot"].tolist():
+        get_room(room).loot.append((x, y, value_tier, bool(is_two_handed), item_index, value))
+    for room, x, y in arrays["mines"].tolist():
+        get_room(room).mines.append((x, y))
+    for room, x, y, view_x, view_y, facing_offset in arrays["turrets"].tolist():
+        get_room(room).turrets.append((x, y, [view_x, view_y], facing_offset))
+
+    names = header["monster_names"]
+    queue = arrays["queue"].tolist()
+    for room, x, y, queue_start, queue_length in arrays["spawners"].tolist():
+        get_room(room).spawner_position = (x, y)
+        entries = queue[queue_start:queue_start + queue_length]
+        plan.spawners.append(([cooldown for _, _, cooldown in entries],
+                              [[names[monster], power] for monster, power, _ in entries]))
+    return plan
+
+
+def save_plan(plan, filename):
+    with open(filename, "wb") as file:
+        file.write(plan_to_bytes(plan))
+
+
+def load_plan(filename):
+    """
+    Map the file into memory and read the plan out of it
+    :return: WorldPlan
+    """
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header, arrays = read_arrays(buffer)
+            plan = plan_from_arrays(header, arrays)
+            # The arrays are views of the mapped file, so they have to go before it is closed
+            del arrays
+    return plan
+
+
+def get_cache_filename(directory, moon_id, seed):
+    return os.path.join(directory, moon_id + "_" + str(seed) + FILE_EXTENSION)
+
+
+def load_or_plan(moon_id, seed, directory):
+    """
+    Load the moon and seed's plan from the cache directory, planning and saving it there if it isn't cached yet
+    :return: WorldPlan
+    """
+    filename = get_cache_filename(directory, moon_id, seed)
+    if os.path.exists(filename):
+        try:
+            return load_plan(filename)
+        except ValueError:
+            # Written by a different version, replaced below
+            pass
+    plan = plan_world(moon_id, seed)
+    os.makedirs(directory, exist_ok=True)
+    save_plan(plan, filename)
+    return plan
@@ -6,6 +6,7 @@ import numpy as np
 from utility_functions import rotate_hit_box
 from arcade.experimental.lights import Light, LightLayer
 from item import Item, Shovel, SHOVEL_DAMAGE, Lantern, LANTERN_LIGHT_SIZE
+import assets
 
 PLAYER_DELAY_PICKUP_DROP = 20
 PLAYER_ROTATION_RATE = 10
@@ -44,16 +45,16 @@ class PlayerCharacter(arcade.Sprite):
         self.walk_time = 0
         self.total_weight = 0
         # Need to update sprites with animations, directions, etc
-        self.texture = arcade.load_texture("resources/player_sprites/player_neutral.png")
+        self.texture = assets.get_texture("resources/player_sprites/player_neutral.png")
         self.current_texture_name = "resources/player_sprites/player_neutral.png"
 
         # load all sprites
-        self.sprite_neutral = arcade.load_texture("resources/player_sprites/player_neutral.png")
-        self.sprite_walk1 = arcade.load_texture("resources/player_sprites/player_walk_left.png")
-        self.sprite_walk2 = arcade.load_texture("resources/player_sprites/player_walk_right.png")
-        self.sprite_neutral_carry = arcade.load_texture("resources/player_sprites/player_neutral_carry.png")
-        self.sprite_walk1_carry = arcade.load_texture("resources/player_sprites/player_carry_left.png")
-        self.sprite_walk2_carry = arcade.load_texture("resources/player_sprites/player_carry_right.png")
+        self.sprite_neutral = assets.get_texture("resources/player_sprites/player_neutral.png")
+        self.sprite_walk1 = assets.get_texture("resources/player_sprites/player_walk_left.png")
+        self.sprite_walk2 = assets.get_texture("resources/player_sprites/player_walk_right.png")
+        self.sprite_neutral_carry = assets.get_texture("resources/player_sprites/player_neutral_carry.png")
+        self.sprite_walk1_carry = assets.get_texture("resources/player_sprites/player_carry_left.png")
+        self.sprite_walk2_carry = assets.get_texture("resources/player_sprites/player_carry_right.png")
 
         self.rotation = 0
 
@@ -208,16 +209,16 @@ class PlayerCharacter(arcade.Sprite):
         # Need to update sprites with animations, directions, etc
         # self.texture = arcade.load_texture("resources/player_sprites/player_neutral.png")
         # Need to update sprites with animations, directions, etc
-        self.texture = arcade.load_texture("resources/player_sprites/player_neutral.png")
+        self.texture = assets.get_texture("resources/player_sprites/player_neutral.png")
         self.current_texture_name = "resources/player_sprites/player_neutral.png"
 
         # load all sprites
-        self.sprite_neutral = arcade.load_texture("resources/player_sprites/player_neutral.png")
-        self.sprite_walk1 = arcade.load_texture("resources/player_sprites/player_walk_left.png")
-        self.sprite_walk2 = arcade.load_texture("resources/player_sprites/player_walk_right.png")
-        self.sprite_neutral_carry = arcade.load_texture("resources/player_sprites/player_neutral_carry.png")
-        self.sprite_walk1_carry = arcade.load_texture("resources/player_sprites/player_carry_left.png")
-        self.sprite_walk2_carry = arcade.load_texture("resources/player_sprites/player_carry_right.png")
+        self.sprite_neutral = assets.get_texture("resources/player_sprites/player_neutral.png")
+        self.sprite_walk1 = assets.get_texture("resources/player_sprites/player_walk_left.png")
+        self.sprite_walk2 = assets.get_texture("resources/player_sprites/player_walk_right.png")
+        self.sprite_neutral_carry = assets.get_texture("resources/player_sprites/player_neutral_carry.png")
+        self.sprite_walk1_carry = assets.get_texture("resources/player_sprites/player_carry_left.png")
+        self.sprite_walk2_carry = assets.get_texture("resources/player_sprites/player_carry_right.png")
 
         self.rotation = 0
 
@@ -383,7 +384,7 @@ class PlayerCharacter(arcade.Sprite):
             self.rotation += rotation_direction * rotation_rate
             # Only update hitbox if rotation has changed
             # Have to create a new sprite each time for the angle is only supplied during creation
-            self.hit_box = rotate_hit_box(arcade.Sprite(self.current_texture_name).hit_box, self.rotation)
+            self.hit_box = rotate_hit_box(assets.get_hit_box(self.current_texture_name), self.rotation)
 
     def draw_self(self):
         """
@@ -442,5 +443,5 @@ class PlayerCharacter(arcade.Sprite):
             arcade.draw_texture_rectangle(self.center_x + item_x, self.center_y + item_y, held_item.width * self.scale,
                                           held_item.height * self.scale, held_item.texture, self.rotation + held_item.rotation - 90)
             # rotate hitbox of the item
-            held_item.hit_box = rotate_hit_box(arcade.Sprite(held_item.texture_name).hit_box, self.rotation + held_item.rotation - 90)
+            held_item.hit_box = rotate_hit_box(assets.get_hit_box(held_item.texture_name), self.rotation + held_item.rotation - 90)
             # held_item.draw_hit_box()
@@ -0,0 +1,231 @@
+"""
+Camera culling for everything drawn in world space.
+A ChunkedSpriteLayer is for things that never move once built, like the facility's rooms and the outdoor tilemap. It
+sorts its sprites into square chunks, each a SpriteList that is uploaded to the GPU once, and only draws the chunks
+overlapping the view.
+A CulledSpriteList is for sprites that stay put while they are in the list but come and go (loot, mines, turrets). It
+keeps a grid of its sprites and a second SpriteList of just the ones on screen, which only changes as sprites come into
+or go out of view.
+A CullingStage holds the camera's view for a frame, draws layers through it and counts what was drawn and culled.
+"""
+import arcade
+
+# Pixels along each side of a chunk, 4 rooms, so the screen overlaps at most 2 x 2 chunks
+CHUNK_SIZE = 1024
+# Pixels along each side of a CulledSpriteList cell, a room tile
+CELL_SIZE = 256
+
+
+def overlaps_view(sprite, left, right, bottom, top):
+    """
+    :return: True if the sprite's bounding box (ignoring rotation) overlaps the rectangle
+    """
+    half_width = sprite.width / 2
+    half_height = sprite.height / 2
+    return sprite.center_x + half_width >= left and sprite.center_x - half_width <= right and \
+        sprite.center_y + half_height >= bottom and sprite.center_y - half_height <= top
+
+
+class ChunkedSpriteLayer:
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        """
+        :param chunk_size: pixels along each side of a chunk
+        """
+        self.chunk_size = chunk_size
+        # (chunk x, chunk y): SpriteList
+        self.chunks = {}
+        self.sprite_count = 0
+        # Sprites are put in the chunk holding their center, so can stick out of it by up to half their size
+        self.margin = 0
+        # Diagnostics from the last draw
+        self.chunks_drawn = 0
+
+    def get_chunk(self, x, y):
+        return int(x // self.chunk_size), int(y // self.chunk_size)
+
+    def append(self, sprite):
+        key = self.get_chunk(sprite.center_x, sprite.center_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            # Nothing in a chunk moves, so it needs no spatial hash and its buffer is never rewritten. Lazy, so a
+            # chunk that is never seen never creates its buffer
+            chunk = arcade.SpriteList(use_spatial_hash=False, is_static=True, lazy=True)
+            self.chunks[key] = chunk
+        chunk.append(sprite)
+        self.sprite_count += 1
+        self.margin = max(self.margin, sprite.width / 2, sprite.height / 2)
+
+    def extend(self, sprites):
+        for sprite in sprites:
+            self.append(sprite)
+
+    def get_visible_chunks(self, left, right, bottom, top):
+        """
+        :return: list of the SpriteLists of each chunk that could have a sprite overlapping the rectangle
+        """
+        min_x, min_y = self.get_chunk(left - self.margin, bottom - self.margin)
+        max_x, max_y = self.get_chunk(right + self.margin, top + self.margin)
+        visible = []
+        for chunk_x in range(min_x, max_x + 1):
+            for chunk_y in range(min_y, max_y + 1):
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is not None:
+                    visible.append(chunk)
+        return visible
+
+    def draw_view(self, left, right, bottom, top):
+        """
+        Draw every chunk overlapping the rectangle, in world coordinates
+        :return: number of sprites drawn
+        """
+        visible = self.get_visible_chunks(left, right, bottom, top)
+        for chunk in visible:
+            chunk.draw()
+        self.chunks_drawn = len(visible)
+        return sum(len(chunk) for chunk in visible)
+
+    def __len__(self):
+        return self.sprite_count
+
+
+class CulledSpriteList(arcade.SpriteList):
+    def __init__(self, cell_size=CELL_SIZE, **kwargs):
+        """
+        SpriteList that can draw just the sprites in view. Sprites are placed in the grid when added, so must not move
+        while they are in the list (take them out and put them back in to move them)
+        :param cell_size: pixels along each side of a grid cell
+        """
+        super().__init__(**kwargs)
+        self.cell_size = cell_size
+        # (cell x, cell y): set of sprites, and each sprite's cell
+        self.cells = {}
+        self.sprite_cells = {}
+        self.margin = 0
+        # The sprites drawn last time draw_view was called
+        self.on_screen = set()
+        self.on_screen_list = arcade.SpriteList()
+
+    def get_cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add_to_grid(self, sprite):
+        cell = self.get_cell(sprite.center_x, sprite.center_y)
+        self.cells.setdefault(cell, set()).add(sprite)
+        self.sprite_cells[sprite] = cell
+        self.margin = max(self.margin, sprite.width / 2, sprite.height / 2)
+
+    def append(self, sprite):
+        super().append(sprite)
+        self.add_to_grid(sprite)
+
+    def insert(self, index, sprite):
+        super().insert(index, sprite)
+        self.add_to_grid(sprite)
+
+    def extend(self, sprites):
+        for sprite in sprites:
+            self.append(sprite)
+
+    def remove(self, sprite):
+        super().remove(sprite)
+        cell = self.sprite_cells.pop(sprite, None)
+        if cell is not None:
+            self.cells[cell].discard(sprite)
+        if sprite in self.on_screen:
+            self.on_screen.discard(sprite)
+            # remove_from_sprite_lists may have already taken it out
+            try:
+                self.on_screen_list.remove(sprite)
+            except ValueError:
+                pass
+
+    def pop(self, index=-1):
+        sprite = self[index]
+        self.remove(sprite)
+        return sprite
+
+    def clear(self, *args, **kwargs):
+        super().clear(*args, **kwargs)
+        self.cells = {}
+        self.sprite_cells = {}
+        self.on_screen = set()
+        self.on_screen_list = arcade.SpriteList()
+
+    def query(self, left, right, bottom, top):
+        """
+        :return: set of the sprites overlapping the rectangle, only looking in the cells it covers
+        """
+        min_x, min_y = self.get_cell(left - self.margin, bottom - self.margin)
+        max_x, max_y = self.get_cell(right + self.margin, top + self.margin)
+        found = set()
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for sprite in self.cells.get((cell_x, cell_y), ()):
+                    if overlaps_view(sprite, left, right, bottom, top):
+                        found.add(sprite)
+        return found
+
+    def draw_view(self, left, right, bottom, top):
+        """
+        Draw the sprites overlapping the rectangle, in one draw call
+        :return: number of sprites drawn
+        """
+        visible = self.query(left, right, bottom, top)
+        for sprite in self.on_screen - visible:
+            self.on_screen_list.remove(sprite)
+        for sprite in visible - self.on_screen:
+            self.on_screen_list.append(sprite)
+        self.on_screen = visible
+        self.on_screen_list.draw()
+        return len(visible)
+
+
+class CullingStage:
+    def __init__(self):
+        # (left, right, bottom, top) of the camera in world coordinates
+        self.view = (0, 0, 0, 0)
+        # layer name: (sprites drawn, sprites culled), for the current frame
+        self.counts = {}
+
+    def begin_frame(self, view):
+        """
+        Call before drawing the world each frame
+        :param view: (left, right, bottom, top) the camera shows, in world coordinates
+        """
+        self.view = view
+        self.counts = {}
+
+    def record(self, name, drawn, total):
+        self.counts[name] = (drawn, total - drawn)
+
+    def draw_layer(self, name, layer):
+        """
+        Draw the part of a ChunkedSpriteLayer or CulledSpriteList in view
+        """
+        self.record(name, layer.draw_view(*self.view), len(layer))
+
+    def select(self, name, sprites):
+        """
+        Cull sprites that move, and are drawn one at a time (monsters). Checks every sprite, there are only a few
+        :return: list of the sprites in view
+        """
+        visible = [sprite for sprite in sprites if overlaps_view(sprite, *self.view)]
+        self.record(name, len(visible), len(sprites))
+        return visible
+
+    def draw_moving(self, name, sprite_list):
+        """
+        Draw a SpriteList of sprites that move every frame (bullets) in one call, hiding the ones out of view
+        """
+        drawn = 0
+        for sprite in sprite_list:
+            sprite.visible = overlaps_view(sprite, *self.view)
+            drawn += sprite.visible
+        sprite_list.draw()
+        self.record(name, drawn, len(sprite_list))
+
+    def get_totals(self):
+        """
+        :return: (sprites drawn, sprites culled) over every layer this frame
+        """
+        return sum(drawn for drawn, _ in self.counts.values()), sum(culled for _, culled in self.counts.values())
@@ -1,14 +1,169 @@
-import json
 import random
 
 import arcade
 
-from item import Item
-from hazards import Mine, Turret
+from item import Item, pick_item
+from hazards import Mine, Turret, ANGLE_FROM_DEFAULT
 
 from spawner import Spawner
+import assets
+import game_data
+from world_seed import get_stream, LOOT, HAZARDS, SPAWNERS
 
 
+def compile_spawn_areas(room_type):
+    """
+    Spawn areas as (min x, max x, min y, max y) offsets from the room center, integer division keeps the bounds
+    integers. Only uses the room data, so planning can run off the main thread
+    :return: (item spawn areas, hazard spawn areas)
+    """
+    rooms_data = game_data.get_room_template(room_type)
+    item_spawn_areas = tuple((area["center_x"] - area["width"] // 2, area["center_x"] + area["width"] // 2,
+                              area["center_y"] - area["height"] // 2, area["center_y"] + area["height"] // 2)
+                             for area in rooms_data.get("item_spawn_areas", []))
+    hazard_spawn_areas = tuple((area["x"] - area["width"] // 2, area["x"] + area["width"] // 2,
+                                area["y"] - area["height"] // 2, area["y"] + area["height"] // 2)
+                               for area in rooms_data.get("hazard_spawn_locations", []))
+    return item_spawn_areas, hazard_spawn_areas
+
+
+# room type: (item spawn areas, hazard spawn areas)
+spawn_areas = {}
+
+
+def get_spawn_areas(room_type):
+    areas = spawn_areas.get(room_type)
+    if areas is None:
+        areas = compile_spawn_areas(room_type)
+        spawn_areas[room_type] = areas
+    return areas
+
+
+class RoomTemplate:
+    def __init__(self, room_type):
+        """
+        Everything about a room type that doesn't depend on where the room is, compiled once from the json so that
+        building a room only has to offset it
+        :param room_type: room bitmask string, e.g. "0110"
+        """
+        self.room_type = room_type
+        rooms_data = game_data.get_room_template(room_type)
+        background = rooms_data.get("background")
+        self.background_texture = assets.get_texture(background) if background is not None else None
+        # (texture, x offset, y offset), the texture carries the hit box so sprites don't recalculate it
+        self.walls = tuple((assets.get_texture(wall_data["texture"]), wall_data["center_x"], wall_data["center_y"])
+                           for wall_data in rooms_data.get("walls", []))
+
+    def make_background(self, center_x, center_y):
+        if self.background_texture is None:
+            background = arcade.Sprite()
+        else:
+            background = arcade.Sprite(texture=self.background_texture)
+        background.center_x = center_x
+        background.center_y = center_y
+        return background
+
+    def make_walls(self, center_x, center_y, wall_list):
+        """
+        Add the room's walls, offset to the room center, to wall_list
+        """
+        for texture, x, y in self.walls:
+            wall_list.append(arcade.Sprite(texture=texture, center_x=center_x + x, center_y=center_y + y))
+        return wall_list
+
+
+# room type: RoomTemplate, there are only 16 room types so every template is kept
+room_templates = {}
+
+
+def get_room_template(room_type):
+    template = room_templates.get(room_type)
+    if template is None:
+        template = RoomTemplate(room_type)
+        room_templates[room_type] = template
+    return template
+
+
+def random_point_in_area(area, center_x, center_y, rng=random):
+    """
+    :param area: (min x, max x, min y, max y) offsets from a RoomTemplate
+    :return: random integer (x, y) in the area, offset to the room center
+    """
+    return rng.randint(center_x + area[0], center_x + area[1]), rng.randint(center_y + area[2], center_y + area[3])
+
+
+class RoomPlan:
+    def __init__(self, room_type, center_x, center_y):
+        """
+        Everything random about a room, picked without creating any sprites
+        """
+        self.room_type = room_type
+        self.center_x = center_x
+        self.center_y = center_y
+        # (x, y, value tier, is two handed, item index, value), see item.pick_item
+        self.loot = []
+        # (x, y)
+        self.mines = []
+        # (x, y, view direction, facing offset)
+        self.turrets = []
+        # (x, y) of the room's spawner, None if it doesn't have one
+        self.spawner_position = None
+
+
+def plan_room(room_type, x_center, y_center, has_spawner=False, hazards=None, loot_item_spawn_list=None,
+              world_seed=None):
+    """
+    Pick the positions of the room's loot, hazards and spawner, and which loot items they are
+    :param world_seed: WorldSeed whose loot, hazard and spawner streams are used, None for the random module
+    :return: RoomPlan
+    """
+    loot_rng = get_stream(world_seed, LOOT)
+    hazard_rng = get_stream(world_seed, HAZARDS)
+    spawner_rng = get_stream(world_seed, SPAWNERS)
+    plan = RoomPlan(room_type, x_center, y_center)
+    item_spawn_areas, hazard_spawn_areas = get_spawn_areas(room_type)
+
+    # Spawn loot
+    is_two_handed = False
+    for temp_list in loot_item_spawn_list or []:
+        item_value = 0
+        for temp_item in temp_list:
+            # spawn that many items that are being asked for
+            for i in range(temp_item):
+                # Choose a random loot spawn area and select a point in it
+                spawn_area = loot_rng.randint(0, len(item_spawn_areas) - 1)
+                random_x_val, random_y_val = random_point_in_area(item_spawn_areas[spawn_area],
+                                                                  x_center, y_center, loot_rng)
+                item_index, value = pick_item(item_value, is_two_handed, loot_rng)
+                plan.loot.append((random_x_val, random_y_val, item_value, is_two_handed, item_index, value))
+            item_value += 1
+        is_two_handed = True
+
+    if hazards is None:
+        hazards = [0, 0]
+    # Spawn hazards - mines
+    for i in range(hazards[0]):
+        # Choose a random hazard spawn area and select a point in it
+        spawn_area = hazard_rng.randint(0, len(hazard_spawn_areas) - 1)
+        plan.mines.append(random_point_in_area(hazard_spawn_areas[spawn_area], x_center, y_center, hazard_rng))
+    # Spawn hazards - turrets
+    for i in range(hazards[1]):
+        # Choose a random hazard spawn area and select a point in it
+        spawn_area = hazard_rng.randint(0, len(hazard_spawn_areas) - 1)
+        random_x_val, random_y_val = random_point_in_area(hazard_spawn_areas[spawn_area],
+                                                          x_center, y_center, hazard_rng)
+        # Generate random view direction and starting direction
+        view_direction = [hazard_rng.randint(-1, 1), hazard_rng.randint(-1, 1)]
+        facing_offset = hazard_rng.randint(-ANGLE_FROM_DEFAULT, ANGLE_FROM_DEFAULT)
+        plan.turrets.append((random_x_val, random_y_val, view_direction, facing_offset))
+
+    # spawner coords (if it exists)
+    if has_spawner:
+        spawn_area = spawner_rng.randint(0, len(hazard_spawn_areas) - 1)
+        plan.spawner_position = random_point_in_area(hazard_spawn_areas[spawn_area], x_center, y_center, spawner_rng)
+
+    return plan
+
 
 class Room(arcade.Sprite):
     def __init__(self):
@@ -28,143 +183,55 @@ class Room(arcade.Sprite):
         self.hazards = [None, None]
         self.background = None
 
-    def setup(self, room_type, x_center, y_center, spawner=None, hazards=None, loot_item_spawn_list=None):
+    def setup(self, room_type, x_center, y_center, spawner=None, hazards=None, loot_item_spawn_list=None,
+              world_seed=None):
         """
         loot_value, allow null for spawners and hazards to be null
+        :param world_seed: WorldSeed whose loot, hazard and spawner streams are used, None for the random module
         :return:
         """
-        self.wall_list = arcade.SpriteList()
-        self.loot_list = arcade.SpriteList()
+        plan = plan_room(room_type, x_center, y_center, spawner is not None, hazards, loot_item_spawn_list,
+                         world_seed)
         self.loot_item_spawn_list = loot_item_spawn_list
+        return self.setup_from_plan(plan, spawner)
+
+    def setup_from_plan(self, plan, spawner=None):
+        """
+        Create the room's sprites from a RoomPlan, nothing random happens here
+        :param plan: RoomPlan
+        :param spawner: the room's Spawner, moved to the planned position
+        :return: self
+        """
+        # Lazy, so rooms that are never drawn never create their GPU buffers
+        self.wall_list = arcade.SpriteList(lazy=True)
+        self.loot_list = arcade.SpriteList(lazy=True)
         self.spawner = spawner
-        self.hazards = [arcade.SpriteList(), arcade.SpriteList()]
-        self.room_type = room_type
-        self.center_x = x_center
-        self.center_y = y_center
-        # print(self.x_center)
-        # Load room data from JSON file
-        with open("resources/rooms_data_with_textures.json") as f:
-            rooms_data = json.load(f)
-
-        # Pull the specific rooms data from the json based on room type bitwise representation
-        rooms_data = rooms_data["rooms"].get(room_type, {})
-        # Get walls data
-        walls_data = rooms_data.get("walls", [])
+        self.hazards = [arcade.SpriteList(lazy=True), arcade.SpriteList(lazy=True)]
+        self.room_type = plan.room_type
+        self.center_x = plan.center_x
+        self.center_y = plan.center_y
+        # Walls, background and spawn areas are compiled once per room type, this room only offsets them
+        template = get_room_template(plan.room_type)
 
         # Set the background
-        self.background = arcade.Sprite(rooms_data.get("background"))
-        self.background.center_x = self.center_x
-        self.background.center_y = self.center_y
-
-        # Create walls based on walls data
-        for wall_data in walls_data:
-            center_x = wall_data["center_x"] + self.center_x
-            center_y = wall_data["center_y"] + self.center_y
-            #width = wall_data["width"]
-            #height = wall_data["height"]
-            filename = wall_data["texture"]
-            #self.create_wall(center_x, center_y, width, height)
-            self.create_wall_from_texture(center_x, center_y, filename)
-
-        # Spawn loot
-        # Get spawn location(s) of room
-        item_spawn_areas = rooms_data.get("item_spawn_areas", [])
-        # Handle spawning item
-        is_two_handed = False
-        for temp_list in self.loot_item_spawn_list:
-            item_value = 0
-            for temp_item in temp_list:
-                if temp_item != 0:
-                    # spawn that many items that are being asked for
-                    for i in range(temp_item):
-                        # Choose a random loot spawn area
-                        spawn_area = random.randint(0, len(item_spawn_areas) - 1)
-                        # select a point in the spawn area - use of integer division to ensure integer bounds
-                        random_x_val = random.randint(self.center_x + item_spawn_areas[spawn_area]["center_x"] -
-                                                      item_spawn_areas[spawn_area]["width"] // 2, self.center_x +
-                                                      item_spawn_areas[spawn_area]["center_x"] +
-                                                      item_spawn_areas[spawn_area]["width"] // 2)
-                        random_y_val = random.randint(self.center_y + item_spawn_areas[spawn_area]["center_y"] -
-                                                      item_spawn_areas[spawn_area]["height"] // 2, self.center_y +
-                                                      item_spawn_areas[spawn_area]["center_y"] +
-                                                      item_spawn_areas[spawn_area][
-                                                          "height"] // 2)
-
-                        # Create a loot item
-                        loot_item = Item().setup(random_x_val, random_y_val, item_value, is_two_handed)
-
-                        # Add the loot item to the room's item list
-                        self.loot_list.append(loot_item)
-
-                item_value += 1
-
-            is_two_handed = True
-
-        # Spawn hazards - mines
-        hazard_spawn_areas = rooms_data.get("hazard_spawn_locations", [])
-        for i in range(hazards[0]):
-            # Choose a random loot spawn area
-            spawn_area = random.randint(0, len(hazard_spawn_areas) - 1)
-            # select a point in the spawn area - use of integer division to ensure integer bounds
-            random_x_val = random.randint(self.center_x + hazard_spawn_areas[spawn_area]["x"] -
-                                          hazard_spawn_areas[spawn_area]["width"] // 2, self.center_x +
-                                          hazard_spawn_areas[spawn_area]["x"] +
-                                          hazard_spawn_areas[spawn_area]["width"] // 2)
-            random_y_val = random.randint(self.center_y + hazard_spawn_areas[spawn_area]["y"] -
-                                          hazard_spawn_areas[spawn_area]["height"] // 2, self.center_y +
-                                          hazard_spawn_areas[spawn_area]["y"] +
-                                          hazard_spawn_areas[spawn_area][
-                                              "height"] // 2)
-
-            # Create a loot item
-            loot_item = Mine().setup(random_x_val, random_y_val)
-
-            # Add the hazard item to the room's item list
-            self.hazards[0].append(loot_item)
-        # Spawn hazards - mines
-        for i in range(hazards[1]):
-            # Choose a random loot spawn area
-            spawn_area = random.randint(0, len(hazard_spawn_areas) - 1)
-            # select a point in the spawn area - use of integer division to ensure integer bounds
-            random_x_val = random.randint(self.center_x + hazard_spawn_areas[spawn_area]["x"] -
-                                          hazard_spawn_areas[spawn_area]["width"] // 2, self.center_x +
-                                          hazard_spawn_areas[spawn_area]["x"] +
-                                          hazard_spawn_areas[spawn_area]["width"] // 2)
-            random_y_val = random.randint(self.center_y + hazard_spawn_areas[spawn_area]["y"] -
-                                          hazard_spawn_areas[spawn_area]["height"] // 2, self.center_y +
-                                          hazard_spawn_areas[spawn_area]["y"] +
-                                          hazard_spawn_areas[spawn_area][
-                                              "height"] // 2)
-
-            # Generate random view direction
-            view_direction = [random.randint(-1, 1), random.randint(-1, 1)]
-
-            # Create a loot item
-            loot_item = Turret().setup(random_x_val, random_y_val, view_direction)
-
-            # Add the loot item to the room's item list
-            self.hazards[1].append(loot_item)
+        self.background = template.make_background(self.center_x, self.center_y)
 
-        # update spawner coords (if it exists)
-        if self.spawner != None:
-            # Choose a random loot spawn area
-            spawn_area = random.randint(0, len(hazard_spawn_areas) - 1)
-            # select a point in the spawn area - use of integer division to ensure integer bounds
-            random_x_val = random.randint(self.center_x + hazard_spawn_areas[spawn_area]["x"] -
-                                          hazard_spawn_areas[spawn_area]["width"] // 2, self.center_x +
-                                          hazard_spawn_areas[spawn_area]["x"] +
-                                          hazard_spawn_areas[spawn_area]["width"] // 2)
-            random_y_val = random.randint(self.center_y + hazard_spawn_areas[spawn_area]["y"] -
-                                          hazard_spawn_areas[spawn_area]["height"] // 2, self.center_y +
-                                          hazard_spawn_areas[spawn_area]["y"] +
-                                          hazard_spawn_areas[spawn_area][
-                                              "height"] // 2)
-        
-            spawner.center_x = random_x_val
-            spawner.center_y = random_y_val
-        
-            
+        # Create walls
+        template.make_walls(self.center_x, self.center_y, self.wall_list)
 
+        # Create the loot items
+        for x, y, value, is_two_handed, item_index, item_value in plan.loot:
+            self.loot_list.append(Item().setup_picked(x, y, value, is_two_handed, item_index, item_value))
+
+        # Create the hazards
+        for x, y in plan.mines:
+            self.hazards[0].append(Mine().setup(x, y))
+        for x, y, view_direction, facing_offset in plan.turrets:
+            self.hazards[1].append(Turret().setup(x, y, view_direction, facing_offset=facing_offset))
+
+        # update spawner coords (if it exists)
+        if self.spawner is not None and plan.spawner_position is not None:
+            self.spawner.center_x, self.spawner.center_y = plan.spawner_position
 
         # We may need to add information to spawner class to actually indicate where the monsters will spawn out of a
         # vent. This could be done using a unit vector representation of a direction, and continuously attempt to spawn
@@ -199,21 +266,6 @@ class Room(arcade.Sprite):
         wall.center_y = center_y
         self.wall_list.append(wall)
 
-    def create_wall_from_texture(self, center_x, center_y, texture):
-        """
-        Need to adapt this function for the texture of each wall (assuming base texture for now,
-           loaded using the room type)
-        :param center_x:
-        :param center_y:
-        :param texture:
-        :return:
-        """
-        wall = arcade.Sprite(texture)  # change this depending on what we want
-        # Will likely have to change how the walls are stored to instead store file locations to sprite pngs
-        wall.center_x = center_x
-        wall.center_y = center_y
-        self.wall_list.append(wall)
-
     def draw_self(self):
         self.background.draw()
         self.wall_list.draw()
@@ -0,0 +1,51 @@
+"""
+Weighted random sampling. AliasTable is built once from a list of weights (Vose's alias method) and then picks an
+index in constant time, instead of random.choices searching the cumulative weights on every pick.
+"""
+import random
+
+
+class AliasTable:
+    def __init__(self, weights):
+        """
+        :param weights: list of non negative weights, they don't need to be normalized
+        """
+        count = len(weights)
+        total = sum(weights)
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+        # Scale so the average weight is 1, then pair each under full column with an over full one
+        scaled = [weight * count / total for weight in weights]
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+        # Anything left is only off from 1 by rounding error, so keeps probability 1
+
+    def sample(self, rng=random):
+        """
+        :return: random index, picked with probability proportional to its weight
+        """
+        column = rng.randrange(len(self.probability))
+        if rng.random() < self.probability[column]:
+            return column
+        return self.alias[column]
+
+    def sample_k(self, k, rng=random):
+        """
+        :return: list of k random indices, picked with replacement
+        """
+        return [self.sample(rng) for _ in range(k)]
+
+    def __len__(self):
+        return len(self.probability)
@@ -0,0 +1,208 @@
+"""
+Screens drawn instead of (or over) the game: start, death, reset, loading and pause. Each screen makes its sprites and
+text once, in screen coordinates, and draws them with its own camera, so showing a screen never loads a texture or lays
+out text again. The ScreenManager builds every screen up front, so switching between them is just picking another one.
+"""
+from time import time
+
+import arcade
+
+import assets
+
+BACKGROUND_DIRECTORY = "resources/screens/"
+CONTROLS_IMAGE = BACKGROUND_DIRECTORY + "controls.png"
+# Start screen button
+BUTTON_WIDTH = 250
+BUTTON_HEIGHT = 50
+# How long the death and reset screens are shown, in milliseconds
+DEATH_SCREEN_DURATION = 3000
+RESET_SCREEN_DURATION = 5000
+# Loading screen progress bar
+LOADING_BAR_WIDTH = 400
+LOADING_BAR_HEIGHT = 24
+# Pause screen controls image, from the center of the screen
+PAUSE_CONTROL_X_SHIFT = 256
+PAUSE_CONTROL_Y_SHIFT = -175
+PAUSE_ALPHA = 128
+
+
+class Screen:
+    def __init__(self, width, height):
+        """
+        :param width: screen width in pixels
+        :param height: screen height in pixels
+        """
+        self.width = width
+        self.height = height
+        self.camera = arcade.Camera(width, height)
+        self.sprites = arcade.SpriteList()
+        self.texts = []
+
+    def add_sprite(self, path, center_x, center_y, alpha=255):
+        sprite = assets.make_sprite(path)
+        sprite.center_x = center_x
+        sprite.center_y = center_y
+        sprite.alpha = alpha
+        self.sprites.append(sprite)
+        return sprite
+
+    def add_background(self, path):
+        """
+        Stretch the image over the whole screen
+        """
+        sprite = self.add_sprite(path, self.width / 2, self.height / 2)
+        sprite.width = self.width
+        sprite.height = self.height
+        return sprite
+
+    def add_text(self, text, x, y, color=arcade.color.WHITE, font_size=20):
+        text = arcade.Text(text, x, y, color, font_size)
+        self.texts.append(text)
+        return text
+
+    def on_show(self):
+        """
+        Called when the game switches to this screen
+        """
+        pass
+
+    def draw(self):
+        """
+        Draw in screen coordinates, the game camera has to be used again after
+        """
+        self.camera.use()
+        self.sprites.draw()
+        for text in self.texts:
+            text.draw()
+
+
+class TimedScreen(Screen):
+    def __init__(self, width, height, duration):
+        """
+        Screen shown for a set time before going back to the game
+        :param duration: milliseconds to show the screen for
+        """
+        super().__init__(width, height)
+        self.duration = duration
+        self.shown_at = None
+
+    def on_show(self):
+        self.shown_at = time() * 1000
+
+    def is_done(self):
+        return self.shown_at is not None and time() * 1000 - self.shown_at >= self.duration
+
+
+class StartScreen(Screen):
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.add_background(BACKGROUND_DIRECTORY + "Screen.jpeg")
+        self.button_x = width // 3
+        self.button_y = height // 3
+        # Gray while the mouse is over the button, red otherwise
+        self.button = arcade.SpriteSolidColor(BUTTON_WIDTH, BUTTON_HEIGHT, arcade.color.RED)
+        self.hovered_button = arcade.SpriteSolidColor(BUTTON_WIDTH, BUTTON_HEIGHT, arcade.color.GRAY)
+        for button in (self.button, self.hovered_button):
+            button.center_x = self.button_x
+            button.center_y = self.button_y
+            self.sprites.append(button)
+        self.hovered_button.visible = False
+        controls = assets.get_texture(CONTROLS_IMAGE)
+        self.add_sprite(CONTROLS_IMAGE, width - controls.width // 2, controls.height // 2)
+        self.add_text("Start", self.button_x - 20, height // 3)
+
+    def is_over_button(self, x, y):
+        return (self.button_x - BUTTON_WIDTH // 2 < x < self.button_x + BUTTON_WIDTH // 2 and
+                self.button_y - BUTTON_HEIGHT // 2 < y < self.button_y + BUTTON_HEIGHT // 2)
+
+    def on_mouse_motion(self, x, y):
+        hovered = self.is_over_button(x, y)
+        self.hovered_button.visible = hovered
+        self.button.visible = not hovered
+
+
+class DeathScreen(TimedScreen):
+    def __init__(self, width, height):
+        super().__init__(width, height, DEATH_SCREEN_DURATION)
+        self.add_background(BACKGROUND_DIRECTORY + "death.jpeg")
+
+
+class ResetScreen(TimedScreen):
+    def __init__(self, width, height):
+        super().__init__(width, height, RESET_SCREEN_DURATION)
+        self.add_background(BACKGROUND_DIRECTORY + "reset.jpeg")
+        self.add_text("-1 day", width // 3 - 15, height // 3)
+
+
+class LoadingScreen(Screen):
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        center_x = width // 2
+        center_y = height // 2
+        self.add_text("Landing...", center_x - LOADING_BAR_WIDTH // 2, center_y + 24, font_size=18)
+        self.outline = arcade.ShapeElementList()
+        self.outline.append(arcade.create_rectangle_outline(center_x, center_y, LOADING_BAR_WIDTH, LOADING_BAR_HEIGHT,
+                                                            arcade.color.WHITE))
+        self.bar_left = center_x - LOADING_BAR_WIDTH // 2
+        self.bar = arcade.SpriteSolidColor(LOADING_BAR_WIDTH, LOADING_BAR_HEIGHT, arcade.color.ORANGE)
+        self.bar.center_y = center_y
+        self.sprites.append(self.bar)
+        self.progress = None
+        self.set_progress(0)
+
+    def set_progress(self, progress):
+        """
+        :param progress: 0 to 1, how much of the bar is filled
+        """
+        if progress == self.progress:
+            return
+        self.progress = progress
+        self.bar.visible = progress > 0
+        if progress > 0:
+            self.bar.width = LOADING_BAR_WIDTH * progress
+            self.bar.center_x = self.bar_left + self.bar.width / 2
+
+    def draw(self):
+        super().draw()
+        self.outline.draw()
+
+
+class PauseScreen(Screen):
+    def __init__(self, width, height):
+        """
+        Drawn over the game, so only half opaque
+        """
+        super().__init__(width, height)
+        self.add_sprite(BACKGROUND_DIRECTORY + "pause_background.png", width / 2, height / 2, PAUSE_ALPHA)
+        self.add_sprite(CONTROLS_IMAGE, width / 2 + PAUSE_CONTROL_X_SHIFT, height / 2 + PAUSE_CONTROL_Y_SHIFT,
+                        PAUSE_ALPHA)
+
+
+class ScreenManager:
+    def __init__(self, screens):
+        """
+        :param screens: dict of screen id: Screen, every screen is built once here
+        """
+        self.screens = screens
+        self.current = None
+
+    def get_screen(self, screen_id):
+        return self.screens[screen_id]
+
+    def set_current(self, screen_id):
+        """
+        Call each frame with the screen the game is on, the screen's on_show is called when it changes. Ids without a
+        Screen (the game itself) are fine
+        """
+        if screen_id == self.current:
+            return
+        self.current = screen_id
+        screen = self.screens.get(screen_id)
+        if screen is not None:
+            screen.on_show()
+
+    def draw(self, screen_id=None):
+        """
+        Draw a screen, the current one if no id is given
+        """
+        self.screens[self.current if screen_id is None else screen_id].draw()
@@ -1,10 +1,11 @@
 import arcade
 import random
-import json
 from player import PlayerCharacter
 from item import Item, Shovel, Lantern
 from item_dropship import ItemDropShip
 from arcade.experimental.lights import Light, LightLayer
+import assets
+import game_data
 
 
 MAX_DOOR_BATTERY = 100
@@ -62,7 +63,7 @@ class Ship(arcade.Sprite):
         # Load tilemap
         self.tilemap = arcade.Scene.from_tilemap(arcade.load_tilemap("resources/tilemaps/ship.tmx"))
         # The door sprite
-        self.door_sprite = arcade.Sprite("resources/wall_sprites/closed_door.png")
+        self.door_sprite = assets.make_sprite("resources/wall_sprites/closed_door.png")
         self.door_sprite.center_x += DOOR_SPRITE_X
         self.door_sprite.center_y += DOOR_SPRITE_Y
         # The loot present on the ship
@@ -111,9 +112,8 @@ class Ship(arcade.Sprite):
         if self.door_closed:
             self.door_sprite.draw()
 
-        # Draw ship loot
-        for item in self.ship_loot:
-            item.draw_self()
+        # Draw ship loot, in one batch
+        self.ship_loot.draw()
 
         # Update the item dropship
         self.item_dropship.draw_self()
@@ -330,9 +330,7 @@ class Ship(arcade.Sprite):
         """
         input_string = input_string.lower()
 
-        with open('resources/items.json', 'r') as f:
-            data = json.load(f)
-        tools = data["tools"]
+        tools = game_data.get_tools()
 
         # check if terminal phrase starts with a moon phrase
         tool = None
@@ -364,9 +362,7 @@ class Ship(arcade.Sprite):
         elif input_string.startswith("moo"):
             # Load moon names
             rtn_string = "Available moons: "
-            with open('resources/moons.json', 'r') as f:
-                data = json.load(f)
-            for moon in data:
+            for moon in game_data.get_moons():
                 rtn_string += "\n" + moon["moon_name"]
             return "moons", rtn_string
         elif input_string.startswith("help"):
@@ -375,9 +371,7 @@ class Ship(arcade.Sprite):
                            "Store: shows store items for purchase\n\n" \
                            "Exit terminal using escape key"
         elif input_string.startswith("sto"):
-            with open('resources/items.json', 'r') as f:
-                data = json.load(f)
-            tools = data["tools"]
+            tools = game_data.get_tools()
             # check if terminal phrase starts with a moon phrase
             output_string = "Store\n"
             for obj in tools:
@@ -386,11 +380,8 @@ class Ship(arcade.Sprite):
         else:
             # Only allow moon switching while in orbit
             if gamestate == GAMESTATE_OPTIONS["orbit"]:
-                # Load moon data for terminal phrases - done after other inputs to not load every time
-                with open('resources/moons.json', 'r') as f:
-                    data = json.load(f)
                 # check if terminal phrase starts with a moon phrase
-                for obj in data:
+                for obj in game_data.get_moons():
                     if input_string.startswith(obj['terminal_phrase']):
                         return obj['terminal_phrase'], f"Routing to {obj['moon_name']}"
             else:
@@ -0,0 +1,320 @@
+"""
+Quick save and load of a run. A snapshot holds the run (quota, days, the ship, the player and their inventory) and,
+while landed, everything on the moon that changes after it is built: loot on the floor, mines, turrets (facing and
+timers), monsters, spawners and the random streams. Bullets in flight aren't kept, they are gone after loading.
+The map itself is stored as its WorldPlan in the plan_file format. Loading a snapshot of the map already built only
+puts back what changes, any other map is built from the plan by a MapBuilder behind the loading screen instead of
+being generated again.
+Everything else is flattened to tuples of plain values and pickled, so taking a snapshot is one pass over the sprites.
+"""
+import pickle
+
+import arcade
+
+from hazards import Mine
+from item import Item, Tool, Shovel, Lantern
+from lod import LODScheduler
+from map import Map, MapBuilder
+from plan_file import plan_to_bytes, read_arrays, plan_from_arrays
+from rendering import CulledSpriteList
+from ship import GAMESTATE_OPTIONS
+from world_planner import WorldPlanner
+from world_seed import WorldSeed
+
+SNAPSHOT_VERSION = 2
+LANDED_GAMESTATES = (GAMESTATE_OPTIONS["outdoors"], GAMESTATE_OPTIONS["indoors"])
+TOOL_CLASSES = {"sho": Shovel, "lan": Lantern}
+
+# The plan of the current map only changes on landing, so it is only encoded once per map
+plan_bytes_cache = [None, None]
+
+
+def encode_plan(plan):
+    """
+    :return: the plan in the plan_file format
+    """
+    if plan_bytes_cache[0] is not plan:
+        plan_bytes_cache[0] = plan
+        plan_bytes_cache[1] = plan_to_bytes(plan)
+    return plan_bytes_cache[1]
+
+
+def item_to_tuple(item):
+    if isinstance(item, Tool):
+        return item.identifier, item.center_x, item.center_y
+    return None, item.center_x, item.center_y, item.value_tier, item.two_handed, item.item_index, item.value
+
+
+def item_from_tuple(data):
+    identifier, x, y = data[:3]
+    if identifier is not None:
+        tool = TOOL_CLASSES.get(identifier, Tool)()
+        tool.setup_tool(x, y, identifier)
+        return tool
+    value_tier, is_two_handed, item_index, value = data[3:]
+    return Item().setup_picked(x, y, value_tier, is_two_handed, item_index, value)
+
+
+def items_to_list(items):
+    return [item_to_tuple(item) for item in items]
+
+
+def items_from_list(data, items=None):
+    """
+    :param items: SpriteList to add the items to, a new one if None
+    """
+    if items is None:
+        items = arcade.SpriteList()
+    for item in data:
+        items.append(item_from_tuple(item))
+    return items
+
+
+def spawner_to_tuple(spawner):
+    return list(spawner.cooldown_queue), list(spawner.spawn_queue), spawner.queue_pos, spawner.cooldown_current
+
+
+def restore_spawner(spawner, data):
+    cooldowns, monsters, queue_pos, cooldown_current = data
+    spawner.cooldown_queue = cooldowns
+    spawner.spawn_queue = monsters
+    spawner.queue_pos = queue_pos
+    spawner.cooldown_current = cooldown_current
+
+
+def monster_to_tuple(monster):
+    return monster.type, monster.center_x, monster.center_y, monster.health
+
+
+def turret_to_tuple(turret):
+    return (turret.facing_direction, turret.rotate_direction, turret.delaying, turret.delay_at_edges,
+            turret.detection_angle, turret.aiming, turret.firing, turret.delay_firing, turret.fire_duration)
+
+
+def restore_turret(turret, data):
+    (turret.facing_direction, turret.rotate_direction, turret.delaying, turret.delay_at_edges, turret.detection_angle,
+     turret.aiming, turret.firing, turret.delay_firing, turret.fire_duration) = data
+    turret.angle = turret.facing_direction
+    # The laser is worked out again on the turret's next update
+    turret.turret_laser = None
+    turret.get_laser_sprite().visible = False
+
+
+def player_to_dict(player):
+    return {"position": (player.center_x, player.center_y),
+            "health": player.health,
+            "stamina": player.stamina,
+            "inventory": [None if item is None else item_to_tuple(item) for item in player.inventory],
+            "slot": player.current_item_slot_selected,
+            "lantern_on": player.lantern_on}
+
+
+def restore_player(player, data):
+    player.center_x, player.center_y = data["position"]
+    player.health = data["health"]
+    player.stamina = data["stamina"]
+    player.clear_inv()
+    player.holding_two_handed = False
+    player.total_weight = 0
+    for slot, item in enumerate(data["inventory"], 1):
+        if item is not None:
+            player.add_item(slot, item_from_tuple(item))
+    player.current_item_slot_selected = data["slot"]
+    player.lantern_on = data["lantern_on"]
+
+
+def ship_to_dict(ship):
+    dropship = ship.item_dropship
+    return {"position": (ship.center_x, ship.center_y),
+            "money": ship.money,
+            "loot": items_to_list(ship.ship_loot),
+            "in_orbit": ship.in_orbit,
+            "door_closed": ship.door_closed,
+            "door_battery": ship.door_battery,
+            "door_battery_drain": ship.door_battery_drain,
+            "dropship": ((dropship.center_x, dropship.center_y), dropship.time_until_drop,
+                         dropship.time_before_leave, items_to_list(dropship.items))}
+
+
+def restore_ship(ship, data):
+    # Moving the ship moves its walls and loot with it
+    ship.update_position(data["position"][0] - ship.center_x, data["position"][1] - ship.center_y)
+    ship.money = data["money"]
+    ship.ship_loot = arcade.SpriteList()
+    ship.total_loot_value = 0
+    for item in items_from_list(data["loot"]):
+        ship.add_item(item)
+    ship.in_orbit = data["in_orbit"]
+    ship.door_closed = data["door_closed"]
+    ship.door_battery = data["door_battery"]
+    ship.door_battery_drain = data["door_battery_drain"]
+    dropship = ship.item_dropship
+    dropship.position, dropship.time_until_drop, dropship.time_before_leave, items = data["dropship"]
+    dropship.items = items_from_list(items)
+
+
+def moon_to_dict(game):
+    """
+    Everything about the moon the player is on that changes after landing
+    """
+    indoor_map = game.indoor_map
+    return {"plan": encode_plan(indoor_map.plan),
+            "map_seed": indoor_map.world_seed.get_state(),
+            "elapsed": game.delta_time,
+            "indoor_loot": items_to_list(game.indoor_loot_items),
+            "mines": [(mine.center_x, mine.center_y) for mine in game.mines],
+            "armed_mines": [(mine.center_x, mine.center_y, mine.explosion_delay) for mine in game.armed_mines],
+            "turrets": [turret_to_tuple(turret) for turret in game.turrets],
+            "spawners": [spawner_to_tuple(spawner) for spawner in indoor_map.spawners],
+            "outdoor_spawners": [spawner_to_tuple(spawner) for spawner in indoor_map.outdoor_spawners],
+            "power": (indoor_map.indoor_power_current, indoor_map.outdoor_power_current),
+            "indoor_monsters": [monster_to_tuple(monster) for monster in game.indoor_enemy_entities],
+            "outdoor_monsters": [monster_to_tuple(monster) for monster in game.outdoor_enemy_entities]}
+
+
+def is_map_built(game, header):
+    """
+    :param header: header of the snapshot's plan, from read_arrays
+    :return: True if the game's map is already fully built from the same moon and seed
+    """
+    plan = game.indoor_map.plan if game.indoor_map is not None else None
+    return (game.map_builder is None and plan is not None and plan.moon_id == header["moon_id"] and
+            plan.seed == header["seed"])
+
+
+def restore_moon(game, data):
+    """
+    Put the moon back the way it was, the map must already be built from the snapshot's plan and landed on
+    (finish_setup). Only what changes after landing is replaced, so this costs the size of the saved state
+    """
+    indoor_map = game.indoor_map
+    game.delta_time = data["elapsed"]
+    game.lod_scheduler = LODScheduler()
+
+    game.indoor_loot_items = items_from_list(data["indoor_loot"], CulledSpriteList())
+    game.mines = CulledSpriteList()
+    for x, y in data["mines"]:
+        game.mines.append(Mine().setup(x, y))
+    game.armed_mines = CulledSpriteList()
+    for x, y, explosion_delay in data["armed_mines"]:
+        mine = Mine().setup(x, y)
+        mine.arm_mine()
+        mine.explosion_delay = explosion_delay
+        game.armed_mines.append(mine)
+    # Turrets are built in plan order, so they line up with the saved ones
+    for turret, turret_data in zip(game.turrets, data["turrets"]):
+        restore_turret(turret, turret_data)
+    game.bullets = arcade.SpriteList()
+
+    for spawner, spawner_data in zip(indoor_map.spawners, data["spawners"]):
+        restore_spawner(spawner, spawner_data)
+    for spawner, spawner_data in zip(indoor_map.outdoor_spawners, data["outdoor_spawners"]):
+        restore_spawner(spawner, spawner_data)
+    indoor_map.indoor_power_current, indoor_map.outdoor_power_current = data["power"]
+
+    game.indoor_enemy_entities = []
+    game.outdoor_enemy_entities = []
+    for type, x, y, health in data["indoor_monsters"]:
+        monster = indoor_map.make_indoor_monster(type, x, y)
+        monster.health = health
+        game.indoor_enemy_entities.append(monster)
+    for type, x, y, health in data["outdoor_monsters"]:
+        monster = indoor_map.make_outdoor_monster(type, x, y)
+        monster.health = health
+        game.outdoor_enemy_entities.append(monster)
+    # Making the monsters used the AI stream, so the streams are put back last
+    indoor_map.world_seed.set_state(data["map_seed"])
+
+
+def take_snapshot(game):
+    """
+    :param game: LethalGame
+    :return: bytes holding the state of the run
+    """
+    snapshot = {"version": SNAPSHOT_VERSION,
+                "gamestate": game.gamestate,
+                "moon_name": game.moon_name,
+                "quota": game.quota,
+                "quotas_hit": game.quotas_hit,
+                "days_left": game.days_left,
+                "scrap_sold": game.scrap_sold,
+                "world_seed": game.world_seed.get_state(),
+                "player": player_to_dict(game.player),
+                "ship": ship_to_dict(game.ship),
+                "outdoor_loot": items_to_list(game.outdoor_loot_items),
+                "sell_list": items_to_list(game.sell_list),
+                "moon": moon_to_dict(game) if game.gamestate in LANDED_GAMESTATES else None}
+    return pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)
+
+
+def restore_snapshot(game, data):
+    """
+    Put the game back to the state a snapshot was taken in. Only the saved map is built, nothing is generated. If the
+    snapshot is on a different map than the one built, game.map_builder is set to build it and the rest of the
+    snapshot waits in game.pending_snapshot, call finish_restore once the map is built and landed on (finish_setup).
+    game.delta_time is set to the time into the day, the game's clock has to be moved to match
+    :param game: LethalGame
+    :param data: bytes from take_snapshot
+    :return: True if the game was restored, False if the map has to be built first
+    """
+    snapshot = pickle.loads(data)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("Snapshot version " + str(snapshot.get("version")) + " is not supported, expected " +
+                         str(SNAPSHOT_VERSION))
+    if snapshot["moon"] is not None:
+        header, arrays = read_arrays(snapshot["moon"]["plan"])
+        if not is_map_built(game, header):
+            plan = plan_from_arrays(header, arrays)
+            game.moon_name = plan.moon_id
+            game.indoor_map = Map(plan.moon_id, plan.seed)
+            game.map_builder = MapBuilder(game.indoor_map, plan)
+            game.pending_snapshot = snapshot
+            return False
+    apply_snapshot(game, snapshot)
+    return True
+
+
+def finish_restore(game):
+    """
+    Put back the rest of game.pending_snapshot, once its map has been built and landed on
+    """
+    snapshot = game.pending_snapshot
+    game.pending_snapshot = None
+    apply_snapshot(game, snapshot)
+
+
+def apply_snapshot(game, snapshot):
+    """
+    :param snapshot: unpickled snapshot, its map (if landed) already built
+    """
+    if snapshot["moon"] is not None:
+        # Landing moves the ship and player, so this goes before they are restored
+        restore_moon(game, snapshot["moon"])
+
+    game.gamestate = snapshot["gamestate"]
+    game.moon_name = snapshot["moon_name"]
+    game.quota = snapshot["quota"]
+    game.quotas_hit = snapshot["quotas_hit"]
+    game.days_left = snapshot["days_left"]
+    game.scrap_sold = snapshot["scrap_sold"]
+    game.world_seed = WorldSeed(snapshot["world_seed"][0])
+    game.world_seed.set_state(snapshot["world_seed"])
+    # Anything planned in orbit came from the old seed state
+    game.world_planner = WorldPlanner(game.world_planner.cache_directory)
+    restore_ship(game.ship, snapshot["ship"])
+    restore_player(game.player, snapshot["player"])
+    game.outdoor_loot_items = items_from_list(snapshot["outdoor_loot"], CulledSpriteList())
+    game.sell_list = items_from_list(snapshot["sell_list"])
+
+
+def save_snapshot(game, filename):
+    with open(filename, "wb") as file:
+        file.write(take_snapshot(game))
+
+
+def load_snapshot(game, filename):
+    """
+    :return: same as restore_snapshot
+    """
+    with open(filename, "rb") as file:
+        return restore_snapshot(game, file.read())
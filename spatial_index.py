@@ -0,0 +1,240 @@
+"""
+Uniform grid over the map, used so that wall collision checks only look at the walls near a shape instead of every
+wall on the moon. Cells are the size of a room tile, so most queries only touch one to four cells.
+"""
+import math
+
+import arcade
+
+ROOM_SIZE = 256
+
+
+class WallSpatialIndex:
+    def __init__(self, wall_list=None, cell_size=ROOM_SIZE):
+        """
+        Static walls are bucketed once by the cells their bounding box overlaps
+        :param wall_list: SpriteList (or any iterable) of wall sprites
+        :param cell_size: pixel size of a cell, a room tile by default
+        """
+        self.cell_size = cell_size
+        # (cell x, cell y): list of (wall, left, right, bottom, top)
+        self.cells = {}
+        self.wall_count = 0
+        if wall_list is not None:
+            self.add_walls(wall_list)
+
+    def add_walls(self, wall_list):
+        for wall in wall_list:
+            self.add_wall(wall)
+
+    def add_wall(self, wall):
+        """
+        Add a wall, its bounding box is cached, so walls must not move after being added
+        """
+        entry = (wall, wall.left, wall.right, wall.bottom, wall.top)
+        for cell in self.get_cells(entry[1], entry[2], entry[3], entry[4]):
+            self.cells.setdefault(cell, []).append(entry)
+        self.wall_count += 1
+
+    def get_cells(self, left, right, bottom, top):
+        """
+        :return: generator of every (x, y) cell a bounding box overlaps
+        """
+        for x in range(int(left // self.cell_size), int(right // self.cell_size) + 1):
+            for y in range(int(bottom // self.cell_size), int(top // self.cell_size) + 1):
+                yield x, y
+
+    def query_entries(self, left, right, bottom, top):
+        """
+        :return: list of (wall, left, right, bottom, top) whose bounding box overlaps the given one, no duplicates
+        """
+        found = []
+        seen = set()
+        for cell in self.get_cells(left, right, bottom, top):
+            for entry in self.cells.get(cell, ()):
+                if entry[1] > right or entry[2] < left or entry[3] > top or entry[4] < bottom:
+                    continue
+                if id(entry[0]) in seen:
+                    continue
+                seen.add(id(entry[0]))
+                found.append(entry)
+        return found
+
+    def query(self, left, right, bottom, top):
+        """
+        :return: list of wall sprites whose bounding box overlaps the given one
+        """
+        return [entry[0] for entry in self.query_entries(left, right, bottom, top)]
+
+    def get_cells_on_segment(self, x1, y1, x2, y2):
+        """
+        DDA traversal, yields every cell the segment passes through in order from (x1, y1)
+        """
+        cell_x = int(x1 // self.cell_size)
+        cell_y = int(y1 // self.cell_size)
+        end_x = int(x2 // self.cell_size)
+        end_y = int(y2 // self.cell_size)
+        dx = x2 - x1
+        dy = y2 - y1
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        # Distance along the segment (0 to 1) to the next cell boundary, and between boundaries, for each axis
+        if dx != 0:
+            next_boundary_x = (cell_x + (step_x > 0)) * self.cell_size
+            t_max_x = (next_boundary_x - x1) / dx
+            t_delta_x = self.cell_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dy != 0:
+            next_boundary_y = (cell_y + (step_y > 0)) * self.cell_size
+            t_max_y = (next_boundary_y - y1) / dy
+            t_delta_y = self.cell_size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        yield cell_x, cell_y
+        # Number of cells crossed is fixed, which avoids floating point drift past the end
+        for _ in range(abs(end_x - cell_x) + abs(end_y - cell_y)):
+            if t_max_x < t_max_y:
+                cell_x += step_x
+                t_max_x += t_delta_x
+            else:
+                cell_y += step_y
+                t_max_y += t_delta_y
+            yield cell_x, cell_y
+
+    def is_clear_line_of_sight(self, x1, y1, x2, y2):
+        """
+        True if no wall's bounding box touches the segment, only walls in the cells along the segment are tested
+        """
+        checked = set()
+        for cell in self.get_cells_on_segment(x1, y1, x2, y2):
+            for wall, left, right, bottom, top in self.cells.get(cell, ()):
+                if id(wall) in checked:
+                    continue
+                checked.add(id(wall))
+                if segment_intersects_aabb(x1, y1, x2, y2, left, right, bottom, top):
+                    return False
+        return True
+
+    def raycast(self, x, y, angle_degrees, max_length):
+        """
+        Cast a ray and find the first wall it hits, walking the cells along the ray in order
+        :return: distance from (x, y) to the first wall hit, max_length if nothing is hit
+        """
+        end_x = x + math.cos(math.radians(angle_degrees)) * max_length
+        end_y = y + math.sin(math.radians(angle_degrees)) * max_length
+        closest = None
+        visited = set()
+        checked = set()
+        for cell in self.get_cells_on_segment(x, y, end_x, end_y):
+            visited.add(cell)
+            for wall, left, right, bottom, top in self.cells.get(cell, ()):
+                if id(wall) in checked:
+                    continue
+                checked.add(id(wall))
+                entry = segment_aabb_entry(x, y, end_x, end_y, left, right, bottom, top)
+                if entry is not None and (closest is None or entry < closest):
+                    closest = entry
+            # Walls are in every cell they overlap, so once the closest hit is in a cell already walked nothing
+            # further along the ray can be closer
+            if closest is not None:
+                hit_cell = (int((x + (end_x - x) * closest) // self.cell_size),
+                            int((y + (end_y - y) * closest) // self.cell_size))
+                if hit_cell in visited:
+                    break
+        if closest is None:
+            return max_length
+        return closest * max_length
+
+    def check_for_collision(self, sprite):
+        """
+        Same result as arcade.check_for_collision_with_list(sprite, walls), only checking nearby walls
+        :param sprite: any sprite with a hit box
+        :return: list of walls hit
+        """
+        return [wall for wall in self.query(sprite.left, sprite.right, sprite.bottom, sprite.top)
+                if wall is not sprite and arcade.check_for_collision(sprite, wall)]
+
+    def get_cell_bounds(self):
+        """
+        :return: (left, right, bottom, top) cells that contain walls (inclusive), None if there are no walls
+        """
+        if not self.cells:
+            return None
+        xs = [cell[0] for cell in self.cells]
+        ys = [cell[1] for cell in self.cells]
+        return min(xs), max(xs), min(ys), max(ys)
+
+    def __len__(self):
+        return self.wall_count
+
+
+class TileVisibilityTable:
+    def __init__(self, wall_index, left, right, bottom, top, tile_size=ROOM_SIZE):
+        """
+        Line of sight between the centers of neighbouring tiles, which never changes once the walls are placed.
+        Every tile in the bounds is precomputed, anything outside is worked out and stored the first time it is asked
+        :param wall_index: WallSpatialIndex of the static walls
+        :param left: lowest x tile (inclusive), and so on for the other bounds
+        :param tile_size: pixel size of a tile
+        """
+        self.wall_index = wall_index
+        self.tile_size = tile_size
+        self.tile_center = tile_size // 2
+        # (lower tile, higher tile): bool, the pair is sorted so each edge is only stored once
+        self.visible = {}
+        for x in range(left, right + 1):
+            for y in range(bottom, top + 1):
+                # Up and right covers every edge once
+                self.is_visible((x, y), (x, y + 1))
+                self.is_visible((x, y), (x + 1, y))
+
+    def is_visible(self, tile, neighbour):
+        """
+        :param tile: (x, y) tile
+        :param neighbour: (x, y) tile next to it
+        :return: True if there is a clear line of sight between the tile centers
+        """
+        tile = (int(tile[0]), int(tile[1]))
+        neighbour = (int(neighbour[0]), int(neighbour[1]))
+        key = (tile, neighbour) if tile < neighbour else (neighbour, tile)
+        visible = self.visible.get(key)
+        if visible is None:
+            visible = self.wall_index.is_clear_line_of_sight(key[0][0] * self.tile_size + self.tile_center,
+                                                             key[0][1] * self.tile_size + self.tile_center,
+                                                             key[1][0] * self.tile_size + self.tile_center,
+                                                             key[1][1] * self.tile_size + self.tile_center)
+            self.visible[key] = visible
+        return visible
+
+
+def segment_intersects_aabb(x1, y1, x2, y2, left, right, bottom, top):
+    """
+    Slab test, True if the segment from (x1, y1) to (x2, y2) touches the rectangle
+    """
+    return segment_aabb_entry(x1, y1, x2, y2, left, right, bottom, top) is not None
+
+
+def segment_aabb_entry(x1, y1, x2, y2, left, right, bottom, top):
+    """
+    Slab test of the segment from (x1, y1) to (x2, y2) against the rectangle
+    :return: fraction along the segment (0 to 1) where it first touches the rectangle, None if it misses
+    """
+    t_enter = 0.0
+    t_exit = 1.0
+    for start, delta, low, high in ((x1, x2 - x1, left, right), (y1, y2 - y1, bottom, top)):
+        if delta == 0:
+            # Parallel to this slab, so it has to already be inside it
+            if start < low or start > high:
+                return None
+            continue
+        t_low = (low - start) / delta
+        t_high = (high - start) / delta
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        t_enter = max(t_enter, t_low)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return None
+    return t_enter
@@ -1,4 +1,5 @@
 import arcade
+import assets
 
 class Spawner(arcade.Sprite):
 
@@ -8,7 +9,7 @@ class Spawner(arcade.Sprite):
         """
         super().__init__()
 
-        self.texture = arcade.load_texture("resources/hazard_sprites/vent.png")
+        self.texture = assets.get_texture("resources/hazard_sprites/vent.png")
         self.cooldown_max = 0
         self.cooldown_current = 0
         self.spawn_queue = []
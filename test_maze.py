@@ -0,0 +1,44 @@
+"""
+Regression tests for maze generation, run with:
+    python -m pytest test_maze.py
+The expected mazes were made by the nested string generator gen_maze replaced, so they pin the DOOR_* bit order, the
+order of the random calls and the maze_to_strings shim.
+"""
+import random
+
+from maze import gen_maze, maze_to_strings, room_type_bits, room_type_string
+
+# random.seed(2024), then the old gen_dfs_maze(5)
+OLD_MAZE_5 = [["0100", "1100", "0011", "1100", "0010"],
+              ["1101", "1011", "1110", "1111", "0110"],
+              ["0101", "1010", "1011", "0111", "0101"],
+              ["1001", "1011", "0111", "0101", "0101"],
+              ["1000", "1010", "1011", "1010", "0011"]]
+# random.seed(2024), then the old gen_dfs_maze(9), as door masks indexed by x * 9 + y
+OLD_MAZE_9 = bytes.fromhex("0c0e020c030c0a0a0205030d0b0c0b0f0e06090e07090b0e040c030c03090f0e09030906050c0f0e"
+                           "0b070c0a070d0f050b07050b0e0109060f0c07090e0906040705050c06050d070903090a03090b03"
+                           "01")
+
+
+def test_gen_maze_matches_old_generator():
+    starting_node, rooms = gen_maze(5, random.Random(2024))
+    assert starting_node == [0, 2]
+    assert maze_to_strings(rooms, 5) == OLD_MAZE_5
+
+
+def test_gen_maze_room_bytes():
+    starting_node, rooms = gen_maze(9, random.Random(2024))
+    assert starting_node == [0, 4]
+    assert bytes(rooms) == OLD_MAZE_9
+
+
+def test_gen_maze_uses_random_module_by_default():
+    random.seed(2024)
+    _, rooms = gen_maze(5)
+    assert maze_to_strings(rooms, 5) == OLD_MAZE_5
+
+
+def test_room_type_round_trip():
+    for bits in range(16):
+        assert room_type_bits(room_type_string(bits)) == bits
+    assert room_type_string(0b0101) == "0101"
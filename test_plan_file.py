@@ -0,0 +1,87 @@
+"""
+Tests for the binary WorldPlan format, run with:
+    python -m pytest test_plan_file.py
+"""
+import pytest
+
+from map import plan_world
+from plan_file import HEADER, VERSION, plan_to_bytes, read_arrays, plan_from_arrays, save_plan, load_plan, \
+    load_or_plan, get_cache_filename
+
+SEED = 2024
+
+
+def assert_same_plan(plan, loaded):
+    assert loaded.moon_id == plan.moon_id
+    assert loaded.seed == plan.seed
+    assert loaded.map_size == plan.map_size
+    assert list(loaded.player_start) == list(plan.player_start)
+    assert bytes(loaded.room_bits) == bytes(plan.room_bits)
+    assert len(loaded.rooms) == len(plan.rooms)
+    for column, loaded_column in zip(plan.rooms, loaded.rooms):
+        assert len(loaded_column) == len(column)
+        for room, loaded_room in zip(column, loaded_column):
+            assert loaded_room.room_type == room.room_type
+            assert loaded_room.loot == room.loot
+            assert loaded_room.mines == room.mines
+            assert loaded_room.turrets == room.turrets
+            assert loaded_room.spawner_position == room.spawner_position
+    assert loaded.spawners == plan.spawners
+
+
+@pytest.mark.parametrize("moon_id", ["experimentation", "assurance", "titan"])
+def test_round_trip(moon_id):
+    plan = plan_world(moon_id, SEED)
+    assert_same_plan(plan, plan_from_arrays(*read_arrays(plan_to_bytes(plan))))
+
+
+def test_same_seed_same_bytes():
+    assert plan_to_bytes(plan_world("titan", SEED)) == plan_to_bytes(plan_world("titan", SEED))
+
+
+def test_save_and_load(tmp_path):
+    plan = plan_world("assurance", SEED)
+    filename = get_cache_filename(tmp_path, plan.moon_id, plan.seed)
+    save_plan(plan, filename)
+    assert_same_plan(plan, load_plan(filename))
+
+
+def test_rejects_other_files():
+    buffer = bytearray(plan_to_bytes(plan_world("experimentation", SEED)))
+    buffer[:4] = b"NOPE"
+    with pytest.raises(ValueError, match="Not a map plan file"):
+        read_arrays(buffer)
+
+
+def test_rejects_other_versions():
+    buffer = bytearray(plan_to_bytes(plan_world("experimentation", SEED)))
+    # The version follows the 4 byte magic
+    HEADER.pack_into(buffer, 0, *(b"LCMP", VERSION + 1) + HEADER.unpack_from(buffer, 0)[2:])
+    with pytest.raises(ValueError, match="version"):
+        read_arrays(buffer)
+
+
+def test_load_or_plan_replaces_other_versions(tmp_path):
+    filename = get_cache_filename(tmp_path, "titan", SEED)
+    with open(filename, "wb") as file:
+        file.write(b"LCMP" + bytes(HEADER.size))
+    plan = load_or_plan("titan", SEED, tmp_path)
+    assert_same_plan(plan_world("titan", SEED), plan)
+    assert_same_plan(plan, load_plan(filename))
+
+
+def test_rejects_truncated_files():
+    with pytest.raises(ValueError, match="Not a map plan file"):
+        read_arrays(b"LCMP\x01\x00")
+    buffer = plan_to_bytes(plan_world("experimentation", SEED))
+    with pytest.raises(ValueError):
+        read_arrays(buffer[:len(buffer) - 1])
+
+
+def test_load_or_plan_replaces_truncated_files(tmp_path):
+    filename = get_cache_filename(tmp_path, "titan", SEED)
+    with open(filename, "wb") as file:
+        file.write(b"LCMP\x01\x00")
+    plan = load_or_plan("titan", SEED, tmp_path)
+    assert_same_plan(plan_world("titan", SEED), plan)
+    assert_same_plan(plan, load_plan(filename))
@@ -0,0 +1,128 @@
+"""
+Loading a moon's outdoor tilemap a part at a time. Parsing the TMX file only makes plain data (pytiled_parser), so the
+world planner does it on its thread and the parsed map is kept for later landings. Turning it into sprites has to be
+done on the main thread, so each tile layer is cut into small blocks, and MapBuilder builds one block per step like
+the rooms, instead of making every tile sprite in one call.
+"""
+import copy
+import math
+import threading
+
+import arcade
+import pytiled_parser
+from arcade.resources import resolve_resource_path
+
+# Tiles made into sprites per part, at about 50 microseconds a tile in arcade 2.6 this keeps a part inside BUILD_BUDGET
+TILES_PER_PART = 64
+
+# File name: parsed pytiled_parser.TiledMap, shared (read only) by every map using the file
+parsed_tilemaps = {}
+# The planner thread and a landing that didn't wait for it can parse at the same time
+parse_lock = threading.Lock()
+
+
+def parse_tilemap(filename):
+    """
+    Safe to call off the main thread, each file is only parsed once
+    :return: pytiled_parser.TiledMap
+    """
+    with parse_lock:
+        tiled_map = parsed_tilemaps.get(filename)
+        if tiled_map is None:
+            # Resolved the way arcade.load_tilemap does, so the tile textures are cached under the same names
+            tiled_map = pytiled_parser.parse_map(resolve_resource_path(filename))
+            parsed_tilemaps[filename] = tiled_map
+    return tiled_map
+
+
+def get_tilemap_parts(filename, tiles_per_part=TILES_PER_PART):
+    """
+    Split the tilemap into TiledMaps of a single layer each, with tile layers cut again into blocks of about
+    tiles_per_part tiles. A block only holds its own rows and columns, so making its sprites never looks at the rest of
+    the layer, and comes with the offset that puts its tiles back where they are in the whole map
+    :return: list of (TiledMap, (x offset, y offset)), in layer order
+    """
+    tiled_map = parse_tilemap(filename)
+    tile_width, tile_height = tiled_map.tile_size
+    parts = []
+    for layer in tiled_map.layers:
+        blocks = []
+        if isinstance(layer, pytiled_parser.TileLayer) and layer.data:
+            blocks = get_tile_blocks(layer.data, tiles_per_part)
+        if not blocks:
+            # Not a tile layer, or no tiles in it, still one part so the scene has the layer
+            parts.append((get_layer_map(tiled_map, layer), (0, 0)))
+        for top, bottom, left, right in blocks:
+            block = copy.copy(layer)
+            block.data = [row[left:right] for row in layer.data[top:bottom]]
+            # arcade places rows down from the top of the map, so a block starting lower down moves down
+            parts.append((get_layer_map(tiled_map, block), (left * tile_width, -top * tile_height)))
+    return parts
+
+
+def get_tile_blocks(data, tiles_per_part):
+    """
+    Cut a layer into strips of columns about as wide as a full block is tall, then each strip into blocks of whole
+    rows holding about tiles_per_part tiles. Rows of a strip without tiles are left out of its blocks
+    :param data: rows of tile ids, 0 for no tile
+    :return: list of (first row, row after the last, first column, column after the last) of each block
+    """
+    strip_width = max(1, math.isqrt(tiles_per_part))
+    width = max(len(row) for row in data)
+    blocks = []
+    for left in range(0, width, strip_width):
+        right = left + strip_width
+        top = None
+        tiles = 0
+        for index, row in enumerate(data):
+            cells = row[left:right]
+            row_tiles = len(cells) - cells.count(0)
+            if row_tiles and top is None:
+                top = index
+            tiles += row_tiles
+            if tiles >= tiles_per_part:
+                blocks.append((top, index + 1, left, min(right, width)))
+                top = None
+                tiles = 0
+        if top is not None:
+            blocks.append((top, len(data), left, min(right, width)))
+    return blocks
+
+
+def get_layer_map(tiled_map, layer):
+    """
+    :return: copy of the TiledMap with only the given layer, sharing everything else
+    """
+    layer_map = copy.copy(tiled_map)
+    layer_map.layers = [layer]
+    return layer_map
+
+
+def add_tilemap_part(scene, part):
+    """
+    Make the sprites of a part and add them to the scene, each layer name is one SpriteList however many parts it is
+    built from
+    :param scene: arcade.Scene to add to
+    :param part: (TiledMap, offset) from get_tilemap_parts
+    :return: dict of layer name: list of the sprites made
+    """
+    layer_map, offset = part
+    tilemap = arcade.TileMap(tiled_map=layer_map, offset=offset)
+    added = {}
+    for name, sprite_list in tilemap.sprite_lists.items():
+        added[name] = list(sprite_list)
+        if name in scene.name_mapping:
+            scene[name].extend(sprite_list)
+            # The part's list is thrown away, so the sprites shouldn't keep a reference to it
+            sprite_list.clear()
+        else:
+            scene.add_sprite_list(name=name, sprite_list=sprite_list)
+    return added
+
+
+def get_part_layer_name(part):
+    """
+    :param part: (TiledMap, offset) from get_tilemap_parts
+    """
+    return part[0].layers[0].name
+
@@ -1,5 +1,6 @@
 import math
 import arcade
+from spatial_index import WallSpatialIndex, segment_intersects_aabb, segment_aabb_entry
 
 
 def euclidean_distance(point1, point2):
@@ -56,38 +57,57 @@ def is_within_facing_direction(self_position, self_facing_direction, target_posi
 def is_clear_line_of_sight(point1_x, point1_y, point2_x, point2_y, walls):
     """
     Check if there's a clear line of sight between a turret and a player, considering walls.
+    Tests the segment against wall bounding boxes directly, walls can be a WallSpatialIndex (only walls along the
+    segment are checked) or a SpriteList
     """
-    # Create a line segment between turret and player
-    line = LineSegment(point1_x, point1_y, point2_x, point2_y)
-    line_of_sight_collisions = arcade.check_for_collision_with_list(line, walls)
+    if isinstance(walls, WallSpatialIndex):
+        return walls.is_clear_line_of_sight(point1_x, point1_y, point2_x, point2_y)
 
+    for wall in walls:
+        if segment_intersects_aabb(point1_x, point1_y, point2_x, point2_y, wall.left, wall.right, wall.bottom,
+                                   wall.top):
+            return False
     # Line of sight is clear
-    return not line_of_sight_collisions
+    return True
 
 
-def draw_line_until_collision(start_x, start_y, angle_degrees, max_length, walls, alpha=255, step=2):
+def draw_line_until_collision(start_x, start_y, angle_degrees, max_length, walls, alpha=255, line=None):
     """
     Draw a line segment until it hits a wall
+    The length comes from a single ray cast against the walls (a WallSpatialIndex or SpriteList), pass in the
+    line from the last call to move it instead of creating a new sprite
     """
+    if isinstance(walls, WallSpatialIndex):
+        length = walls.raycast(start_x, start_y, angle_degrees, max_length)
+    else:
+        length = raycast_wall_list(start_x, start_y, angle_degrees, max_length, walls)
+    # Keep at least a pixel of line, so the sprite still has a size when right up against a wall
+    length = max(length, 1)
+
     # Convert angle to radians
     angle_radians = math.radians(angle_degrees)
+    end_x = start_x + math.cos(angle_radians) * length
+    end_y = start_y + math.sin(angle_radians) * length
 
-    # Initialize line segment with start point and angle
-    line = LineSegment(start_x, start_y, start_x + math.cos(angle_radians) * max_length,
-                       start_y + math.sin(angle_radians) * max_length, color=arcade.color.ORANGE, alpha=alpha)
-
-    # Iterate until collision with wall or max_length reached
-    while line.width < max_length:
-        # Extend the line segment
-        line.extend(step)
+    if line is None:
+        return LineSegment(start_x, start_y, end_x, end_y, color=arcade.color.ORANGE, alpha=alpha)
+    line.set_points(start_x, start_y, end_x, end_y)
+    return line
 
-        # Check for collision with walls
-        if len(arcade.check_for_collision_with_list(line, walls)) > 0:
-            # If collision detected, return the current line segment
-            return line
 
-    # If no collision detected, return the line segment of max length
-    return line
+def raycast_wall_list(start_x, start_y, angle_degrees, max_length, walls):
+    """
+    Same as WallSpatialIndex.raycast, checking every wall in the list
+    :return: distance to the first wall hit, max_length if nothing is hit
+    """
+    end_x = start_x + math.cos(math.radians(angle_degrees)) * max_length
+    end_y = start_y + math.sin(math.radians(angle_degrees)) * max_length
+    closest = 1
+    for wall in walls:
+        entry = segment_aabb_entry(start_x, start_y, end_x, end_y, wall.left, wall.right, wall.bottom, wall.top)
+        if entry is not None and entry < closest:
+            closest = entry
+    return closest * max_length
 
 
 class LineSegment(arcade.Sprite):
@@ -113,6 +133,15 @@ class LineSegment(arcade.Sprite):
         # Set the color of the line segment
         self.color = color
 
+    def set_points(self, point1_x, point1_y, point2_x, point2_y):
+        """
+        Move the line segment to new end points, so the same sprite can be reused
+        """
+        self.center_x = (point1_x + point2_x) / 2
+        self.center_y = (point1_y + point2_y) / 2
+        self.width = arcade.get_distance(point1_x, point1_y, point2_x, point2_y)
+        self.angle = math.degrees(math.atan2(point2_y - point1_y, point2_x - point1_x))
+
     def extend(self, step):
         """
         Extend the line segment by a specified step.
@@ -0,0 +1,75 @@
+"""
+Generates the next moon's WorldPlan on a worker thread while the ship is in orbit, so landing only has to build the
+sprites. Planning only touches plain data (game_data, the maze and placement code and the parsed outdoor tilemap),
+never arcade sprites, so it is safe off the main thread.
+"""
+import threading
+
+import game_data
+from map import plan_world
+from plan_file import load_or_plan
+from tilemap_loader import parse_tilemap
+
+
+class WorldPlanner:
+    def __init__(self, cache_directory=None):
+        """
+        :param cache_directory: folder to keep plans in (see plan_file), so a moon and seed is only planned once.
+        None to always plan
+        """
+        self.cache_directory = cache_directory
+        self.moon_id = None
+        self.seed = None
+        self.plan = None
+        self.error = None
+        self.thread = None
+
+    def request(self, moon_id, seed):
+        """
+        Start planning the moon's map on a daemon thread, replacing any earlier request
+        """
+        self.moon_id = moon_id
+        self.seed = seed
+        self.plan = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(moon_id, seed), daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def run(self, moon_id, seed):
+        try:
+            if self.cache_directory is not None:
+                plan = load_or_plan(moon_id, seed, self.cache_directory)
+            else:
+                plan = plan_world(moon_id, seed)
+            # Landing makes the tilemap's sprites from the parsed map
+            parse_tilemap(game_data.get_moon(moon_id).get("outdoor_tilemap"))
+        except Exception as error:
+            # Landing falls back to generating the map itself
+            plan = None
+            self.error = error
+        # A newer request may have been made while this one was running
+        if moon_id == self.moon_id and seed == self.seed:
+            self.plan = plan
+
+    def has_request(self, moon_id):
+        return self.moon_id == moon_id
+
+    def is_ready(self):
+        return self.plan is not None
+
+    def take(self, moon_id):
+        """
+        Hand over the plan for the moon, waiting for it if it is still being made. The planner is cleared afterwards
+        :return: WorldPlan, None if the moon wasn't requested or planning failed
+        """
+        if self.moon_id != moon_id or self.thread is None:
+            return None
+        thread = self.thread
+        thread.join()
+        plan = self.plan if self.moon_id == moon_id else None
+        self.moon_id = None
+        self.seed = None
+        self.plan = None
+        self.thread = None
+        return plan
@@ -0,0 +1,108 @@
+"""
+Seeding for world generation. A WorldSeed owns a separate random.Random (and numpy Generator) for each part of
+generation, each seeded from the world seed and the stream name, so the same seed always builds the same map no matter
+what else used random in between, and gameplay randomness never shifts the layout.
+"""
+import random
+import time
+import zlib
+
+import numpy as np
+
+# Streams used by map generation, any other name can be asked for as well
+LAYOUT = "layout"
+LOOT = "loot"
+HAZARDS = "hazards"
+SPAWNERS = "spawners"
+AI = "ai"
+STREAMS = (LAYOUT, LOOT, HAZARDS, SPAWNERS, AI)
+# Outdoor spawners are placed when the map is built, after the rest of the plan
+OUTDOOR_SPAWNERS = "outdoor_spawners"
+
+
+def XORshift(state):
+    """
+    This is for producing a random state
+    :param state:
+    :return:
+    """
+    x = state
+    x ^= (x << 13) & 0xFFFFFFFF
+    x ^= (x >> 17) & 0xFFFFFFFF
+    x ^= (x << 5) & 0xFFFFFFFF
+    return x
+
+
+class WorldSeed:
+    def __init__(self, seed=None):
+        """
+        :param seed: non negative int, None for a seed from the current time
+        """
+        if seed is None:
+            seed = XORshift(int(time.time()))
+        self.seed = seed
+        self.streams = {}
+        self.numpy_streams = {}
+        for name in STREAMS:
+            self.get_random(name)
+        self.layout = self.streams[LAYOUT]
+        self.loot = self.streams[LOOT]
+        self.hazards = self.streams[HAZARDS]
+        self.spawners = self.streams[SPAWNERS]
+        self.ai = self.streams[AI]
+
+    def get_random(self, name):
+        """
+        :return: the random.Random for the stream, created the first time it is asked for
+        """
+        stream = self.streams.get(name)
+        if stream is None:
+            # Seeding with a string is hashed the same way on every run and platform
+            stream = random.Random(str(self.seed) + ":" + name)
+            self.streams[name] = stream
+        return stream
+
+    def get_numpy(self, name):
+        """
+        :return: the numpy Generator for the stream, created the first time it is asked for
+        """
+        stream = self.numpy_streams.get(name)
+        if stream is None:
+            stream = np.random.default_rng([self.seed, zlib.crc32(name.encode())])
+            self.numpy_streams[name] = stream
+        return stream
+
+    def derive_seed(self, name):
+        """
+        :return: a new seed drawn from the stream, for child WorldSeeds (e.g. one per moon visit)
+        """
+        return self.get_random(name).getrandbits(32)
+
+    def get_state(self):
+        """
+        :return: the position of every stream created so far, as plain values
+        """
+        return (self.seed, {name: stream.getstate() for name, stream in self.streams.items()},
+                {name: stream.bit_generator.state for name, stream in self.numpy_streams.items()})
+
+    def set_state(self, state):
+        """
+        Move the streams back to a position from get_state, the seed has to be the same
+        """
+        seed, streams, numpy_streams = state
+        if seed != self.seed:
+            raise ValueError("State is for seed " + str(seed) + ", not " + str(self.seed))
+        for name, stream_state in streams.items():
+            self.get_random(name).setstate(stream_state)
+        for name, stream_state in numpy_streams.items():
+            self.get_numpy(name).bit_generator.state = stream_state
+
+
+def get_stream(world_seed, name):
+    """
+    :param world_seed: WorldSeed, or None to use the shared random module
+    :return: something with the random.Random methods for the stream
+    """
+    if world_seed is None:
+        return random
+    return world_seed.get_random(name)